@@ -52,7 +52,11 @@ DATABASE_CONFIG = {
         "username": os.getenv("NEO4J_USERNAME", "neo4j"),
         "password": os.getenv("NEO4J_PASSWORD", "rsca_secure_2025"), # Senha atualizada para corresponder ao docker-compose.yml
         "pool_size": int(os.getenv("NEO4J_POOL_SIZE", "5")),  # Reduzido
-        "timeout": int(os.getenv("NEO4J_TIMEOUT", "30"))
+        "timeout": int(os.getenv("NEO4J_TIMEOUT", "30")),  # Espera máxima por conexão do pool
+        "connection_timeout": int(os.getenv("NEO4J_CONNECTION_TIMEOUT", "15")),
+        "liveness_check_timeout": int(os.getenv("NEO4J_LIVENESS_CHECK", "60")),  # Testa conexões ociosas
+        "max_connection_lifetime": int(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600")),
+        "auto_schema": os.getenv("NEO4J_AUTO_SCHEMA", "true").lower() == "true"  # Constraints/índices na inicialização
     },
     "chromadb": {
         "path": PROJECT_ROOT / "data" / "chromadb",
@@ -60,6 +64,13 @@ DATABASE_CONFIG = {
         "host": os.getenv("CHROMADB_HOST", "localhost"),
         "port": int(os.getenv("CHROMADB_PORT", "8000")),
         "enable_auth": os.getenv("CHROMADB_AUTH", "false").lower() == "true"
+    },
+    "sqlite": {
+        # Backend local (GRAPHRAG_BACKEND=sqlite): grafo e metadados em SQLite,
+        # vetores no índice embarcado
+        "path": Path(os.getenv("GRAPHRAG_SQLITE_PATH", str(PROJECT_ROOT / "data" / "graphrag.sqlite3"))),
+        "vector_index_path": PROJECT_ROOT / "data" / "vector_index",
+        "busy_timeout_ms": 5000
     }
 }
 
@@ -107,6 +118,12 @@ PERFORMANCE_CONFIG = {
     "code_execution": {
         "max_execution_time": 20,  # Reduzido
         "max_file_size_mb": 2,     # Reduzido
+        # Sandbox (core/execution): zygotes pré-iniciados; 0 = interpretador novo por execução
+        "sandbox_pool_size": int(os.getenv("SANDBOX_POOL_SIZE", "2")),
+        "sandbox_max_output_kb": 1024,   # stdout/stderr por execução (acima disso o processo é morto)
+        # RLIMIT_NPROC é por usuário, não por execução: conta todos os processos e
+        # threads do usuário (incluindo o próprio assistente). Opt-in; 0 = desligado
+        "max_processes": 0,
         "allowed_imports": [
             "os", "sys", "json", "yaml", "datetime", "time", "re", "math",
             "pathlib", "typing", "dataclasses", "collections"
@@ -119,23 +136,92 @@ PERFORMANCE_CONFIG = {
 
 # Configurações GraphRAG - OTIMIZADAS
 GRAPHRAG_CONFIG = {
+    "backend": os.getenv("GRAPHRAG_BACKEND", "neo4j"),  # "neo4j" (Neo4j + ChromaDB) ou "sqlite"
     "enabled": os.getenv("GRAPHRAG_ENABLED", "true").lower() == "true",
     "vector_store": {
         "model": "all-MiniLM-L6-v2",
         "dimension": 384,
         "similarity_threshold": 0.7,
-        "max_results": 3  # Reduzido para economizar memória
+        "max_results": 3,  # Reduzido para economizar memória
+        # Armazenamento da matriz de varredura: "float32", "float16" ou "int8"
+        "quantization": os.getenv("GRAPHRAG_VECTOR_QUANTIZATION", "float32"),
+        "rerank_candidates": 50,        # Candidatos re-ranqueados em float32
+        "embedding_cache_size": 2048,   # Embeddings mantidos em cache (LRU)
+        "embedding_cache_storage": "float32"  # Modos com perda alteram embeddings persistidos
+    },
+    "retrieval": {
+        "mode": os.getenv("GRAPHRAG_RETRIEVAL_MODE", "hybrid"),  # "hybrid" ou "vector"
+        "candidate_multiplier": 3,      # Candidatos por etapa = k * multiplicador
+        "rrf_k": 60,                    # Constante do Reciprocal Rank Fusion
+        "quality_weight": 0.5,
+        "recency_weight": 0.3,
+        "recency_half_life_days": 30,
+        "graph_neighbour_decay": 0.5    # Peso de vizinhos SIMILAR_TO na expansão
+    },
+    "similarity_links": {
+        "fulltext_candidates": 50,      # Candidatos BM25 por escrita/consulta (índice full-text)
+        "max_links": 10,                # Arestas SIMILAR_TO por experiência
+        "min_similarity": 0.3,          # Score BM25 relativo ao da própria tarefa
+        # Job offline de kNN por embeddings (scripts/utils/build_similarity_links.py)
+        "min_embedding_similarity": 0.75,
+        "job_page_size": 1000,          # Vetores lidos por página
+        "job_query_block": 1024,        # Experiências novas por bloco da multiplicação
+        "job_state_path": PROJECT_ROOT / "data" / "similarity_links_state.json"
+    },
+    "context_selection": {
+        "candidates": 8,                # Experiências recuperadas antes da seleção
+        "token_budget": 400,            # Tokens máximos de experiências no prompt
+        "max_experiences": 3,
+        "mmr_lambda": 0.7,              # 1.0 = só relevância, 0.0 = só diversidade
+        "duplicate_threshold": 0.95,    # Similaridade acima disso é descartada
+        "preview_lines": 6
+    },
+    "retrieval_cache": {
+        "enabled": os.getenv("GRAPHRAG_RETRIEVAL_CACHE", "true").lower() == "true",
+        "max_entries": 256,
+        "max_bytes": 4 * 1024 * 1024,   # Limite aproximado de memória
+        "ttl_seconds": 600
     },
     "pattern_discovery": {
         "min_occurrences": 2,  # Reduzido
         "min_success_rate": 0.6,
         "confidence_threshold": 0.8,
-        "auto_discovery_interval": 48  # Aumentado para economizar recursos
+        "auto_discovery_interval": 48,  # Aumentado para economizar recursos
+        # Descoberta incremental (memory/pattern_state.py)
+        "incremental": True,
+        "state_path": PROJECT_ROOT / "data" / "patterns" / "discovery_state.json",
+        "history_days": 30,        # janela usada nas reconstruções completas
+        "rebuild_limit": 2000,     # máximo de experiências por reconstrução
+        "cluster_eps": 0.3,        # distância de cosseno do DBSCAN/atribuição
+        "fingerprint_weight": 0.25, # peso da estrutura (AST) frente ao embedding
+        "max_outliers": 500,       # buffer de experiências ainda sem cluster
+        "drift_min_batch": 20,     # lote mínimo para avaliar deriva
+        "drift_outlier_rate": 0.5, # fração do lote sem cluster próximo
+        "rebuild_growth": 2.0,     # reconstrói ao crescer N× desde a última
+        "parallel_workers": 0,     # processos dos estágios (0 = núcleos da CPU)
+        # Abaixo disso os estágios rodam em série. Um lote nunca passa de
+        # rebuild_limit: se este valor for maior, vale rebuild_limit
+        "parallel_min_experiences": 1000,
+        # Padrões descobertos persistidos (memory/pattern_store.py)
+        "persist_patterns": True,
+        "store_path": PROJECT_ROOT / "data" / "patterns" / "patterns.sqlite3",
+        "evolution_history": 100,  # versões por padrão carregadas no warm start
+        # PatternDiscoveryScheduler: dispara com N experiências novas ou após o intervalo
+        "scheduler_min_new_experiences": 50,
+        "scheduler_check_seconds": 300,
+        "scheduler_state_path": PROJECT_ROOT / "data" / "patterns" / "scheduler_state.json"
+    },
+    "experience_stream": {
+        # Leitura em fluxo do store (memory/experience_stream.py)
+        "page_size": 500,
+        "prefetch_pages": 2        # páginas lidas à frente (0 = sem thread de leitura)
     },
     "experience_storage": {
         "max_experiences_per_agent": 100,  # Muito reduzido
         "cleanup_threshold": 0.8,  # Limpeza mais agressiva
-        "compress_old_experiences": True
+        "compress_old_experiences": True,
+        "retention_batch_size": 200,   # Experiências removidas por transação
+        "retention_max_batches": 5     # Lotes por execução (o restante fica para a próxima)
     }
 }
 
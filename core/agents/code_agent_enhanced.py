@@ -10,19 +10,27 @@ CORREÇÕES APLICADAS:
 
 import yaml
 import ast
-import subprocess
-import tempfile
 import hashlib
 import time
-from pathlib import Path
 from typing import Dict, Any, Optional, Tuple, List
 from dataclasses import dataclass
 from datetime import datetime
 
-from memory.hybrid_store import GraphRAGMemoryStore, CodingExperience # Alterado de HybridMemoryStore
+from memory.hybrid_store import create_memory_store, CodingExperience
 from core.llm.llm_manager import llm_manager, MockLLMManager
 from config.paths import IDENTITY_STATE
-from config.settings import PERFORMANCE_CONFIG
+from config.settings import PERFORMANCE_CONFIG, GRAPHRAG_CONFIG
+from memory.graph_rag.diversity import estimate_tokens
+from core.execution.sandbox import run_code
+
+# Limite do sandbox atingido -> mensagem de erro da execução
+RESOURCE_LIMIT_ERRORS = {
+    "timeout": "Timeout: Código demorou muito para executar",
+    "cpu": "Limite de tempo de CPU excedido",
+    "as": "Limite de memória excedido",
+    "fsize": "Limite de tamanho de arquivo excedido",
+    "output": "Saída excedeu o limite do sandbox",
+}
 
 
 @dataclass 
@@ -42,6 +50,10 @@ class CodeResult:
     generation_time: float = 0.0  # Tempo de geração pelo LLM
     context_tokens: int = 0
     response_tokens: int = 0
+    # Uso de recursos da execução no sandbox
+    cpu_time: float = 0.0
+    peak_memory_mb: float = 0.0
+    resource_limit: Optional[str] = None  # limite atingido ("timeout", "cpu", "as", "fsize", "output")
 
 
 class CodeAgentEnhanced:
@@ -59,9 +71,10 @@ class CodeAgentEnhanced:
         
         # CORREÇÃO: Armazenar resposta do LLM para capturar métricas
         self.latest_llm_response = None
+        self.latest_execution = None  # SandboxResult da última execução
         
         # Nova capacidade: Memória experiencial
-        self.memory = GraphRAGMemoryStore() if enable_graphrag else None # Alterado de HybridMemoryStore
+        self.memory = create_memory_store() if enable_graphrag else None  # Backend em GRAPHRAG_CONFIG["backend"]
         self.enable_learning = enable_graphrag
         
         # Carrega perfil simbólico (compatibilidade)
@@ -97,7 +110,7 @@ class CodeAgentEnhanced:
         # NOVA CAPACIDADE: Buscar experiências similares
         similar_experiences = []
         if self.enable_learning and self.memory:
-            similar_experiences = self.memory.retrieve_similar_experiences(instruction, k=3)
+            similar_experiences = self._select_context_experiences(instruction)
             if similar_experiences:
                 print(f"🧠 Encontradas {len(similar_experiences)} experiências similares")
         
@@ -175,24 +188,39 @@ class CodeAgentEnhanced:
         
         return context
     
+    def _select_context_experiences(self, instruction: str) -> List[Dict]:
+        """
+        Recupera candidatos e mantém um subconjunto diverso (MMR) que cabe
+        no orçamento de tokens do prompt, em vez dos primeiros k.
+        """
+        selection = GRAPHRAG_CONFIG["context_selection"]
+        candidates = self.memory.retrieve_hybrid(instruction, k=selection["candidates"])
+        return self.memory.select_diverse_experiences(
+            instruction, candidates,
+            cost=lambda exp: estimate_tokens(self._format_experience(exp, 1))
+        )
+    
+    def _format_experience(self, exp: Dict, position: int) -> str:
+        """Bloco de uma experiência no prompt"""
+        # O campo 'source' não existe mais na CodingExperience, pois é tudo GraphRAG
+        # O campo 'pattern' também não existe diretamente aqui, é 'task'
+        block = f"{position}. Tarefa: {exp.get('task', 'N/A')}\n"
+        block += f"   Qualidade: {exp.get('quality', 0):.1f}/10\n"
+        if exp.get('code'):
+            # Mostrar apenas primeiras linhas do código
+            preview_lines = GRAPHRAG_CONFIG["context_selection"]["preview_lines"]
+            code_preview = '\n'.join(exp['code'].split('\n')[:preview_lines])
+            block += f"   Abordagem: {code_preview}...\n"
+        return block
+    
     def _format_experiences_for_context(self, experiences: List[Dict]) -> str:
-        """Formata experiências para inclusão no prompt do LLM"""
+        """Formata experiências (já selecionadas por diversidade) para o prompt do LLM"""
         if not experiences:
             return ""
         
         formatted = "Experiências similares bem-sucedidas:\n"
-        
-        for i, exp in enumerate(experiences[:2], 1):  # Máximo 2 para não sobrecarregar prompt
-            # O campo 'source' não existe mais na CodingExperience, pois é tudo GraphRAG
-            # O campo 'pattern' também não existe diretamente aqui, é 'task'
-            formatted += f"{i}. Tarefa: {exp.get('task', 'N/A')}\n"
-            formatted += f"   Qualidade: {exp.get('quality', 0):.1f}/10\n"
-            if exp.get('code'):
-                # Mostrar apenas primeiras linhas do código
-                code_preview = '\n'.join(exp['code'].split('\n')[:3])
-                formatted += f"   Abordagem: {code_preview}...\n"
-            
-            formatted += "\n"
+        for i, exp in enumerate(experiences, 1):
+            formatted += self._format_experience(exp, i) + "\n"
         
         return formatted.strip()
     
@@ -218,7 +246,10 @@ class CodeAgentEnhanced:
                     "execution_time": result.execution_time,
                     "generation_time": result.generation_time,  # CORREÇÃO: Incluir tempo de geração
                     "context_tokens": result.context_tokens,
-                    "response_tokens": result.response_tokens
+                    "response_tokens": result.response_tokens,
+                    "cpu_time": result.cpu_time,
+                    "peak_memory_mb": result.peak_memory_mb,
+                    "resource_limit": result.resource_limit
                 },
                 # yaml_cycle=len(self.generation_history) + 1 # Removido, não é mais usado
             )
@@ -273,6 +304,7 @@ class CodeAgentEnhanced:
         
         # Executar código (se seguro)
         execution_result, execution_error, exec_time = self._safe_execution(code)
+        execution = self.latest_execution
         
         # Calcular score de qualidade (melhorado)
         quality_score = self._calculate_enhanced_quality_score(
@@ -291,7 +323,10 @@ class CodeAgentEnhanced:
             # CORREÇÃO: Incluir tempo de processamento e métricas do LLM
             generation_time=processing_time,
             context_tokens=getattr(llm_response, 'context_tokens', 0),
-            response_tokens=getattr(llm_response, 'response_tokens', 0)
+            response_tokens=getattr(llm_response, 'response_tokens', 0),
+            cpu_time=getattr(execution, 'cpu_time', 0.0),
+            peak_memory_mb=getattr(execution, 'peak_rss_mb', 0.0),
+            resource_limit=getattr(execution, 'limit', None)
         )
     
     def _calculate_enhanced_quality_score(self, code: str, syntax_valid: bool, 
@@ -412,35 +447,25 @@ class CodeAgentEnhanced:
             return False, str(e)
     
     def _safe_execution(self, code: str) -> Tuple[Optional[str], Optional[str], float]:
-        """Executa código de forma segura (preservado)"""
+        """
+        Executa código de forma segura (zygote do sandbox, código via stdin),
+        com tempo e rlimits de PERFORMANCE_CONFIG["code_execution"]. O uso
+        de recursos fica em self.latest_execution.
+        """
         start_time = time.time()
+        self.latest_execution = None
         
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
-                f.write(code)
-                temp_file = f.name
-            
-            result = subprocess.run(
-                ['python', temp_file],
-                capture_output=True,
-                text=True,
-                timeout=PERFORMANCE_CONFIG["timeout_seconds"],
-                encoding='utf-8' # Adicionado encoding para subprocess
-            )
-            
-            execution_time = time.time() - start_time
-            
-            Path(temp_file).unlink(missing_ok=True)
-            
-            if result.returncode == 0:
-                return result.stdout, None, execution_time
-            else:
-                return None, result.stderr, execution_time
-                
-        except subprocess.TimeoutExpired:
-            return None, "Timeout: Código demorou muito para executar", time.time() - start_time
+            result = run_code(code, timeout=PERFORMANCE_CONFIG["code_execution"]["max_execution_time"])
         except Exception as e:
             return None, f"Erro na execução: {str(e)}", time.time() - start_time
+        
+        self.latest_execution = result
+        if result.limit in RESOURCE_LIMIT_ERRORS:
+            return None, RESOURCE_LIMIT_ERRORS[result.limit], result.elapsed
+        if result.returncode == 0:
+            return result.stdout, None, result.elapsed
+        return None, result.stderr, result.elapsed
     
     def _handle_generation_failure(self, instruction: str, error: str) -> CodeResult:
         """Lida com falha na geração de código (preservado)"""
@@ -205,6 +205,7 @@ class ReflectionAgent:
             try:
                 graphrag_stats = self.graph.get_categories_and_counts()
                 stats["graphrag_categories"] = graphrag_stats
+                stats["neo4j_pool"] = self.graph.driver.get_metrics()
             except Exception as e:
                 stats["graphrag_error"] = str(e)
         
@@ -243,22 +244,32 @@ class ReflectionAgent:
 
     def cleanup_old_data(self, max_age_days=30):
         """
-        NOVO: Limpeza de dados antigos para economizar memória
+        Limpeza de dados antigos para economizar memória.
+        Aplica a retenção de GRAPHRAG_CONFIG["experience_storage"]: apenas
+        experiências com mais de max_age_days podem ser removidas.
         """
         if self.using_mock:
             print("🧹 Limpeza não necessária (modo mock)")
-            return
+            return None
         
         try:
-            # Implementar limpeza no GraphRAG se necessário
+            from memory.hybrid_store import connect_experience_collection
+            from memory.graph_rag.retention import ExperienceRetentionEngine
+            
             print(f"🧹 Iniciando limpeza de dados > {max_age_days} dias")
             
-            # Para implementação futura - limpeza baseada em timestamp
-            # self.graph.cleanup_old_patterns(max_age_days)
+            # Vetores e grafo precisam ser podados juntos
+            _, collection = connect_experience_collection()
+            engine = ExperienceRetentionEngine(self.graph.driver, collection)
+            report = engine.run(max_age_days=max_age_days)
             
-            print("✅ Limpeza concluída")
+            print(f"✅ Limpeza concluída: {report['experiences_removed']} experiências removidas, "
+                  f"{report['bytes_reclaimed'] / 1024:.1f} KB recuperados"
+                  f"{'' if report['complete'] else ' (restante na próxima execução)'}")
+            return report
         except Exception as e:
             print(f"⚠️ Erro na limpeza: {e}")
+            return None
 
     def close(self):
         """
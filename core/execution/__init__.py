@@ -0,0 +1,2 @@
+# Execution package
+from core.execution.sandbox import SandboxPool, SandboxResult, run_code, get_sandbox_pool
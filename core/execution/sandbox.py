@@ -0,0 +1,256 @@
+"""
+Sandbox de execução do código gerado
+
+SandboxPool mantém processos zygote (core/execution/zygote.py) já
+iniciados e com os módulos de allowed_imports carregados. Cada execução
+é enviada pelo stdin do zygote, que faz fork de um filho descartável: o
+código roda num namespace novo, sem arquivo temporário e sem pagar a
+inicialização do interpretador a cada tarefa. O estado global deixado por
+uma execução morre com o filho.
+
+Cada execução roda com os rlimits de resource_limits(), derivados de
+PERFORMANCE_CONFIG: tempo de CPU (code_execution.max_execution_time),
+espaço de endereçamento (memory_limit_mb), tamanho de arquivo
+(code_execution.max_file_size_mb) e, se ligado, processos
+(code_execution.max_processes). Este último é RLIMIT_NPROC, um teto por
+usuário e não por execução: conta todos os processos e threads do usuário,
+então fica desligado por padrão.
+O resultado traz o tempo de CPU, o pico de RSS e o limite atingido. Se o
+zygote não responder dentro do prazo mais uma folga, ele e o filho em
+execução são mortos e o zygote é substituído.
+
+Em plataformas sem fork (Windows) run_code() recorre a um interpretador
+novo por execução, com o código também passado pelo stdin (sem rlimits
+nem medição de uso).
+
+Uso:
+    result = run_code("print(1 + 1)", timeout=5)
+    result.ok, result.stdout
+"""
+
+import atexit
+import json
+import os
+import math
+import queue
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import PERFORMANCE_CONFIG
+
+ZYGOTE_SCRIPT = Path(__file__).with_name("zygote.py")
+FORK_AVAILABLE = hasattr(os, "fork")
+WATCHDOG_GRACE = 5.0  # segundos além do timeout antes de matar o zygote
+STARTUP_TIMEOUT = 30.0
+
+
+@dataclass
+class SandboxResult:
+    """Resultado de uma execução no sandbox"""
+    returncode: int
+    stdout: str
+    stderr: str
+    elapsed: float
+    timed_out: bool = False
+    cpu_time: float = 0.0
+    peak_rss_mb: float = 0.0
+    limit: Optional[str] = None  # "timeout", "cpu", "as", "fsize", "output" ou None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+def _config():
+    config = PERFORMANCE_CONFIG["code_execution"]
+    return config, config["sandbox_max_output_kb"] * 1024
+
+
+def resource_limits() -> Dict[str, Optional[int]]:
+    """rlimits por execução a partir do PERFORMANCE_CONFIG (0 = sem limite)"""
+    config = PERFORMANCE_CONFIG["code_execution"]
+    megabyte = 1024 * 1024
+    return {
+        "cpu": math.ceil(config["max_execution_time"]) or None,
+        "as": PERFORMANCE_CONFIG["memory_limit_mb"] * megabyte or None,
+        "fsize": config["max_file_size_mb"] * megabyte or None,
+        "nproc": config["max_processes"] or None,
+    }
+
+
+class _Zygote:
+    """Um processo zygote e seu canal de pedidos (stdin/stdout, JSON por linha)"""
+
+    def __init__(self, warm_imports: List[str]):
+        self.process = subprocess.Popen(
+            [sys.executable, str(ZYGOTE_SCRIPT), *warm_imports],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        self.child: Optional[int] = None  # filho em execução (também o id do seu grupo)
+        self._buffer = b""
+        try:
+            ready = self._readline(STARTUP_TIMEOUT)
+        except Exception:  # prazo estourado ou linha inválida: o zygote não pode ficar órfão
+            self.close()
+            raise
+        if ready is None:
+            self.close()
+            raise RuntimeError("zygote do sandbox não iniciou")
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _readline(self, timeout: float) -> Optional[dict]:
+        """Próxima linha JSON do zygote; None no EOF, TimeoutError após o prazo"""
+        deadline = time.monotonic() + timeout
+        fd = self.process.stdout.fileno()  # lido direto: o buffer do objeto fica vazio
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            ready, _, _ = select.select([fd], [], [], max(remaining, 0))
+            if not ready:
+                raise TimeoutError("zygote do sandbox não respondeu no prazo")
+            data = os.read(fd, 65536)
+            if not data:
+                return None
+            self._buffer += data
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    def run(self, code: str, timeout: float, max_output: int, limits: Dict[str, Optional[int]]) -> SandboxResult:
+        request = {"code": code, "timeout": timeout, "max_output": max_output, "limits": limits}
+        self.process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+        self.process.stdin.flush()
+        deadline = time.monotonic() + timeout + WATCHDOG_GRACE
+        started = self._readline(timeout + WATCHDOG_GRACE)
+        if started is None:
+            raise RuntimeError("zygote do sandbox encerrado")
+        self.child = started["child"]
+        response = self._readline(deadline - time.monotonic())
+        if response is None:
+            raise RuntimeError("zygote do sandbox encerrado")
+        self.child = None
+        return SandboxResult(**response)
+
+    def close(self):
+        if self.child is not None:  # execução abandonada: o filho não pode sobreviver ao zygote
+            try:
+                os.killpg(self.child, signal.SIGKILL)
+            except OSError:
+                pass
+            self.child = None
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class SandboxPool:
+    """Pool de zygotes pré-iniciados; cada run() ocupa um zygote"""
+
+    def __init__(self, size: Optional[int] = None, warm_imports: Optional[List[str]] = None):
+        if not FORK_AVAILABLE:
+            raise RuntimeError("SandboxPool requer os.fork (use run_code)")
+        config, self.max_output = _config()
+        self.size = size or config["sandbox_pool_size"]
+        self.warm_imports = config["allowed_imports"] if warm_imports is None else warm_imports
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._zygotes: List[_Zygote] = []
+        self._lock = threading.Lock()
+        self.closed = False
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Zygote:
+        zygote = _Zygote(self.warm_imports)
+        with self._lock:
+            self._zygotes.append(zygote)
+        return zygote
+
+    def _discard(self, zygote: _Zygote):
+        zygote.close()
+        with self._lock:
+            if zygote in self._zygotes:
+                self._zygotes.remove(zygote)
+
+    def run(self, code: str, timeout: Optional[float] = None,
+            limits: Optional[Dict[str, Optional[int]]] = None) -> SandboxResult:
+        """Executa o código num filho de um zygote livre (bloqueia se todos ocupados)"""
+        if self.closed:
+            raise RuntimeError("SandboxPool encerrado")
+        timeout = timeout or PERFORMANCE_CONFIG["code_execution"]["max_execution_time"]
+        limits = resource_limits() if limits is None else limits
+        started = time.perf_counter()
+        zygote = self._idle.get()
+        try:
+            if zygote is not None and not zygote.alive():
+                self._discard(zygote)
+                zygote = None
+            if zygote is None:
+                zygote = self._spawn()
+            return zygote.run(code, timeout, self.max_output, limits)
+        except (OSError, ValueError, RuntimeError) as e:
+            if zygote is not None:
+                self._discard(zygote)
+                zygote = None
+            return SandboxResult(returncode=-1, stdout="", stderr=f"Falha no worker do sandbox: {e}",
+                                 elapsed=time.perf_counter() - started, timed_out=isinstance(e, TimeoutError),
+                                 limit="timeout" if isinstance(e, TimeoutError) else None)
+        finally:
+            self._idle.put(zygote)
+
+    def close(self):
+        self.closed = True
+        with self._lock:
+            zygotes, self._zygotes = self._zygotes, []
+        for zygote in zygotes:
+            zygote.close()
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Pool compartilhado do processo (criado no primeiro uso)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = SandboxPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def _run_subprocess(code: str, timeout: float) -> SandboxResult:
+    """Alternativa sem pool: um interpretador por execução, código pelo stdin"""
+    start = time.perf_counter()
+    _, max_output = _config()
+    preexec = None
+    if FORK_AVAILABLE:  # POSIX: mesmos rlimits do zygote
+        from core.execution.zygote import apply_limits
+        limits = resource_limits()
+        preexec = lambda: apply_limits(limits)
+    try:
+        result = subprocess.run([sys.executable, "-"], input=code, capture_output=True, text=True,
+                                encoding="utf-8", errors="replace", timeout=timeout, preexec_fn=preexec)
+    except subprocess.TimeoutExpired as e:
+        return SandboxResult(returncode=-9, stdout="", stderr=str(e), elapsed=time.perf_counter() - start,
+                             timed_out=True, limit="timeout")
+    return SandboxResult(returncode=result.returncode, stdout=result.stdout[:max_output],
+                         stderr=result.stderr[:max_output], elapsed=time.perf_counter() - start)
+
+
+def run_code(code: str, timeout: Optional[float] = None) -> SandboxResult:
+    """Executa código gerado isolado do processo atual"""
+    timeout = timeout or PERFORMANCE_CONFIG["code_execution"]["max_execution_time"]
+    if FORK_AVAILABLE and PERFORMANCE_CONFIG["code_execution"]["sandbox_pool_size"] > 0:
+        return get_sandbox_pool().run(code, timeout)
+    return _run_subprocess(code, timeout)
@@ -0,0 +1,233 @@
+"""
+Processo zygote do sandbox de execução (somente biblioteca padrão)
+
+Iniciado uma vez por worker do SandboxPool com os módulos a pré-carregar
+como argumentos. Lê pedidos JSON por linha no stdin ({"code", "timeout",
+"max_output", "limits"}) e, para cada um, faz fork de um filho que executa
+o código num namespace novo (__name__ == "__main__") com stdout/stderr em
+pipes próprios. O zygote nunca executa código gerado: o estado deixado
+por uma execução morre com o filho. A resposta (returncode, stdout,
+stderr, elapsed, timed_out, cpu_time, peak_rss_mb, limit) volta como uma
+linha JSON no stdout, precedida por {"child": pid} logo após o fork.
+
+Limites do filho: rlimits de CPU, espaço de endereçamento, tamanho de
+arquivo e número de processos (aplicados após o fork, antes do exec do
+código). O grupo de processos do filho recebe SIGKILL ao estourar o tempo
+de parede ou ao passar de max_output bytes de saída. O uso de recursos
+vem de os.wait4.
+"""
+
+import importlib
+import json
+import os
+import resource
+import selectors
+import signal
+import sys
+import time
+import traceback
+
+CHUNK = 65536
+WAIT_POLL = 0.05  # intervalo máximo entre verificações do filho após o EOF
+
+# Nome do limite no pedido -> rlimit
+RLIMITS = {
+    "cpu": resource.RLIMIT_CPU,
+    "as": resource.RLIMIT_AS,
+    "fsize": resource.RLIMIT_FSIZE,
+    "nproc": resource.RLIMIT_NPROC,  # por usuário (não por filho); opt-in via max_processes
+}
+# Sinal que encerrou o filho -> limite atingido
+SIGNAL_LIMITS = {signal.SIGXCPU: "cpu", signal.SIGXFSZ: "fsize"}
+
+
+def apply_limits(limits: dict):
+    """setrlimit para cada limite pedido (nunca acima do hard limit atual)"""
+    for name, value in (limits or {}).items():
+        if value is None or name not in RLIMITS:
+            continue
+        soft_cap, hard_cap = resource.getrlimit(RLIMITS[name])
+        # CPU: o soft envia SIGXCPU; o hard (1 s depois) garante o SIGKILL
+        soft, hard = int(value), int(value) + (1 if name == "cpu" else 0)
+        if hard_cap != resource.RLIM_INFINITY:
+            soft, hard = min(soft, hard_cap), min(hard, hard_cap)
+        resource.setrlimit(RLIMITS[name], (soft, hard))
+
+
+def _run_child(code: str, limits: dict):
+    """Executado no filho após o fork; nunca retorna"""
+    status = 0
+    try:
+        os.setpgid(0, 0)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGXCPU, signal.SIG_DFL)
+        apply_limits(limits)
+        sys.argv = ["<sandbox>"]
+        namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+        exec(compile(code, "<sandbox>", "exec"), namespace)
+    except SystemExit as e:
+        if e.code is None:
+            status = 0
+        elif isinstance(e.code, int):
+            status = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            status = 1
+    except MemoryError:
+        # Sem memória para formatar o traceback completo
+        sys.stderr.write("MemoryError: limite de memória do sandbox atingido\n")
+        status = 1
+    except BaseException as e:
+        # Omite o quadro do próprio zygote no traceback
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        status = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(status & 0xFF)
+
+
+def _collect(pid: int, out_fd: int, err_fd: int, timeout: float, max_output: int):
+    """
+    Lê stdout/stderr do filho até EOF. Mata o grupo ao estourar o prazo
+    ("timeout") ou max_output ("output"); retorna (status, rusage, saídas, motivo).
+    """
+    buffers = {out_fd: bytearray(), err_fd: bytearray()}
+    selector = selectors.DefaultSelector()
+    for fd in buffers:
+        selector.register(fd, selectors.EVENT_READ)
+
+    deadline = time.monotonic() + timeout
+    killed = None
+    while selector.get_map() and killed is None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            killed = "timeout"
+            break
+        for key, _ in selector.select(remaining):
+            data = os.read(key.fd, CHUNK)
+            if not data:
+                selector.unregister(key.fd)
+                continue
+            buffer = buffers[key.fd]
+            buffer.extend(data[:max_output - len(buffer)])
+            if len(buffer) >= max_output:
+                killed = "output"
+                break
+    selector.close()
+
+    # O filho pode fechar stdout/stderr e continuar vivo: o prazo vale até o fim
+    pause = 0.0005
+    while killed is None:
+        done, status, usage = os.wait4(pid, os.WNOHANG)
+        if done:
+            break
+        if time.monotonic() >= deadline:
+            killed = "timeout"
+        else:
+            time.sleep(pause)
+            pause = min(pause * 2, WAIT_POLL)
+
+    if killed:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            os.kill(pid, signal.SIGKILL)
+        _, status, usage = os.wait4(pid, 0)
+    for fd in buffers:
+        os.close(fd)
+    return status, usage, buffers[out_fd], buffers[err_fd], killed
+
+
+def _peak_rss_mb(usage) -> float:
+    # ru_maxrss: KB no Linux, bytes no macOS
+    divisor = 1024 ** 2 if sys.platform == "darwin" else 1024
+    return usage.ru_maxrss / divisor
+
+
+def handle(request: dict, channel=None) -> dict:
+    start = time.perf_counter()
+    out_read, out_write = os.pipe()
+    err_read, err_write = os.pipe()
+    go_read, go_write = os.pipe()
+    sys.stdout.flush()
+    pid = os.fork()
+    if pid == 0:
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(out_write, 1)
+        os.dup2(err_write, 2)
+        for fd in (devnull, out_read, out_write, err_read, err_write, go_write):
+            os.close(fd)
+        os.read(go_read, 1)  # só executa depois que o pai anunciou o pid
+        os.close(go_read)
+        sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", errors="replace", closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", errors="replace", closefd=False)
+        _run_child(request["code"], request.get("limits"))
+
+    try:
+        os.setpgid(pid, pid)  # também no pai: evita corrida com o timeout
+    except OSError:
+        pass
+    os.close(out_write)
+    os.close(err_write)
+    os.close(go_read)
+    # O pool precisa do grupo do filho para matá-lo se desistir deste zygote
+    if channel is not None:
+        channel.write(json.dumps({"child": pid}) + "\n")
+        channel.flush()
+    os.close(go_write)  # EOF libera o filho
+    status, usage, stdout, stderr, killed = _collect(pid, out_read, err_read,
+                                                     float(request["timeout"]), int(request["max_output"]))
+    limit = killed
+    if os.WIFSIGNALED(status):
+        returncode = -os.WTERMSIG(status)
+        limit = limit or SIGNAL_LIMITS.get(os.WTERMSIG(status))
+    else:
+        returncode = os.WEXITSTATUS(status)
+    stderr_text = stderr.decode("utf-8", errors="replace")
+    if limit is None and returncode != 0:
+        if "MemoryError" in stderr_text[-2000:]:
+            limit = "as"
+        elif "File too large" in stderr_text[-2000:]:
+            limit = "fsize"
+    return {
+        "returncode": returncode,
+        "stdout": stdout.decode("utf-8", errors="replace"),
+        "stderr": stderr_text,
+        "elapsed": time.perf_counter() - start,
+        "timed_out": killed == "timeout",
+        "cpu_time": usage.ru_utime + usage.ru_stime,
+        "peak_rss_mb": _peak_rss_mb(usage),
+        "limit": limit,
+    }
+
+
+def main():
+    # O diretório deste arquivo não deve ser importável pelo código gerado
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+    # Pré-aquecimento: módulos importados aqui já estão carregados nos filhos
+    for module in sys.argv[1:]:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+    channel = sys.stdout
+    sys.stdout = sys.stderr  # prints acidentais não corrompem o protocolo
+    channel.write(json.dumps({"ready": os.getpid()}) + "\n")
+    channel.flush()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        channel.write(json.dumps(handle(json.loads(line), channel)) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    main()
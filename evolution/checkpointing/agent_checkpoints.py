@@ -241,59 +241,43 @@ class AgentCheckpointManager:
         return config
     
     def _export_agent_experiences(self, agent, checkpoint_id: str) -> Optional[str]:
-        """Exporta experiências do agente para arquivo separado"""
+        """Exporta experiências do agente em chunks comprimidos (ver memory.experience_export)"""
         if not hasattr(agent, 'memory') or not agent.memory:
             return None
         
         try:
-            experiences_file = self.experiences_dir / f"{checkpoint_id}_experiences.json"
+            from memory.experience_export import ExperienceExporter
             
-            # Coletar experiências do GraphRAG
-            experiences = []
+            export_dir = self.experiences_dir / f"{checkpoint_id}_experiences"
+            total = 0
             
             if agent.memory.enable_graphrag:
-                # Extrair do Neo4j
-                with agent.memory.neo4j.session() as session:
-                    result = session.run("""
-                        MATCH (e:Experience)-[:PERFORMED_BY]->(a:Agent {name: $agent_name})
-                        MATCH (e)-[:GENERATED_CODE]->(c:Code)
-                        RETURN e, c
-                        ORDER BY e.timestamp DESC
-                        LIMIT 1000
-                    """, agent_name=agent.__class__.__name__)
-                    
-                    for record in result:
-                        exp = record['e']
-                        code = record['c']
-                        experiences.append({
-                            'id': exp['id'],
-                            'task': exp['task_description'],
-                            'code': code['content'],
-                            'quality': exp['quality_score'],
-                            'success': exp['execution_success'],
-                            'timestamp': exp['timestamp'],
-                            'agent': exp['agent_name']
-                        })
+                # Todas as experiências do agente, paginadas por cursor
+                manifest = ExperienceExporter(
+                    agent.memory, export_dir, agent=agent.__class__.__name__
+                ).run()
+                total += manifest["total_experiences"]
             
-            # Adicionar experiências do histórico local
-            if hasattr(agent, 'generation_history'):
-                for i, hist in enumerate(agent.generation_history):
-                    experiences.append({
-                        'id': f"local_{i}",
-                        'task': hist.get('instruction', 'Unknown'),
-                        'code': 'N/A',  # Código não armazenado no histórico
-                        'quality': hist.get('quality_score', 0),
-                        'success': hist.get('success', False),
-                        'timestamp': hist.get('timestamp', ''),
-                        'source': 'local_history'
-                    })
+            # Histórico local (pequeno, sem código) fica ao lado dos chunks
+            if hasattr(agent, 'generation_history') and agent.generation_history:
+                export_dir.mkdir(parents=True, exist_ok=True)
+                local = [{
+                    'id': f"local_{i}",
+                    'task': hist.get('instruction', 'Unknown'),
+                    'quality': hist.get('quality_score', 0),
+                    'success': hist.get('success', False),
+                    'timestamp': hist.get('timestamp', ''),
+                    'source': 'local_history'
+                } for i, hist in enumerate(agent.generation_history)]
+                with open(export_dir / "local_history.json", 'w', encoding='utf-8') as f:
+                    json.dump(local, f, ensure_ascii=False, default=str)
+                total += len(local)
             
-            # Salvar experiências
-            with open(experiences_file, 'w', encoding='utf-8') as f:
-                json.dump(experiences, f, indent=2, ensure_ascii=False, default=str)
+            if not export_dir.exists():
+                return None
             
-            print(f"   💾 {len(experiences)} experiências exportadas")
-            return str(experiences_file)
+            print(f"   💾 {total} experiências exportadas")
+            return str(export_dir)
             
         except Exception as e:
             print(f"   ⚠️ Falha ao exportar experiências: {e}")
@@ -404,38 +388,48 @@ class AgentCheckpointManager:
     
     def _restore_agent_experiences(self, agent, checkpoint: AgentCheckpoint):
         """Restaura experiências do agente"""
-        experiences_file = checkpoint.metadata.get("experience_snapshot")
-        if not experiences_file or not Path(experiences_file).exists():
+        experiences_path = checkpoint.metadata.get("experience_snapshot")
+        if not experiences_path or not Path(experiences_path).exists():
+            return
+        if not (hasattr(agent, 'memory') and agent.memory and agent.memory.enable_graphrag):
             return
         
         try:
-            with open(experiences_file, 'r', encoding='utf-8') as f:
+            if Path(experiences_path).is_dir():
+                from memory.experience_export import ExperienceImporter, MANIFEST_NAME
+                
+                if not (Path(experiences_path) / MANIFEST_NAME).exists():
+                    return  # Apenas histórico local
+                stats = ExperienceImporter(agent.memory, experiences_path, resume=False).run()
+                print(f"   ✅ {stats['total_imported']} experiências restauradas "
+                      f"({stats['experiences_per_second']:.0f}/s)")
+                return
+            
+            # Checkpoints antigos: lista JSON única
+            from memory.hybrid_store import CodingExperience
+            
+            with open(experiences_path, 'r', encoding='utf-8') as f:
                 experiences = json.load(f)
             
-            # Restaurar no GraphRAG se disponível
-            if hasattr(agent, 'memory') and agent.memory and agent.memory.enable_graphrag:
-                from memory.hybrid_store import CodingExperience
-                
-                for exp_data in experiences[:100]:  # Limitar a 100 experiências
-                    if exp_data.get('source') != 'local_history':
-                        try:
-                            experience = CodingExperience(
-                                id=exp_data['id'],
-                                task_description=exp_data['task'],
-                                code_generated=exp_data['code'],
-                                quality_score=exp_data['quality'],
-                                execution_success=exp_data['success'],
-                                agent_name=exp_data['agent'],
-                                llm_model='restored',
-                                timestamp=datetime.fromisoformat(exp_data['timestamp']),
-                                context={'restored': True},
-                                yaml_cycle=0
-                            )
-                            
-                            agent.memory.store_experience(experience)
-                            
-                        except Exception as e:
-                            print(f"   ⚠️ Erro ao restaurar experiência {exp_data['id']}: {e}")
+            for exp_data in experiences:
+                if exp_data.get('source') != 'local_history':
+                    try:
+                        experience = CodingExperience(
+                            id=exp_data['id'],
+                            task_description=exp_data['task'],
+                            code_generated=exp_data['code'],
+                            quality_score=exp_data['quality'],
+                            execution_success=exp_data['success'],
+                            agent_name=exp_data['agent'],
+                            llm_model='restored',
+                            timestamp=datetime.fromisoformat(str(exp_data['timestamp'])),
+                            context={'restored': True}
+                        )
+                        
+                        agent.memory.store_experience(experience)
+                        
+                    except Exception as e:
+                        print(f"   ⚠️ Erro ao restaurar experiência {exp_data['id']}: {e}")
             
             print(f"   ✅ {len(experiences)} experiências processadas para restauração")
             
@@ -522,10 +516,13 @@ class AgentCheckpointManager:
             checkpoint_file = self.agents_dir / f"{checkpoint_id}.pkl"
             metadata_file = self.metadata_dir / f"{checkpoint_id}.json"
             experiences_file = self.experiences_dir / f"{checkpoint_id}_experiences.json"
+            experiences_dir = self.experiences_dir / f"{checkpoint_id}_experiences"
             
             for file_path in [checkpoint_file, metadata_file, experiences_file]:
                 if file_path.exists():
                     file_path.unlink()
+            if experiences_dir.exists():
+                shutil.rmtree(experiences_dir)
             
             # Remover do índice
             if checkpoint_id in self.checkpoint_index:
@@ -27,8 +27,8 @@ st.set_page_config(
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from memory.hybrid_store import HybridMemoryStore
-from memory.pattern_discovery import PatternDiscoveryEngine
+from memory.hybrid_store import create_memory_store
+from memory.pattern_store import PatternStore
 from evolution.checkpointing.agent_checkpoints import AgentCheckpointManager
 from config.paths import IDENTITY_STATE, MEMORY_LOG, SYMBOLIC_TIMELINE
 
@@ -84,44 +84,19 @@ def load_system_data():
 def load_graphrag_data():
     """Carrega dados do GraphRAG"""
     try:
-        memory = HybridMemoryStore(enable_graphrag=True)
-        
-        if memory.enable_graphrag:
-            # Estatísticas básicas do Neo4j
-            with memory.neo4j.session() as session:
-                stats_query = """
-                MATCH (e:Experience)
-                RETURN 
-                    count(e) as total_experiences,
-                    avg(e.quality_score) as avg_quality,
-                    max(e.quality_score) as max_quality,
-                    min(e.quality_score) as min_quality
-                """
-                result = session.run(stats_query)
-                stats = result.single()
-                
-                # Experiências por agente
-                agent_query = """
-                MATCH (e:Experience)-[:PERFORMED_BY]->(a:Agent)
-                RETURN a.name as agent, count(e) as experiences
-                ORDER BY experiences DESC
-                """
-                agent_result = session.run(agent_query)
-                agent_stats = [dict(record) for record in agent_result]
-                
-                # Qualidade ao longo do tempo
-                quality_query = """
-                MATCH (e:Experience)
-                WHERE e.timestamp IS NOT NULL
-                RETURN 
-                    date(e.timestamp) as date,
-                    avg(e.quality_score) as avg_quality,
-                    count(e) as experience_count
-                ORDER BY date DESC
-                LIMIT 30
-                """
-                quality_result = session.run(quality_query)
-                quality_timeline = [dict(record) for record in quality_result]
+        memory = create_memory_store()
+        
+        # Agregados incrementais por agente e por dia: leituras O(1)
+        stats = memory.get_global_stats()
+        
+        # Experiências por agente
+        agent_stats = [
+            dict(stat, experiences=stat['total_experiences'])
+            for stat in memory.get_agent_stats()
+        ]
+        
+        # Qualidade ao longo do tempo (últimos 30 dias)
+        quality_timeline = memory.get_quality_timeline(days=30)
         
         memory.close()
         
@@ -141,20 +116,14 @@ def load_graphrag_data():
             'error': str(e)
         }
 
-@st.cache_data
+@st.cache_data(ttl=60)
 def load_pattern_data():
-    """Carrega dados de padrões descobertos"""
+    """Carrega os padrões persistidos pela última descoberta (sem executá-la)"""
     try:
-        memory = HybridMemoryStore(enable_graphrag=True)
-        discovery_engine = PatternDiscoveryEngine(memory)
-        
-        # Descobrir padrões
-        patterns = discovery_engine.discover_patterns(min_occurrences=1, min_success_rate=0.3)
-        
-        # Exportar resumo
-        pattern_summary = discovery_engine.export_patterns_summary()
-        
-        memory.close()
+        pattern_store = PatternStore()
+        patterns = pattern_store.load_patterns()
+        pattern_summary = pattern_store.export_summary()
+        pattern_store.close()
         
         return {
             'patterns': patterns,
@@ -609,7 +578,7 @@ def render_patterns_analysis(pattern_data):
     summary = pattern_data.get('summary', {})
     
     if not patterns:
-        st.info("🔍 Nenhum padrão descoberto ainda. Execute mais ciclos de geração de código para acumular experiências.")
+        st.info("🔍 Nenhum padrão descoberto ainda. Execute mais ciclos de geração de código e a descoberta de padrões (python -m memory.pattern_discovery).")
         return
     
     # Métricas de padrões
@@ -869,8 +838,4 @@ def render_performance_metrics(system_data, graphrag_data):
             st.code(f"Ação recomendada: {alert['Ação']}")
 
 if __name__ == "__main__":
-    main()_graphrag=True)
-        discovery_engine = PatternDiscoveryEngine(memory)
-        
-        # Descobrir padrões
-        patterns
\ No newline at end of file
+    main()
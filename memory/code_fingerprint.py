@@ -0,0 +1,180 @@
+"""
+Impressão digital estrutural de código Python
+
+Uma única análise (ast.parse + tokenize para comentários) por trecho
+extrai características normalizadas, independentes de nomes e de
+vocabulário:
+  - n-gramas de tipos de nó (nó, pai>filho, avô>pai>filho);
+  - forma do fluxo de controle (def > if > raise > return ...);
+  - presença de docstrings, tratamento de erro, validação, comentários,
+    type hints, funções e retorno.
+
+As impressões digitais são guardadas em cache LRU pela hash do código. O
+hash da impressão digital (forma + características) permite agrupar
+trechos estruturalmente equivalentes em O(n) com group_by_fingerprint().
+"""
+
+import ast
+import hashlib
+import io
+import threading
+import tokenize
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+
+import numpy as np
+
+FINGERPRINT_DIMENSION = 64
+MAX_SHAPE_LENGTH = 40
+
+# Nós de fluxo de controle -> rótulo na forma
+_CONTROL_FLOW = {
+    ast.FunctionDef: "def", ast.AsyncFunctionDef: "def", ast.ClassDef: "class",
+    ast.If: "if", ast.For: "for", ast.AsyncFor: "for", ast.While: "while",
+    ast.Try: "try", ast.With: "with", ast.AsyncWith: "with",
+    ast.Return: "return", ast.Raise: "raise", ast.Assert: "assert",
+    ast.ListComp: "comp", ast.SetComp: "comp", ast.DictComp: "comp", ast.GeneratorExp: "comp",
+}
+# Nós sem informação estrutural (contexto Load/Store/Del)
+_IGNORED = (ast.expr_context,)
+
+
+@dataclass(frozen=True)
+class CodeFingerprint:
+    """Características estruturais de um trecho de código"""
+    hash: str
+    shape: str
+    features: FrozenSet[str]
+    ngrams: Dict[str, int] = field(compare=False, repr=False)
+    parsed: bool = True
+
+    def vector(self, dimension: int = FINGERPRINT_DIMENSION) -> np.ndarray:
+        """n-gramas agrupados por hashing, log-escalados e normalizados (L2)"""
+        vector = np.zeros(dimension, dtype=np.float32)
+        for gram, count in self.ngrams.items():
+            vector[zlib.crc32(gram.encode("utf-8")) % dimension] += count
+        vector = np.log1p(vector)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def _is_guard(node: ast.If) -> bool:
+    """`if <condição>: raise/return` no início do corpo (cláusula de guarda)"""
+    return bool(node.body) and isinstance(node.body[0], (ast.Raise, ast.Return))
+
+
+def _calls(node: ast.AST, names) -> bool:
+    return any(isinstance(child, ast.Call) and isinstance(child.func, ast.Name) and child.func.id in names
+               for child in ast.walk(node))
+
+
+def _has_comments(code: str) -> bool:
+    try:
+        return any(token.type == tokenize.COMMENT
+                   for token in tokenize.generate_tokens(io.StringIO(code).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return "#" in code
+
+
+def _walk(tree: ast.AST, ngrams: Counter, shape: List[str], features: set):
+    """Percurso em pré-ordem: n-gramas, forma e características num só passo"""
+    stack = [(tree, None, None)]
+    while stack:
+        node, parent, grandparent = stack.pop()
+        name = type(node).__name__
+        ngrams[name] += 1
+        if parent:
+            ngrams[f"{parent}>{name}"] += 1
+            if grandparent:
+                ngrams[f"{grandparent}>{parent}>{name}"] += 1
+
+        label = _CONTROL_FLOW.get(type(node))
+        if label and (not shape or shape[-1] != label) and len(shape) < MAX_SHAPE_LENGTH:
+            shape.append(label)
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            features.add("function")
+            if node.returns is not None or any(arg.annotation is not None for arg in
+                                               node.args.args + node.args.kwonlyargs + node.args.posonlyargs):
+                features.add("type_hints")
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) \
+                and ast.get_docstring(node):
+            features.add("docstrings")
+        if isinstance(node, ast.AnnAssign):
+            features.add("type_hints")
+        if isinstance(node, (ast.Try, ast.Raise)):
+            features.add("error_handling")
+        if isinstance(node, ast.Assert) or (isinstance(node, ast.If) and
+                                            (_is_guard(node) or _calls(node.test, {"isinstance", "validate"}))):
+            features.add("validation")
+        if isinstance(node, ast.Return) and node.value is not None:
+            features.add("return")
+
+        children = [child for child in ast.iter_child_nodes(node) if not isinstance(child, _IGNORED)]
+        stack.extend((child, name, parent) for child in reversed(children))
+
+
+def compute_fingerprint(code: str) -> CodeFingerprint:
+    """Impressão digital sem cache (uma análise do trecho)"""
+    code = code or ""
+    ngrams: Counter = Counter()
+    shape: List[str] = []
+    features: set = set()
+    try:
+        _walk(ast.parse(code), ngrams, shape, features)
+        parsed = True
+    except (SyntaxError, ValueError, RecursionError):
+        parsed = False
+    if _has_comments(code):
+        features.add("comments")
+
+    shape_text = " > ".join(shape)
+    digest = hashlib.sha1(f"{shape_text}|{','.join(sorted(features))}".encode("utf-8")).hexdigest()[:16]
+    return CodeFingerprint(hash=digest, shape=shape_text, features=frozenset(features),
+                           ngrams=dict(ngrams), parsed=parsed)
+
+
+class FingerprintCache:
+    """Cache LRU de impressões digitais chaveado pelo SHA-256 do código"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CodeFingerprint]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code: str) -> CodeFingerprint:
+        key = hashlib.sha256((code or "").encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+        result = compute_fingerprint(code)
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+
+_default_cache = FingerprintCache()
+
+
+def fingerprint(code: str, cache: Optional[FingerprintCache] = None) -> CodeFingerprint:
+    """Impressão digital do trecho (com cache)"""
+    return (cache or _default_cache).get(code)
+
+
+def structural_vector(code: str, dimension: int = FINGERPRINT_DIMENSION) -> np.ndarray:
+    """Vetor normalizado (L2) da estrutura; zeros se o código não compila"""
+    return fingerprint(code).vector(dimension)
+
+
+def group_by_fingerprint(codes: List[str]) -> Dict[str, List[int]]:
+    """Posições dos trechos agrupadas pelo hash da impressão digital (O(n))"""
+    groups: Dict[str, List[int]] = {}
+    for position, code in enumerate(codes):
+        groups.setdefault(fingerprint(code).hash, []).append(position)
+    return groups
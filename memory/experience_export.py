@@ -0,0 +1,303 @@
+"""
+Exportação e importação em fluxo do store de experiências
+
+Formato: diretório com chunks JSONL comprimidos (zstd quando o pacote
+`zstandard` está instalado, gzip caso contrário) e um manifest.json com a
+lista de chunks, contagens, checksums e o cursor (timestamp, id) da última
+experiência exportada. Cada linha é uma experiência completa (grafo +
+vetor float32 em base64), de modo que o arquivo serve para backup,
+migração entre backends (Neo4j ↔ SQLite) e seed de novos stores.
+
+A leitura do store é paginada por chave e a escrita é feita chunk a chunk,
+então a memória usada não depende do tamanho do store. Exportações e
+importações interrompidas são retomadas a partir do manifest.
+"""
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Optional
+
+import numpy as np
+
+from memory.experience_stream import ExperienceStream
+
+if TYPE_CHECKING:
+    from memory.hybrid_store import CodingExperience
+
+try:
+    import zstandard
+except ImportError:  # gzip da biblioteca padrão como alternativa
+    zstandard = None
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+IMPORT_STATE_NAME = "import_state.json"
+
+
+def default_compression() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _open_writer(path: Path, compression: str):
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Compressão zstd requer o pacote 'zstandard'")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def _open_reader(path: Path, compression: str):
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} usa zstd: instale o pacote 'zstandard'")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return gzip.open(path, "rb")
+
+
+def encode_vector(vector: Optional[List[float]]) -> Optional[str]:
+    if vector is None:
+        return None
+    return base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
+
+
+def decode_vector(data: Optional[str]) -> Optional[List[float]]:
+    if not data:
+        return None
+    return np.frombuffer(base64.b64decode(data), dtype="<f4").tolist()
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _throughput(count: int, size: int, seconds: float) -> Dict[str, float]:
+    return {
+        "seconds": seconds,
+        "experiences_per_second": count / seconds if seconds else 0.0,
+        "mb_per_second": size / 1024 ** 2 / seconds if seconds else 0.0,
+    }
+
+
+class ExperienceExporter:
+    """Exporta o store (ou um agente) para chunks JSONL comprimidos"""
+
+    def __init__(self, store, output_dir, chunk_size: int = 5000, page_size: int = 500,
+                 include_embeddings: bool = True, agent: Optional[str] = None,
+                 compression: Optional[str] = None):
+        self.store = store
+        self.output_dir = Path(output_dir)
+        self.chunk_size = chunk_size
+        self.page_size = page_size
+        self.include_embeddings = include_embeddings
+        self.agent = agent
+        self.compression = compression or default_compression()
+
+    def _iter_rows(self, cursor: Optional[List[str]]) -> Iterator[Dict[str, Any]]:
+        with ExperienceStream(self.store, page_size=self.page_size, agent=self.agent,
+                              after=tuple(cursor) if cursor else None,
+                              include_embeddings=self.include_embeddings) as stream:
+            yield from stream
+
+    def run(self, max_chunks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Exporta (ou retoma) e retorna o manifest com estatísticas de vazão.
+        max_chunks limita os chunks escritos nesta chamada.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.output_dir / MANIFEST_NAME
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as handle:
+                manifest = json.load(handle)
+            if manifest.get("agent") != self.agent:
+                raise ValueError(f"{manifest_path} pertence a outra exportação (agente {manifest.get('agent')})")
+            self.compression = manifest["compression"]
+            if manifest.get("complete"):
+                return manifest
+        else:
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "compression": self.compression,
+                "agent": self.agent,
+                "include_embeddings": self.include_embeddings,
+                "started_at": datetime.now().isoformat(),
+                "chunks": [],
+                "cursor": None,
+                "total_experiences": 0,
+                "total_bytes": 0,
+                "complete": False,
+            }
+
+        start = time.perf_counter()
+        written, written_bytes, chunks_this_run = 0, 0, 0
+        suffix = ".jsonl.zst" if self.compression == "zstd" else ".jsonl.gz"
+        rows = self._iter_rows(manifest["cursor"])
+        exhausted = False
+
+        while not exhausted:
+            if max_chunks is not None and chunks_this_run >= max_chunks:
+                break
+
+            name = f"chunk_{len(manifest['chunks']):06d}{suffix}"
+            tmp_path = self.output_dir / (name + ".tmp")
+            count, last = 0, None
+            with _open_writer(tmp_path, self.compression) as writer:
+                for row in rows:
+                    if self.include_embeddings:
+                        row["embedding"] = encode_vector(row.get("embedding"))
+                    writer.write(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                    count += 1
+                    last = row
+                    if count >= self.chunk_size:
+                        break
+                else:
+                    exhausted = True
+
+            if count == 0:
+                tmp_path.unlink(missing_ok=True)
+                break
+
+            final_path = self.output_dir / name
+            os.replace(tmp_path, final_path)
+            size = final_path.stat().st_size
+            manifest["chunks"].append({
+                "file": name,
+                "count": count,
+                "bytes": size,
+                "sha256": _sha256(final_path),
+                "last_cursor": [last["timestamp"], last["id"]],
+            })
+            manifest["cursor"] = [last["timestamp"], last["id"]]
+            manifest["total_experiences"] += count
+            manifest["total_bytes"] += size
+            _write_json_atomic(manifest_path, manifest)
+
+            written += count
+            written_bytes += size
+            chunks_this_run += 1
+            print(f"   📦 {name}: {count} experiências")
+
+        if exhausted:
+            manifest["complete"] = True
+            manifest["finished_at"] = datetime.now().isoformat()
+        manifest["last_run"] = dict(_throughput(written, written_bytes, time.perf_counter() - start),
+                                    experiences=written, bytes=written_bytes, chunks=chunks_this_run)
+        _write_json_atomic(manifest_path, manifest)
+        return manifest
+
+
+def read_archive(input_dir, skip_chunks: Optional[set] = None) -> Iterator[Dict[str, Any]]:
+    """Itera as experiências de uma exportação, chunk a chunk (valida checksums)"""
+    input_dir = Path(input_dir)
+    with open(input_dir / MANIFEST_NAME, "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Versão de formato não suportada: {manifest.get('format_version')}")
+
+    for chunk in manifest["chunks"]:
+        if skip_chunks and chunk["file"] in skip_chunks:
+            continue
+        path = input_dir / chunk["file"]
+        if _sha256(path) != chunk["sha256"]:
+            raise ValueError(f"Checksum inválido em {chunk['file']}")
+        with _open_reader(path, manifest["compression"]) as reader:
+            for line in reader:
+                if line.strip():
+                    row = json.loads(line)
+                    row["_chunk"] = chunk["file"]
+                    yield row
+
+
+def row_to_experience(row: Dict[str, Any]) -> "CodingExperience":
+    # Import local: os processos de estágio da descoberta usam encode/decode_vector
+    # e não devem carregar hybrid_store (sentence-transformers) só para isso.
+    from memory.hybrid_store import CodingExperience
+
+    return CodingExperience(
+        id=row["id"],
+        task_description=row.get("task") or "",
+        code_generated=row.get("code") or "",
+        quality_score=float(row.get("quality") or 0.0),
+        execution_success=bool(row.get("success")),
+        agent_name=row.get("agent") or "unknown",
+        llm_model=row.get("llm_model") or "imported",
+        timestamp=datetime.fromisoformat(str(row["timestamp"]).replace("Z", "+00:00")),
+        context=row.get("context") or {},
+    )
+
+
+class ExperienceImporter:
+    """Importa uma exportação para qualquer store (reaproveita os vetores)"""
+
+    def __init__(self, store, input_dir, resume: bool = True):
+        self.store = store
+        self.input_dir = Path(input_dir)
+        self.resume = resume
+        self.state_path = self.input_dir / IMPORT_STATE_NAME
+
+    def run(self, max_chunks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Importa (ou retoma) chunk a chunk. Chunks concluídos ficam registrados
+        em import_state.json; regravar experiências é idempotente nos stores.
+        """
+        state = {"chunks_done": [], "imported": 0, "failed": 0}
+        if self.resume and self.state_path.exists():
+            with open(self.state_path, "r", encoding="utf-8") as handle:
+                state = json.load(handle)
+
+        start = time.perf_counter()
+        imported, failed, chunks_this_run = 0, 0, 0
+        current = None
+
+        def finish_chunk(name):
+            state["chunks_done"].append(name)
+            _write_json_atomic(self.state_path, state)
+
+        for row in read_archive(self.input_dir, skip_chunks=set(state["chunks_done"])):
+            chunk = row.pop("_chunk")
+            if chunk != current:
+                if current is not None:
+                    finish_chunk(current)
+                    chunks_this_run += 1
+                if max_chunks is not None and chunks_this_run >= max_chunks:
+                    current = None
+                    break
+                current = chunk
+
+            try:
+                ok = self.store.store_experience(row_to_experience(row),
+                                                 embedding=decode_vector(row.get("embedding")))
+            except (KeyError, ValueError) as e:
+                print(f"   ⚠️ Experiência inválida {row.get('id')}: {e}")
+                ok = False
+            if ok:
+                imported += 1
+                state["imported"] += 1
+            else:
+                failed += 1
+                state["failed"] += 1
+
+        if current is not None:
+            finish_chunk(current)
+            chunks_this_run += 1
+
+        return dict(_throughput(imported, 0, time.perf_counter() - start),
+                    imported=imported, failed=failed, chunks=chunks_this_run,
+                    total_imported=state["imported"], chunks_done=len(state["chunks_done"]))
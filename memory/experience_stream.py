@@ -0,0 +1,138 @@
+"""
+Leitura em fluxo das experiências de um store
+
+ExperienceStream percorre o store inteiro (ou uma janela de tempo / um
+agente) com paginação por chave sobre fetch_experience_page, em ordem
+(timestamp, id), sem LIMIT fixo nem materializar o histórico:
+  - projeção: include_code=False evita ler o código, include_embeddings
+    traz os vetores armazenados junto com a página;
+  - filtros: since/until (ISO 8601) e agent;
+  - backpressure: com prefetch > 0 uma thread lê as próximas páginas numa
+    fila limitada; quando o consumidor atrasa, a fila enche e a leitura
+    para até haver espaço. A memória fica em (prefetch + 1) páginas.
+
+O cursor (timestamp, id) da última linha entregue permite retomar a
+leitura em outra execução.
+
+Uso:
+    with ExperienceStream(store, since=inicio, include_code=False) as stream:
+        for row in stream:
+            ...
+"""
+
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import GRAPHRAG_CONFIG
+
+_END = object()
+
+
+class ExperienceStream:
+    """Iterador de experiências (ou páginas) com paginação por chave"""
+
+    def __init__(self, store, page_size: Optional[int] = None, agent: Optional[str] = None,
+                 since: Optional[str] = None, until: Optional[str] = None,
+                 after: Optional[Tuple[str, str]] = None, include_code: bool = True,
+                 include_embeddings: bool = False, prefetch: Optional[int] = None):
+        config = GRAPHRAG_CONFIG["experience_stream"]
+        self.store = store
+        self.page_size = page_size or config["page_size"]
+        self.agent = agent
+        self.until = until
+        self.include_code = include_code
+        self.include_embeddings = include_embeddings
+        self.prefetch = config["prefetch_pages"] if prefetch is None else prefetch
+        # Cursor inicial: o maior entre `after` e o início da janela
+        start = (since, "") if since else None
+        self.cursor: Optional[Tuple[str, str]] = max(filter(None, (tuple(after) if after else None, start)),
+                                                     default=None)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _fetch(self, after: Optional[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        options = {}
+        if self.include_embeddings:
+            options["include_embeddings"] = True
+        if not self.include_code:
+            options["include_code"] = False
+        return self.store.fetch_experience_page(after=after, limit=self.page_size, agent=self.agent, **options)
+
+    def _read_pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """Páginas do store, cortadas em `until`"""
+        after = self.cursor
+        while not self._stop.is_set():
+            page = self._fetch(after)
+            if not page:
+                return
+            full = len(page) == self.page_size
+            after = (page[-1]["timestamp"], page[-1]["id"])
+            if self.until is not None and str(page[-1]["timestamp"]) >= self.until:
+                page = [row for row in page if str(row["timestamp"]) < self.until]
+                full = False
+            if page:
+                yield page
+            if not full:
+                return
+
+    def _offer(self, pages: "queue.Queue", item) -> bool:
+        """Coloca na fila, bloqueando enquanto cheia; False se a leitura foi interrompida"""
+        while not self._stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, pages: "queue.Queue"):
+        try:
+            for page in self._read_pages():
+                if not self._offer(pages, page):
+                    return
+        except Exception as e:  # repassado ao consumidor
+            self._offer(pages, e)
+            return
+        self._offer(pages, _END)
+
+    def pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """Páginas em ordem (timestamp, id); atualiza o cursor a cada página entregue"""
+        self._stop.clear()
+        if self.prefetch <= 0:
+            for page in self._read_pages():
+                self.cursor = (page[-1]["timestamp"], page[-1]["id"])
+                yield page
+            return
+
+        pages: "queue.Queue" = queue.Queue(maxsize=self.prefetch)
+        self._thread = threading.Thread(target=self._produce, args=(pages,), daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                page = pages.get()
+                if page is _END:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+                self.cursor = (page[-1]["timestamp"], page[-1]["id"])
+                yield page
+        finally:
+            self.close()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for page in self.pages():
+            yield from page
+
+    def close(self):
+        """Interrompe a leitura antecipada (consumidor parou antes do fim)"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,215 @@
+"""
+Agregados incrementais por agente e por (agente, domínio, dia)
+
+Cada escrita de experiência atualiza, na mesma transação, contadores no nó
+Agent e num nó AgentDomainDay: contagem, soma, soma dos quadrados,
+sucessos, mínimo e máximo da qualidade. Média, desvio padrão e taxa de
+sucesso são derivados desses campos, de modo que estatísticas de agente e
+do dashboard são leituras O(1) em vez de varrer todos os nós Experience.
+
+Os agregados representam o histórico completo: experiências removidas
+pela retenção continuam contabilizadas (assim como no ExperienceSummary).
+"""
+
+import math
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# Fragmento anexado às consultas de escrita. Requer as variáveis `agent`
+# (nó Agent) e `is_new` (experiência ainda não contabilizada) e os
+# parâmetros gerados por aggregate_params().
+AGGREGATE_UPDATE = """
+    FOREACH (_ IN CASE WHEN is_new THEN [1] ELSE [] END |
+        SET agent.exp_count = coalesce(agent.exp_count, 0) + 1,
+            agent.quality_sum = coalesce(agent.quality_sum, 0.0) + $agg_quality,
+            agent.quality_sumsq = coalesce(agent.quality_sumsq, 0.0) + $agg_quality * $agg_quality,
+            agent.success_count = coalesce(agent.success_count, 0) + CASE WHEN $agg_success THEN 1 ELSE 0 END,
+            agent.quality_min = CASE WHEN agent.quality_min IS NULL OR $agg_quality < agent.quality_min
+                                     THEN $agg_quality ELSE agent.quality_min END,
+            agent.quality_max = CASE WHEN agent.quality_max IS NULL OR $agg_quality > agent.quality_max
+                                     THEN $agg_quality ELSE agent.quality_max END,
+            agent.first_experience_at = CASE WHEN agent.first_experience_at IS NULL
+                                                  OR datetime($agg_timestamp) < agent.first_experience_at
+                                             THEN datetime($agg_timestamp) ELSE agent.first_experience_at END,
+            agent.last_experience_at = CASE WHEN agent.last_experience_at IS NULL
+                                                 OR datetime($agg_timestamp) > agent.last_experience_at
+                                            THEN datetime($agg_timestamp) ELSE agent.last_experience_at END
+        SET agent.total_experiences = agent.exp_count,
+            agent.avg_quality_score = agent.quality_sum / agent.exp_count
+
+        MERGE (stats:AgentDomainDay {agent: agent.name, domain: $agg_domain, day: $agg_day})
+        SET stats.exp_count = coalesce(stats.exp_count, 0) + 1,
+            stats.quality_sum = coalesce(stats.quality_sum, 0.0) + $agg_quality,
+            stats.quality_sumsq = coalesce(stats.quality_sumsq, 0.0) + $agg_quality * $agg_quality,
+            stats.success_count = coalesce(stats.success_count, 0) + CASE WHEN $agg_success THEN 1 ELSE 0 END,
+            stats.quality_min = CASE WHEN stats.quality_min IS NULL OR $agg_quality < stats.quality_min
+                                   THEN $agg_quality ELSE stats.quality_min END,
+            stats.quality_max = CASE WHEN stats.quality_max IS NULL OR $agg_quality > stats.quality_max
+                                   THEN $agg_quality ELSE stats.quality_max END
+        MERGE (agent)-[:HAS_DAILY_STATS]->(stats)
+    )
+"""
+
+
+def _day_of(timestamp: Any) -> str:
+    if isinstance(timestamp, datetime):
+        return timestamp.date().isoformat()
+    return str(timestamp)[:10]
+
+
+def aggregate_params(quality: float, success: bool, domain: Optional[str],
+                     timestamp: Any) -> Dict[str, Any]:
+    """Parâmetros do AGGREGATE_UPDATE para uma experiência"""
+    return {
+        "agg_quality": float(quality or 0.0),
+        "agg_success": bool(success),
+        "agg_domain": domain or "general",
+        "agg_day": _day_of(timestamp),
+        "agg_timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else str(timestamp),
+    }
+
+
+def _native(value: Any) -> Any:
+    return value.to_native() if hasattr(value, "to_native") else value
+
+
+def summarize_aggregate(props: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Deriva média, desvio padrão e taxa de sucesso dos contadores"""
+    props = props or {}
+    count = props.get("exp_count") or 0
+    if not count:
+        return {"total_experiences": 0, "avg_quality": 0.0, "quality_stddev": 0.0,
+                "success_rate": 0.0, "best_quality": None, "worst_quality": None}
+
+    mean = props.get("quality_sum", 0.0) / count
+    variance = max(props.get("quality_sumsq", 0.0) / count - mean * mean, 0.0)
+    return {
+        "total_experiences": count,
+        "avg_quality": mean,
+        "quality_stddev": math.sqrt(variance),
+        "success_rate": props.get("success_count", 0) * 100.0 / count,
+        "best_quality": props.get("quality_max"),
+        "worst_quality": props.get("quality_min"),
+        "first_experience": _native(props.get("first_experience_at")),
+        "latest_experience": _native(props.get("last_experience_at")),
+    }
+
+
+def merge_aggregates(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combina contadores de vários nós (ex.: todos os agentes)"""
+    merged: Dict[str, Any] = {"exp_count": 0, "quality_sum": 0.0, "quality_sumsq": 0.0, "success_count": 0}
+    for row in rows:
+        for key in ("exp_count", "quality_sum", "quality_sumsq", "success_count"):
+            merged[key] += row.get(key) or 0
+        for key, pick in (("quality_min", min), ("quality_max", max),
+                          ("first_experience_at", min), ("last_experience_at", max)):
+            value = row.get(key)
+            if value is not None:
+                merged[key] = value if merged.get(key) is None else pick(merged[key], value)
+    return merged
+
+
+def read_agent_performance(session, agent: str) -> Dict[str, Any]:
+    """Estatísticas de um agente (lookup pela constraint de nome)"""
+    record = session.run("MATCH (a:Agent {name: $agent}) RETURN properties(a) AS props",
+                         agent=agent).single()
+    return dict(summarize_aggregate(record["props"] if record else None), agent=agent)
+
+
+def read_agent_stats(session) -> List[Dict[str, Any]]:
+    """Estatísticas de todos os agentes, do mais ativo para o menos"""
+    result = session.run("MATCH (a:Agent) WHERE a.exp_count > 0 RETURN a.name AS agent, properties(a) AS props")
+    stats = [dict(summarize_aggregate(record["props"]), agent=record["agent"]) for record in result]
+    return sorted(stats, key=lambda s: s["total_experiences"], reverse=True)
+
+
+def read_global_stats(session) -> Dict[str, Any]:
+    """Totais do sistema somando os agregados dos agentes"""
+    result = session.run("MATCH (a:Agent) WHERE a.exp_count > 0 RETURN properties(a) AS props")
+    summary = summarize_aggregate(merge_aggregates([record["props"] for record in result]))
+    summary["max_quality"] = summary.pop("best_quality")
+    summary["min_quality"] = summary.pop("worst_quality")
+    return summary
+
+
+def read_daily_stats(session, since_day: str, agent: Optional[str] = None,
+                     domain: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Série diária (mais recente primeiro) a partir dos nós AgentDomainDay"""
+    result = session.run("""
+        MATCH (d:AgentDomainDay)
+        WHERE d.day >= $since_day
+          AND ($agent IS NULL OR d.agent = $agent)
+          AND ($domain IS NULL OR d.domain = $domain)
+        WITH d.day AS day, sum(d.exp_count) AS count, sum(d.quality_sum) AS quality_sum,
+             sum(d.success_count) AS successes
+        RETURN day, count, quality_sum, successes
+        ORDER BY day DESC
+    """, since_day=since_day, agent=agent, domain=domain)
+    return [
+        {
+            "date": record["day"],
+            "experience_count": record["count"],
+            "avg_quality": record["quality_sum"] / record["count"] if record["count"] else 0.0,
+            "success_rate": record["successes"] * 100.0 / record["count"] if record["count"] else 0.0,
+        }
+        for record in result
+    ]
+
+
+def rebuild_agent_aggregates(driver) -> Dict[str, int]:
+    """
+    Recalcula todos os agregados a partir dos nós Experience existentes
+    (migração de bases anteriores ou correção após edições manuais).
+    """
+    with driver.session() as session:
+        # Experiências do ExperienceGraphRAG identificam o agente por agent_type
+        session.run("""
+            MATCH (e:Experience)
+            WHERE e.agent_type IS NOT NULL AND NOT (e)-[:PERFORMED_BY]->(:Agent)
+            MERGE (a:Agent {name: e.agent_type})
+            MERGE (e)-[:PERFORMED_BY]->(a)
+        """).consume()
+        session.run("MATCH (d:AgentDomainDay) DETACH DELETE d").consume()
+        session.run("""
+            MATCH (a:Agent)
+            REMOVE a.exp_count, a.quality_sum, a.quality_sumsq, a.success_count,
+                   a.quality_min, a.quality_max, a.first_experience_at, a.last_experience_at
+            SET a.total_experiences = 0, a.avg_quality_score = 0.0
+        """).consume()
+
+        days = session.run("""
+            MATCH (e:Experience)-[:PERFORMED_BY]->(a:Agent)
+            OPTIONAL MATCH (e)-[:EXECUTED_TASK]->(t:Task)
+            WITH a, e, coalesce(t.domain, e.domain, 'general') AS domain,
+                 left(toString(e.timestamp), 10) AS day,
+                 coalesce(e.quality_score, 0.0) AS q,
+                 coalesce(e.execution_success, e.success, false) AS ok
+            WITH a, domain, day, collect(e) AS exps,
+                 count(e) AS n, sum(q) AS s, sum(q * q) AS s2,
+                 sum(CASE WHEN ok THEN 1 ELSE 0 END) AS successes, min(q) AS lo, max(q) AS hi
+            MERGE (d:AgentDomainDay {agent: a.name, domain: domain, day: day})
+            SET d.exp_count = n, d.quality_sum = s, d.quality_sumsq = s2,
+                d.success_count = successes, d.quality_min = lo, d.quality_max = hi
+            MERGE (a)-[:HAS_DAILY_STATS]->(d)
+            FOREACH (e IN exps | SET e.aggregated = true)
+            RETURN count(d) AS days
+        """).single()["days"]
+
+        agents = session.run("""
+            MATCH (a:Agent)-[:HAS_DAILY_STATS]->(d:AgentDomainDay)
+            WITH a, sum(d.exp_count) AS n, sum(d.quality_sum) AS s, sum(d.quality_sumsq) AS s2,
+                 sum(d.success_count) AS successes, min(d.quality_min) AS lo, max(d.quality_max) AS hi
+            CALL {
+                WITH a
+                MATCH (a)<-[:PERFORMED_BY]-(e:Experience)
+                WHERE e.timestamp IS NOT NULL
+                RETURN min(datetime(e.timestamp)) AS first, max(datetime(e.timestamp)) AS last
+            }
+            SET a.exp_count = n, a.quality_sum = s, a.quality_sumsq = s2, a.success_count = successes,
+                a.quality_min = lo, a.quality_max = hi,
+                a.first_experience_at = first, a.last_experience_at = last,
+                a.total_experiences = n, a.avg_quality_score = s / n
+            RETURN count(a) AS agents
+        """).single()["agents"]
+
+    return {"agents": agents, "agent_domain_days": days}
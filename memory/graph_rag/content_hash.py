@@ -0,0 +1,41 @@
+"""
+Identificadores estáveis endereçados por conteúdo para o grafo de experiências
+
+O hash() nativo do Python é salgado por processo (PYTHONHASHSEED), então a
+mesma tarefa/código gerava nós Task/Code novos a cada reinício. Aqui os
+identificadores derivam de SHA-256 sobre o conteúdo normalizado.
+"""
+
+import hashlib
+import re
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Comprimento do digest usado nos identificadores (128 bits)
+DIGEST_CHARS = 32
+
+
+def normalize_task(task: str) -> str:
+    """Normaliza descrição de tarefa: caixa baixa e espaços colapsados"""
+    return _WHITESPACE.sub(" ", (task or "").strip().lower())
+
+
+def normalize_code(code: str) -> str:
+    """Normaliza código: quebras de linha uniformes e sem espaços finais"""
+    lines = (code or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def content_digest(text: str) -> str:
+    """SHA-256 hexadecimal (truncado) de um texto"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:DIGEST_CHARS]
+
+
+def stable_task_id(task: str) -> str:
+    """Identificador estável de Task"""
+    return f"task_{content_digest(normalize_task(task))}"
+
+
+def stable_code_hash(code: str) -> str:
+    """Hash estável de Code"""
+    return f"code_{content_digest(normalize_code(code))}"
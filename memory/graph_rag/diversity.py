@@ -0,0 +1,96 @@
+"""
+Seleção diversa de experiências para o contexto do prompt
+
+Os candidatos da busca híbrida costumam ser quase duplicatas entre si. A
+seleção usa Maximal Marginal Relevance (MMR) sobre os embeddings:
+
+    mmr(i) = λ · sim(query, i) − (1 − λ) · max_{j ∈ selecionados} sim(i, j)
+
+escolhendo gulosamente o melhor candidato que ainda cabe no orçamento de
+tokens. Candidatos acima de duplicate_threshold de similaridade com um já
+escolhido são descartados, pois não trazem abordagem nova.
+"""
+
+from typing import Callable, Dict, List, Any, Optional
+
+import numpy as np
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata de tokens (~4 caracteres por token)"""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+def mmr_select(query_vector, candidate_vectors, costs: List[int], token_budget: int,
+               mmr_lambda: float = 0.7, max_items: Optional[int] = None,
+               duplicate_threshold: float = 0.95) -> List[int]:
+    """
+    Retorna os índices escolhidos, na ordem de seleção.
+
+    query_vector: (d,); candidate_vectors: (n, d), não precisam estar
+    normalizados; costs: tokens de cada candidato no prompt.
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    if candidates.size == 0:
+        return []
+    candidates = candidates / np.maximum(np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = candidates @ query
+    pairwise = candidates @ candidates.T
+    max_items = len(candidates) if max_items is None else max_items
+
+    selected: List[int] = []
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    remaining = token_budget
+
+    while len(selected) < max_items:
+        fits = available & (np.asarray(costs) <= remaining)
+        if not fits.any():
+            break
+        penalty = np.where(np.isfinite(redundancy), redundancy, 0.0)
+        scores = np.where(fits, mmr_lambda * relevance - (1.0 - mmr_lambda) * penalty, -np.inf)
+        best = int(np.argmax(scores))
+
+        selected.append(best)
+        remaining -= costs[best]
+        available[best] = False
+        redundancy = np.maximum(redundancy, pairwise[best])
+        available &= redundancy < duplicate_threshold
+
+    return selected
+
+
+def select_diverse(query_vector, experiences: List[Dict[str, Any]],
+                   vectors: Dict[str, Any], cost: Callable[[Dict[str, Any]], int],
+                   token_budget: int, mmr_lambda: float = 0.7,
+                   max_items: Optional[int] = None,
+                   duplicate_threshold: float = 0.95) -> List[Dict[str, Any]]:
+    """
+    Aplica mmr_select a resultados de busca (dicts com experience_id).
+    vectors mapeia experience_id -> embedding; sem vetor, o candidato
+    mantém a posição do ranking original apenas se sobrar orçamento.
+    """
+    with_vector = [exp for exp in experiences if vectors.get(exp["experience_id"]) is not None]
+    chosen = []
+    if with_vector:
+        indices = mmr_select(
+            query_vector,
+            np.vstack([np.asarray(vectors[exp["experience_id"]], dtype=np.float32) for exp in with_vector]),
+            [cost(exp) for exp in with_vector],
+            token_budget, mmr_lambda=mmr_lambda, max_items=max_items,
+            duplicate_threshold=duplicate_threshold,
+        )
+        chosen = [with_vector[i] for i in indices]
+
+    remaining = token_budget - sum(cost(exp) for exp in chosen)
+    max_items = len(experiences) if max_items is None else max_items
+    for exp in experiences:
+        if len(chosen) >= max_items:
+            break
+        if vectors.get(exp["experience_id"]) is None and cost(exp) <= remaining:
+            chosen.append(exp)
+            remaining -= cost(exp)
+    return chosen
@@ -0,0 +1,211 @@
+"""
+Registro compartilhado de drivers Neo4j
+
+Todos os componentes de grafo (GraphRAGMemoryStore, ExperienceGraphRAG,
+GraphMemory, SymbolicEvaluator, ReflectionAgent) obtêm o driver por aqui,
+de modo que um ciclo usa um único pool de conexões configurado a partir de
+DATABASE_CONFIG["neo4j"] em vez de abrir um pool por componente.
+"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+
+from neo4j import GraphDatabase
+
+from config.settings import DATABASE_CONFIG
+
+
+class SharedDriver:
+    """
+    Envelope de contagem de referências sobre um driver Neo4j.
+
+    Expõe a mesma interface usada pelo código existente (session, close,
+    verify_connectivity) e acumula métricas de utilização do pool.
+    """
+
+    def __init__(self, key: Tuple[str, str, str], driver, pool_size: int):
+        self.key = key
+        self._driver = driver
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._refcount = 0
+        self._closed = False
+        self._metrics = {
+            "sessions_opened": 0,
+            "sessions_active": 0,
+            "sessions_peak": 0,
+            "acquire_time_total": 0.0,
+            "acquire_time_max": 0.0,
+            "liveness_checks": 0,
+            "liveness_failures": 0,
+        }
+
+    def _acquire_ref(self):
+        with self._lock:
+            self._refcount += 1
+
+    def _release_ref(self) -> bool:
+        """Decrementa; True se esta era a última referência de um pool aberto"""
+        with self._lock:
+            self._refcount = max(self._refcount - 1, 0)
+            return self._refcount == 0 and not self._closed
+
+    @contextmanager
+    def session(self, **kwargs):
+        """Abre uma sessão do pool compartilhado registrando a utilização"""
+        start = time.perf_counter()
+        session = self._driver.session(**kwargs)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            m = self._metrics
+            m["sessions_opened"] += 1
+            m["sessions_active"] += 1
+            m["sessions_peak"] = max(m["sessions_peak"], m["sessions_active"])
+            m["acquire_time_total"] += elapsed
+            m["acquire_time_max"] = max(m["acquire_time_max"], elapsed)
+
+        try:
+            with session as s:
+                yield s
+        finally:
+            with self._lock:
+                self._metrics["sessions_active"] -= 1
+
+    def verify_connectivity(self):
+        """Verifica conectividade repassando ao driver subjacente"""
+        return self._driver.verify_connectivity()
+
+    def is_alive(self) -> bool:
+        """Liveness check: True se o servidor responde"""
+        with self._lock:
+            self._metrics["liveness_checks"] += 1
+        try:
+            self._driver.verify_connectivity()
+            return True
+        except Exception:
+            with self._lock:
+                self._metrics["liveness_failures"] += 1
+            return False
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Retorna métricas de utilização do pool"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            refcount = self._refcount
+        opened = metrics["sessions_opened"]
+        metrics.update({
+            "uri": self.key[0],
+            "pool_size": self.pool_size,
+            "references": refcount,
+            "utilization": metrics["sessions_active"] / self.pool_size if self.pool_size else 0.0,
+            "peak_utilization": metrics["sessions_peak"] / self.pool_size if self.pool_size else 0.0,
+            "avg_acquire_time": metrics["acquire_time_total"] / opened if opened else 0.0,
+        })
+        return metrics
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        """Libera uma referência; o pool só fecha quando ninguém mais o usa"""
+        _registry.release(self)
+
+    def _shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._driver.close()
+
+
+def _password_fingerprint(password: Optional[str]) -> str:
+    """Identifica a credencial na chave do pool sem guardar a senha em claro"""
+    return hashlib.sha256((password or "").encode("utf-8")).hexdigest()[:16]
+
+
+class _DriverRegistry:
+    """Mantém um SharedDriver por (uri, usuário, credencial)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._drivers: Dict[Tuple[str, str, str], SharedDriver] = {}
+
+    def acquire(self, uri: Optional[str] = None, user: Optional[str] = None,
+                password: Optional[str] = None) -> SharedDriver:
+        config = DATABASE_CONFIG["neo4j"]
+        uri = uri or config["uri"]
+        user = user or config["username"]
+        password = password or config["password"]
+        # Senha diferente não reaproveita um pool autenticado com outra
+        key = (uri, user, _password_fingerprint(password))
+
+        with self._lock:
+            shared = self._drivers.get(key)
+            if shared is None or shared.closed:
+                pool_size = config["pool_size"]
+                driver = GraphDatabase.driver(
+                    uri,
+                    auth=(user, password),
+                    max_connection_pool_size=pool_size,
+                    connection_acquisition_timeout=config["timeout"],
+                    connection_timeout=config.get("connection_timeout", config["timeout"]),
+                    liveness_check_timeout=config.get("liveness_check_timeout"),
+                    max_connection_lifetime=config.get("max_connection_lifetime", 3600),
+                )
+                shared = SharedDriver(key, driver, pool_size)
+                self._drivers[key] = shared
+            shared._acquire_ref()
+            return shared
+
+    def release(self, shared: SharedDriver):
+        """
+        Decremento e remoção na mesma seção crítica do registro: acquire()
+        não pode entregar um pool que está sendo fechado.
+        """
+        with self._lock:
+            if not shared._release_ref():
+                return
+            if self._drivers.get(shared.key) is shared:
+                del self._drivers[shared.key]
+        shared._shutdown()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            drivers = list(self._drivers.values())
+        return {shared.key[0]: shared.get_metrics() for shared in drivers}
+
+    def close_all(self):
+        with self._lock:
+            drivers = list(self._drivers.values())
+            self._drivers.clear()
+        for shared in drivers:
+            shared._shutdown()
+
+
+_registry = _DriverRegistry()
+
+
+def get_neo4j_driver(uri: Optional[str] = None, user: Optional[str] = None,
+                     password: Optional[str] = None) -> SharedDriver:
+    """
+    Obtém o driver compartilhado para (uri, usuário, senha), criando-o na primeira vez.
+
+    Cada chamada adiciona uma referência; chame close() no driver retornado
+    quando o componente terminar de usá-lo.
+    """
+    return _registry.acquire(uri, user, password)
+
+
+def get_pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Métricas de utilização de todos os pools ativos, por URI"""
+    return _registry.metrics()
+
+
+def close_all_drivers():
+    """Fecha todos os pools (útil no encerramento do processo ou em testes)"""
+    _registry.close_all()
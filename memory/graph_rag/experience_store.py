@@ -5,11 +5,17 @@ Sistema GraphRAG para armazenar e recuperar experiências de codificação
 import json
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-from neo4j import GraphDatabase
 import hashlib
 
+from config.settings import DATABASE_CONFIG, GRAPHRAG_CONFIG
+from memory.graph_rag.driver_registry import get_neo4j_driver
+from memory.graph_rag.fulltext import build_lucene_query, relative_bm25_links
+from memory.graph_rag.schema import bootstrap_schema
+from memory.graph_rag.aggregates import AGGREGATE_UPDATE, aggregate_params, read_agent_performance
+from memory.graph_rag.task_categories import category_link, categorize_task, read_category_stats
+
 @dataclass
 class CodingExperience:
     id: str
@@ -27,34 +33,16 @@ class CodingExperience:
 class ExperienceGraphRAG:
     """Sistema de memória experiencial baseado em grafo"""
     
-    def __init__(self, neo4j_uri="bolt://localhost:7687", user="neo4j", password="abcd1234"):
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=(user, password))
+    def __init__(self, neo4j_uri: Optional[str] = None, user: Optional[str] = None,
+                 password: Optional[str] = None):
+        # Pool compartilhado configurado por DATABASE_CONFIG["neo4j"]
+        self.driver = get_neo4j_driver(neo4j_uri, user, password)
         self._initialize_schema()
     
     def _initialize_schema(self):
-        """Inicializa schema do grafo"""
-        with self.driver.session() as session:
-            # Constraints
-            session.run("""
-                CREATE CONSTRAINT experience_id IF NOT EXISTS
-                FOR (e:Experience) REQUIRE e.id IS UNIQUE
-            """)
-            
-            session.run("""
-                CREATE CONSTRAINT pattern_name IF NOT EXISTS  
-                FOR (p:Pattern) REQUIRE p.name IS UNIQUE
-            """)
-            
-            # Indexes
-            session.run("""
-                CREATE INDEX experience_quality IF NOT EXISTS
-                FOR (e:Experience) ON (e.quality_score)
-            """)
-            
-            session.run("""
-                CREATE INDEX experience_timestamp IF NOT EXISTS
-                FOR (e:Experience) ON (e.timestamp)
-            """)
+        """Inicializa schema do grafo (constraints e índices compartilhados)"""
+        if DATABASE_CONFIG["neo4j"]["auto_schema"]:
+            bootstrap_schema(self.driver)
     
     def store_experience(self, experience: CodingExperience) -> str:
         """Armazena uma experiência de codificação"""
@@ -72,8 +60,13 @@ class ExperienceGraphRAG:
                     agent_type: $agent_type,
                     execution_result: $execution_result,
                     error: $error,
-                    context: $context
+                    context: $context,
+                    aggregated: true
                 })
+                MERGE (agent:Agent {name: $agent_type})
+                MERGE (e)-[:PERFORMED_BY]->(agent)
+                WITH e, agent, true AS is_new
+            """ + AGGREGATE_UPDATE + category_link("e") + """
                 RETURN e.id as id
             """
             
@@ -87,7 +80,10 @@ class ExperienceGraphRAG:
                 agent_type=experience.agent_type,
                 execution_result=experience.execution_result,
                 error=experience.error,
-                context=json.dumps(experience.context or {})
+                context=json.dumps(experience.context or {}),
+                task_categories=categorize_task(experience.task),
+                **aggregate_params(experience.quality_score, experience.success,
+                                   (experience.context or {}).get("domain"), experience.timestamp)
             )
             
             experience_id = result.single()["id"]
@@ -120,46 +116,51 @@ class ExperienceGraphRAG:
         )
     
     def _connect_similar_experiences(self, session, experience_id: str, task: str):
-        """Conecta experiências similares baseado na tarefa"""
-        # Buscar experiências com tarefas similares
-        query = """
-            MATCH (e1:Experience {id: $experience_id})
-            MATCH (e2:Experience) 
-            WHERE e2.id <> $experience_id 
-            AND (
-                e2.task CONTAINS $task_words[0] OR
-                e2.task CONTAINS $task_words[1] OR  
-                e2.task CONTAINS $task_words[2]
-            )
-            WITH e1, e2, 
-                 size([word IN $task_words WHERE e2.task CONTAINS word]) as similarity
-            WHERE similarity >= 2
-            MERGE (e1)-[:SIMILAR_TO {similarity: similarity}]->(e2)
         """
+        Conecta experiências similares pelo índice full-text (BM25): custo
+        limitado aos melhores candidatos, sem varrer todas as experiências.
+        """
+        text_query = build_lucene_query(task)
+        if not text_query:
+            return
         
-        # Extrair palavras-chave da tarefa
-        task_words = [word.lower() for word in task.split() if len(word) > 3][:5]
+        links_config = GRAPHRAG_CONFIG["similarity_links"]
+        hits = session.run("""
+            CALL db.index.fulltext.queryNodes('experience_task_fulltext', $text_query, {limit: $candidates})
+            YIELD node, score
+            RETURN node.id AS id, score
+        """,
+            text_query=text_query,
+            candidates=links_config["fulltext_candidates"]
+        ).data()
         
-        session.run(query, 
-            experience_id=experience_id,
-            task_words=task_words
-        )
+        links = relative_bm25_links(hits, experience_id, links_config["max_links"],
+                                    links_config["min_similarity"])
+        if not links:
+            return
+        
+        session.run("""
+            MATCH (e1:Experience {id: $experience_id})
+            UNWIND $links AS link
+            MATCH (e2:Experience {id: link.id})
+            MERGE (e1)-[r:SIMILAR_TO]->(e2)
+            SET r.similarity = link.similarity, r.method = 'bm25'
+        """, experience_id=experience_id, links=links)
     
     def retrieve_similar_experiences(self, task: str, limit: int = 5, min_quality: float = 6.0) -> List[Dict]:
-        """Recupera experiências similares para uma tarefa"""
+        """Recupera experiências similares para uma tarefa (ranking BM25 do índice full-text)"""
+        
+        text_query = build_lucene_query(task)
+        if not text_query:
+            return []
         
         with self.driver.session() as session:
             query = """
-                MATCH (e:Experience)
+                CALL db.index.fulltext.queryNodes('experience_task_fulltext', $text_query, {limit: $candidates})
+                YIELD node AS e, score
                 WHERE e.quality_score >= $min_quality
                 AND e.success = true
-                AND (
-                    e.task CONTAINS $task_words[0] OR
-                    e.task CONTAINS $task_words[1] OR
-                    e.task CONTAINS $task_words[2]
-                )
-                WITH e, 
-                     size([word IN $task_words WHERE e.task CONTAINS word]) as relevance
+                WITH e, score AS relevance
                 ORDER BY relevance DESC, e.quality_score DESC, e.timestamp DESC
                 LIMIT $limit
                 
@@ -175,10 +176,9 @@ class ExperienceGraphRAG:
                        collect(p.name) as patterns
             """
             
-            task_words = [word.lower() for word in task.split() if len(word) > 3][:5]
-            
             result = session.run(query,
-                task_words=task_words,
+                text_query=text_query,
+                candidates=max(limit * 5, GRAPHRAG_CONFIG["similarity_links"]["fulltext_candidates"]),
                 min_quality=min_quality,
                 limit=limit
             )
@@ -198,6 +198,32 @@ class ExperienceGraphRAG:
             
             return experiences
     
+    def fetch_experience_page(self, after: Optional[Tuple[str, str]] = None, limit: int = 500,
+                              agent: Optional[str] = None,
+                              include_code: bool = True) -> List[Dict[str, Any]]:
+        """
+        Página de experiências em ordem (timestamp, id) a partir do cursor
+        `after` (paginação por chave, mesmo formato dos memory stores).
+        Com include_code=False a propriedade code não é lida. Só nós gravados
+        por esta classe (timestamp texto, agent_type), pela mesma razão do
+        GraphRAGMemoryStore.fetch_experience_page.
+        """
+        after_ts, after_id = after if after else (None, None)
+        with self.driver.session() as session:
+            result = session.run(f"""
+                MATCH (e:Experience)
+                WHERE e.timestamp IS NOT NULL AND e.agent_type IS NOT NULL
+                  AND ($agent IS NULL OR e.agent_type = $agent)
+                  AND ($after_ts IS NULL OR e.timestamp > $after_ts
+                       OR (e.timestamp = $after_ts AND e.id > $after_id))
+                RETURN e.id AS id, e.task AS task, {"e.code" if include_code else "null"} AS code,
+                       e.quality_score AS quality, e.success AS success,
+                       e.agent_type AS agent, toString(e.timestamp) AS timestamp
+                ORDER BY e.timestamp, e.id
+                LIMIT $limit
+            """, agent=agent, after_ts=after_ts, after_id=after_id, limit=limit)
+            return [record.data() for record in result]
+    
     def discover_patterns(self, min_frequency: int = 3) -> List[Dict]:
         """Descobre padrões emergentes nas experiências"""
         
@@ -233,68 +259,38 @@ class ExperienceGraphRAG:
             return patterns
     
     def get_agent_performance(self, agent_type: str) -> Dict:
-        """Analisa performance de um tipo de agente"""
+        """Analisa performance de um tipo de agente (agregados incrementais, O(1))"""
         
         with self.driver.session() as session:
-            query = """
-                MATCH (e:Experience {agent_type: $agent_type})
-                RETURN count(e) as total_experiences,
-                       avg(e.quality_score) as avg_quality,
-                       sum(case when e.success then 1 else 0 end) as successes,
-                       count(case when e.success then 1 end) * 100.0 / count(e) as success_rate,
-                       max(e.quality_score) as best_quality,
-                       min(e.timestamp) as first_experience,
-                       max(e.timestamp) as latest_experience
-            """
-            
-            result = session.run(query, agent_type=agent_type)
-            record = result.single()
-            
-            if record:
-                return {
-                    "agent_type": agent_type,
-                    "total_experiences": record["total_experiences"],
-                    "avg_quality": record["avg_quality"],
-                    "success_rate": record["success_rate"],
-                    "best_quality": record["best_quality"],
-                    "first_experience": record["first_experience"],
-                    "latest_experience": record["latest_experience"]
-                }
-            else:
-                return {"agent_type": agent_type, "total_experiences": 0}
+            stats = read_agent_performance(session, agent_type)
+        
+        stats.pop("agent", None)
+        return dict(stats, agent_type=agent_type)
+    
+    def get_category_stats(self, categories: List[str], agent_type: Optional[str] = None) -> Dict[str, Dict]:
+        """Estatísticas por categoria de tarefa (uma consulta agrupada)"""
+        with self.driver.session() as session:
+            return read_category_stats(session, categories, agent=agent_type)
     
     def find_knowledge_gaps(self, task_categories: List[str]) -> List[Dict]:
         """Identifica lacunas de conhecimento"""
         
         gaps = []
         
-        with self.driver.session() as session:
-            for category in task_categories:
-                query = """
-                    MATCH (e:Experience)
-                    WHERE e.task CONTAINS $category
-                    RETURN count(e) as experience_count,
-                           avg(e.quality_score) as avg_quality,
-                           sum(case when e.success then 1 else 0 end) as successes
-                """
-                
-                result = session.run(query, category=category)
-                record = result.single()
-                
-                if record:
-                    count = record["experience_count"]
-                    avg_quality = record["avg_quality"] or 0
-                    success_rate = (record["successes"] / count * 100) if count > 0 else 0
-                    
-                    # Considera gap se poucos exemplos ou baixa qualidade
-                    if count < 5 or avg_quality < 7.0 or success_rate < 80:
-                        gaps.append({
-                            "category": category,
-                            "experience_count": count,
-                            "avg_quality": avg_quality,
-                            "success_rate": success_rate,
-                            "severity": self._calculate_gap_severity(count, avg_quality, success_rate)
-                        })
+        for category, stats in self.get_category_stats(task_categories).items():
+            count = stats["count"]
+            avg_quality = stats["avg_quality"]
+            success_rate = stats["success_rate"]
+            
+            # Considera gap se poucos exemplos ou baixa qualidade
+            if count < 5 or avg_quality < 7.0 or success_rate < 80:
+                gaps.append({
+                    "category": category,
+                    "experience_count": count,
+                    "avg_quality": avg_quality,
+                    "success_rate": success_rate,
+                    "severity": self._calculate_gap_severity(count, avg_quality, success_rate)
+                })
         
         return sorted(gaps, key=lambda x: x["severity"], reverse=True)
     
@@ -323,7 +319,7 @@ class ExperienceGraphRAG:
         return severity
     
     def close(self):
-        """Fecha conexão com banco"""
+        """Libera a referência ao pool compartilhado"""
         self.driver.close()
 
 # Função helper para criar experiências
@@ -0,0 +1,63 @@
+"""
+Utilitários para consultas full-text (Lucene) nos índices do Neo4j
+"""
+
+import re
+from typing import Dict, List, Any
+
+# Caracteres com significado especial na sintaxe de consulta do Lucene
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Palavras muito comuns nas descrições de tarefas que não ajudam no ranking
+STOP_WORDS = {
+    "que", "uma", "para", "com", "dos", "das", "the", "and", "for", "with",
+    "criar", "create", "função", "function", "implementar", "implement",
+}
+
+
+def escape_lucene(term: str) -> str:
+    """Escapa caracteres especiais do Lucene"""
+    return _LUCENE_SPECIAL.sub(r"\\\1", term)
+
+
+def extract_terms(text: str, min_length: int = 3, max_terms: int = 8) -> List[str]:
+    """Extrai termos relevantes (sem duplicatas, na ordem de aparição)"""
+    terms = []
+    for word in _WORD.findall((text or "").lower()):
+        if len(word) >= min_length and word not in STOP_WORDS and word not in terms:
+            terms.append(word)
+        if len(terms) >= max_terms:
+            break
+    return terms
+
+
+def build_lucene_query(text: str, max_terms: int = 8) -> str:
+    """
+    Monta consulta OR sobre os termos da tarefa, com busca aproximada (~)
+    para tolerar variações de flexão. String vazia se não houver termos.
+    """
+    terms = extract_terms(text, max_terms=max_terms)
+    return " OR ".join(f"{escape_lucene(term)}~" for term in terms)
+
+
+def relative_bm25_links(hits: List[Dict[str, Any]], self_id: str, max_links: int,
+                        min_similarity: float) -> List[Dict[str, Any]]:
+    """
+    Converte hits BM25 ({id, score}) em arestas com similaridade em [0, 1].
+
+    Scores BM25 não têm escala fixa; a referência é o score da própria
+    experiência para a consulta (ou o maior score, se ela não estiver
+    entre os hits).
+    """
+    others = [hit for hit in hits if hit["id"] != self_id]
+    reference = next((hit["score"] for hit in hits if hit["id"] == self_id), None)
+    if reference is None:
+        reference = max((hit["score"] for hit in others), default=0.0)
+    if not reference:
+        return []
+
+    links = [{"id": hit["id"], "similarity": min(hit["score"] / reference, 1.0)} for hit in others]
+    links = [link for link in links if link["similarity"] >= min_similarity]
+    links.sort(key=lambda link: link["similarity"], reverse=True)
+    return links[:max_links]
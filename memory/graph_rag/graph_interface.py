@@ -3,16 +3,10 @@ Módulo de integração com Neo4j para representar e consultar a memória simbó
 Inclui implementação mock para quando o Neo4j não está disponível.
 """
 
-from neo4j import GraphDatabase, exceptions
-import os
-from dotenv import load_dotenv
+from neo4j import exceptions
 from typing import List, Dict, Optional
 
-load_dotenv()
-
-NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-NEO4J_USER = os.getenv("NEO4J_USERNAME", "neo4j")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+from memory.graph_rag.driver_registry import get_neo4j_driver
 
 
 class MockGraphMemory:
@@ -52,7 +46,7 @@ class MockGraphMemory:
 
 class GraphMemory:
     def __init__(self):
-        self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        self.driver = get_neo4j_driver()
 
     def close(self):
         self.driver.close()
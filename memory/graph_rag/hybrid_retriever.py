@@ -0,0 +1,198 @@
+"""
+Recuperação híbrida: busca vetorial + expansão no grafo com fusão de rankings
+
+As duas etapas rodam em paralelo; os rankings são combinados por
+Reciprocal Rank Fusion (RRF) ponderado por qualidade e recência.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional
+
+from config.settings import GRAPHRAG_CONFIG
+
+# Assinatura das etapas: (query, limit, filters) -> lista ordenada de resultados
+SearchStage = Callable[[str, int, Dict[str, Any]], List[Dict[str, Any]]]
+
+FILTER_KEYS = ("agent", "domain", "min_quality")
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mantém apenas filtros conhecidos e com valor"""
+    filters = filters or {}
+    return {key: filters[key] for key in FILTER_KEYS if filters.get(key) is not None}
+
+
+def build_chroma_where(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Traduz filtros de metadados para a cláusula where do ChromaDB"""
+    conditions = []
+    if "agent" in filters:
+        conditions.append({"agent": {"$eq": filters["agent"]}})
+    if "domain" in filters:
+        conditions.append({"domain": {"$eq": filters["domain"]}})
+    if "min_quality" in filters:
+        conditions.append({"quality": {"$gte": float(filters["min_quality"])}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def _age_days(timestamp: Any, now: datetime) -> Optional[float]:
+    if not timestamp:
+        return None
+    try:
+        if not isinstance(timestamp, datetime):
+            timestamp = datetime.fromisoformat(str(timestamp)[:26])
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.replace(tzinfo=None)
+        return max((now - timestamp).total_seconds() / 86400.0, 0.0)
+    except (ValueError, TypeError):
+        return None
+
+
+def reciprocal_rank_fusion(ranked_lists: Dict[str, List[Dict[str, Any]]],
+                           rrf_k: int = 60,
+                           quality_weight: float = 0.0,
+                           recency_weight: float = 0.0,
+                           recency_half_life_days: float = 30.0,
+                           now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Funde rankings por RRF: score = Σ 1 / (rrf_k + rank).
+
+    O score final é multiplicado por (1 + quality_weight * quality/10
+    + recency_weight * 0.5 ** (idade / meia-vida)).
+    """
+    now = now or datetime.now()
+    fused: Dict[str, Dict[str, Any]] = {}
+
+    for source, results in ranked_lists.items():
+        for rank, item in enumerate(results, 1):
+            exp_id = item["experience_id"]
+            entry = fused.get(exp_id)
+            if entry is None:
+                entry = dict(item)
+                entry["rrf_score"] = 0.0
+                entry["sources"] = []
+                fused[exp_id] = entry
+            else:
+                # Completar campos ausentes com os da outra etapa
+                for key, value in item.items():
+                    if entry.get(key) in (None, "") and value not in (None, ""):
+                        entry[key] = value
+            entry["rrf_score"] += 1.0 / (rrf_k + rank)
+            entry["sources"].append(source)
+
+    for entry in fused.values():
+        boost = 1.0
+        if quality_weight:
+            boost += quality_weight * min(max(float(entry.get("quality") or 0) / 10.0, 0.0), 1.0)
+        if recency_weight:
+            age = _age_days(entry.get("timestamp"), now)
+            if age is not None:
+                boost += recency_weight * 0.5 ** (age / recency_half_life_days)
+        entry["fusion_score"] = entry["rrf_score"] * boost
+
+    return sorted(fused.values(), key=lambda e: e["fusion_score"], reverse=True)
+
+
+class RetrievalResults(list):
+    """Ranking fundido; failed_stages não vazio indica resultado parcial (não cacheável)"""
+
+    def __init__(self, items=(), failed_stages=()):
+        super().__init__(items)
+        self.failed_stages: List[str] = list(failed_stages)
+
+
+class HybridRetriever:
+    """
+    Executa busca vetorial e expansão no grafo concorrentemente e funde os
+    resultados. As etapas são injetadas pelo store (Neo4j+Chroma ou local).
+    """
+
+    STAGES = ("vector", "graph", "fusion", "total")
+
+    def __init__(self, vector_search: SearchStage, graph_search: Optional[SearchStage] = None,
+                 config: Optional[Dict[str, Any]] = None):
+        self.vector_search = vector_search
+        self.graph_search = graph_search
+        self.config = dict(GRAPHRAG_CONFIG["retrieval"], **(config or {}))
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hybrid-retrieval")
+        self._lock = threading.Lock()
+        self.last_timings: Dict[str, float] = {}
+        self._latency_totals = {stage: 0.0 for stage in self.STAGES}
+        self._latency_max = {stage: 0.0 for stage in self.STAGES}
+        self._queries = 0
+
+    def _timed(self, stage: SearchStage, query: str, limit: int, filters: Dict[str, Any]):
+        start = time.perf_counter()
+        failed = False
+        try:
+            results = stage(query, limit, filters)
+        except Exception as e:
+            print(f"⚠️ Etapa de recuperação falhou: {e}")
+            results, failed = [], True
+        return results, time.perf_counter() - start, failed
+
+    def retrieve(self, query: str, k: int = 5,
+                 filters: Optional[Dict[str, Any]] = None) -> RetrievalResults:
+        """
+        Retorna as k melhores experiências pela fusão dos dois rankings.
+        Uma etapa que falha contribui com lista vazia e aparece em failed_stages.
+        """
+        start = time.perf_counter()
+        filters = normalize_filters(filters)
+        candidates = max(k * self.config["candidate_multiplier"], k)
+
+        vector_future = self._executor.submit(self._timed, self.vector_search, query, candidates, filters)
+        graph_future = None
+        if self.graph_search is not None:
+            graph_future = self._executor.submit(self._timed, self.graph_search, query, candidates, filters)
+
+        vector_results, vector_time, vector_failed = vector_future.result()
+        graph_results, graph_time, graph_failed = graph_future.result() if graph_future else ([], 0.0, False)
+
+        fusion_start = time.perf_counter()
+        fused = reciprocal_rank_fusion(
+            {"vector": vector_results, "graph": graph_results},
+            rrf_k=self.config["rrf_k"],
+            quality_weight=self.config["quality_weight"],
+            recency_weight=self.config["recency_weight"],
+            recency_half_life_days=self.config["recency_half_life_days"],
+        )[:k]
+        fusion_time = time.perf_counter() - fusion_start
+
+        self._record({
+            "vector": vector_time,
+            "graph": graph_time,
+            "fusion": fusion_time,
+            "total": time.perf_counter() - start,
+        })
+        failed = [stage for stage, flag in (("vector", vector_failed), ("graph", graph_failed)) if flag]
+        return RetrievalResults(fused, failed_stages=failed)
+
+    def _record(self, timings: Dict[str, float]):
+        with self._lock:
+            self.last_timings = timings
+            self._queries += 1
+            for stage, value in timings.items():
+                self._latency_totals[stage] += value
+                self._latency_max[stage] = max(self._latency_max[stage], value)
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Latência por etapa: última consulta, média e máximo (segundos)"""
+        with self._lock:
+            queries = self._queries
+            return {
+                "queries": queries,
+                "last": dict(self.last_timings),
+                "avg": {s: (t / queries if queries else 0.0) for s, t in self._latency_totals.items()},
+                "max": dict(self._latency_max),
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,264 @@
+"""
+Motor de retenção e compactação de experiências
+
+Aplica os limites de GRAPHRAG_CONFIG["experience_storage"]: quando um agente
+passa de max_experiences_per_agent, mantém as experiências de maior valor
+(com ao menos uma por domínio) até max * cleanup_threshold, resume as demais
+em nós ExperienceSummary (compress_old_experiences) e remove os vetores
+correspondentes do ChromaDB.
+
+A remoção é feita em lotes limitados por execução. Experiências escolhidas
+são marcadas com pending_delete antes de apagar os vetores, de modo que uma
+falha no ChromaDB é retomada na execução seguinte sem deixar vetores órfãos.
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from config.settings import GRAPHRAG_CONFIG
+
+# Bytes por vetor armazenado (float32)
+VECTOR_BYTES = GRAPHRAG_CONFIG["vector_store"]["dimension"] * 4
+
+
+def _age_days(timestamp: Any, now: datetime) -> float:
+    if timestamp is None:
+        return 0.0
+    if hasattr(timestamp, "to_native"):
+        timestamp = timestamp.to_native()
+    if not isinstance(timestamp, datetime):
+        try:
+            timestamp = datetime.fromisoformat(str(timestamp)[:26])
+        except ValueError:
+            return 0.0
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.replace(tzinfo=None)
+    return max((now - timestamp).total_seconds() / 86400.0, 0.0)
+
+
+def experience_value(quality: float, success: bool, age_days: float,
+                     half_life_days: float = 30.0) -> float:
+    """Valor de retenção: qualidade domina, sucesso e recência desempatam"""
+    quality_part = min(max((quality or 0.0) / 10.0, 0.0), 1.0) * 0.6
+    success_part = 0.3 if success else 0.0
+    recency_part = 0.1 * 0.5 ** (age_days / half_life_days)
+    return quality_part + success_part + recency_part
+
+
+def select_for_pruning(rows: List[Dict[str, Any]], max_keep: int,
+                       min_age_days: Optional[float] = None,
+                       now: Optional[datetime] = None) -> List[str]:
+    """
+    Escolhe ids a remover mantendo os max_keep de maior valor.
+
+    A melhor experiência de cada domínio é mantida antes das demais, para
+    que nenhum domínio desapareça da memória. Com min_age_days, apenas
+    experiências mais antigas que isso podem ser removidas.
+    Retorna ids em ordem crescente de valor.
+    """
+    now = now or datetime.now()
+    scored = []
+    for row in rows:
+        age = _age_days(row.get("timestamp"), now)
+        value = experience_value(row.get("quality", 0.0), row.get("success", False), age)
+        scored.append((value, age, row))
+    scored.sort(key=lambda item: item[0], reverse=True)
+
+    keep = set()
+    seen_domains = set()
+    for value, age, row in scored:
+        domain = row.get("domain") or "general"
+        if domain not in seen_domains and len(keep) < max_keep:
+            seen_domains.add(domain)
+            keep.add(row["id"])
+    for value, age, row in scored:
+        if len(keep) >= max_keep:
+            break
+        keep.add(row["id"])
+
+    prune = [
+        (value, row["id"]) for value, age, row in scored
+        if row["id"] not in keep and (min_age_days is None or age >= min_age_days)
+    ]
+    prune.sort()
+    return [exp_id for _, exp_id in prune]
+
+
+class ExperienceRetentionEngine:
+    """Poda incremental de experiências no Neo4j e no ChromaDB"""
+
+    def __init__(self, driver, vector_collection=None, config: Optional[Dict[str, Any]] = None):
+        self.driver = driver
+        self.vectors = vector_collection
+        self.config = dict(GRAPHRAG_CONFIG["experience_storage"], **(config or {}))
+
+    def run(self, max_age_days: Optional[float] = None, batch_size: Optional[int] = None,
+            max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Executa uma rodada limitada de retenção.
+        Retorna relatório com contagens e bytes recuperados.
+        """
+        start = time.perf_counter()
+        batch_size = batch_size or self.config["retention_batch_size"]
+        max_batches = max_batches or self.config["retention_max_batches"]
+        max_per_agent = self.config["max_experiences_per_agent"]
+        target = max(int(max_per_agent * self.config["cleanup_threshold"]), 1)
+
+        report = {
+            "agents_over_limit": [],
+            "experiences_removed": 0,
+            "experiences_summarized": 0,
+            "vectors_removed": 0,
+            "code_nodes_removed": 0,
+            "task_nodes_removed": 0,
+            "bytes_reclaimed": 0,
+            "batches": 0,
+            "complete": True,
+        }
+
+        # Retomar remoções interrompidas antes de escolher novas
+        pending = set(self._pending_ids())
+        to_remove: List[str] = list(pending)
+
+        for agent, count in self._agent_counts():
+            if count <= max_per_agent:
+                continue
+            report["agents_over_limit"].append({"agent": agent, "count": count})
+            rows = self._agent_rows(agent)
+            to_remove.extend(i for i in select_for_pruning(rows, target, max_age_days) if i not in pending)
+
+        for offset in range(0, len(to_remove), batch_size):
+            if report["batches"] >= max_batches:
+                report["complete"] = False
+                break
+            batch = to_remove[offset:offset + batch_size]
+            self._process_batch(batch, report, already_summarized=pending)
+            report["batches"] += 1
+
+        report["duration"] = time.perf_counter() - start
+        return report
+
+    def _agent_counts(self) -> List[tuple]:
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (e:Experience)-[:PERFORMED_BY]->(a:Agent)
+                WHERE e.pending_delete IS NULL
+                RETURN a.name AS agent, count(e) AS count
+            """)
+            return [(record["agent"], record["count"]) for record in result]
+
+    def _agent_rows(self, agent: str) -> List[Dict[str, Any]]:
+        """Projeção leve (sem código) das experiências do agente"""
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (e:Experience)-[:PERFORMED_BY]->(:Agent {name: $agent})
+                WHERE e.pending_delete IS NULL
+                OPTIONAL MATCH (e)-[:EXECUTED_TASK]->(t:Task)
+                RETURN e.id AS id, t.domain AS domain, e.quality_score AS quality,
+                       e.execution_success AS success, e.timestamp AS timestamp
+            """, agent=agent)
+            return [dict(record) for record in result]
+
+    def _pending_ids(self) -> List[str]:
+        with self.driver.session() as session:
+            result = session.run("MATCH (e:Experience) WHERE e.pending_delete = true RETURN e.id AS id")
+            return [record["id"] for record in result]
+
+    def _process_batch(self, ids: List[str], report: Dict[str, Any], already_summarized: set):
+        fresh = [i for i in ids if i not in already_summarized]
+
+        # 1. Resumir e marcar (mesma transação)
+        if fresh:
+            with self.driver.session() as session:
+                summarized = session.execute_write(self._summarize_and_mark, fresh,
+                                                   self.config["compress_old_experiences"])
+            report["experiences_summarized"] += summarized
+
+        # 2. Vetores: se falhar, os nós continuam marcados e a próxima execução retoma
+        if self.vectors is not None:
+            self.vectors.delete(ids=ids)
+            report["vectors_removed"] += len(ids)
+            report["bytes_reclaimed"] += len(ids) * VECTOR_BYTES
+
+        # 3. Nós do grafo e conteúdo órfão
+        with self.driver.session() as session:
+            removed = session.execute_write(self._delete_marked, ids)
+        for key in ("experiences_removed", "code_nodes_removed", "task_nodes_removed", "bytes_reclaimed"):
+            report[key] += removed[key]
+
+    @staticmethod
+    def _summarize_and_mark(tx, ids: List[str], compress: bool) -> int:
+        if compress:
+            tx.run("""
+                UNWIND $ids AS id
+                MATCH (e:Experience {id: id})-[:PERFORMED_BY]->(a:Agent)
+                OPTIONAL MATCH (e)-[:EXECUTED_TASK]->(t:Task)
+                WITH a, coalesce(t.domain, 'general') AS domain, collect(e) AS exps
+                MERGE (s:ExperienceSummary {agent: a.name, domain: domain})
+                ON CREATE SET s.count = 0, s.success_count = 0, s.quality_sum = 0.0,
+                              s.sample_tasks = []
+                SET s.count = s.count + size(exps),
+                    s.success_count = s.success_count + size([x IN exps WHERE x.execution_success]),
+                    s.quality_sum = s.quality_sum + reduce(acc = 0.0, x IN exps | acc + coalesce(x.quality_score, 0.0)),
+                    s.best_quality = reduce(best = coalesce(s.best_quality, 0.0), x IN exps |
+                        CASE WHEN coalesce(x.quality_score, 0.0) > best THEN x.quality_score ELSE best END),
+                    s.sample_tasks = (s.sample_tasks + [x IN exps | x.task_description])[..5],
+                    s.updated_at = datetime()
+                SET s.avg_quality = s.quality_sum / s.count
+                MERGE (a)-[:HAS_SUMMARY]->(s)
+            """, ids=ids)
+
+        record = tx.run("""
+            UNWIND $ids AS id
+            MATCH (e:Experience {id: id})
+            SET e.pending_delete = true
+            RETURN count(e) AS marked
+        """, ids=ids).single()
+        return record["marked"] if compress else 0
+
+    @staticmethod
+    def _delete_marked(tx, ids: List[str]) -> Dict[str, int]:
+        refs = tx.run("""
+            UNWIND $ids AS id
+            MATCH (e:Experience {id: id})
+            WHERE e.pending_delete = true
+            OPTIONAL MATCH (e)-[:GENERATED_CODE]->(c:Code)
+            OPTIONAL MATCH (e)-[:EXECUTED_TASK]->(t:Task)
+            RETURN collect(DISTINCT c.hash) AS code_hashes,
+                   collect(DISTINCT t.id) AS task_ids,
+                   count(DISTINCT e) AS experiences,
+                   sum(size(coalesce(e.task_description, ''))) AS text_bytes
+        """, ids=ids).single()
+
+        tx.run("""
+            UNWIND $ids AS id
+            MATCH (e:Experience {id: id})
+            WHERE e.pending_delete = true
+            DETACH DELETE e
+        """, ids=ids)
+
+        codes = tx.run("""
+            UNWIND $hashes AS h
+            MATCH (c:Code {hash: h})
+            WHERE NOT (c)<-[:GENERATED_CODE]-()
+            WITH c, coalesce(c.size_bytes, size(coalesce(c.content, ''))) AS bytes
+            DETACH DELETE c
+            RETURN count(*) AS removed, sum(bytes) AS bytes
+        """, hashes=refs["code_hashes"]).single()
+
+        tasks = tx.run("""
+            UNWIND $task_ids AS tid
+            MATCH (t:Task {id: tid})
+            WHERE NOT (t)<-[:EXECUTED_TASK]-()
+            WITH t, size(coalesce(t.description, '')) AS bytes
+            DETACH DELETE t
+            RETURN count(*) AS removed, sum(bytes) AS bytes
+        """, task_ids=refs["task_ids"]).single()
+
+        return {
+            "experiences_removed": refs["experiences"],
+            "code_nodes_removed": codes["removed"] or 0,
+            "task_nodes_removed": tasks["removed"] or 0,
+            "bytes_reclaimed": (refs["text_bytes"] or 0) + (codes["bytes"] or 0) + (tasks["bytes"] or 0),
+        }
@@ -0,0 +1,131 @@
+"""
+Cache de resultados de recuperação com invalidação por escrita
+
+Entradas são chaveadas por (consulta normalizada, k, filtros, modo) e
+marcadas com a geração vigente do store. Cada escrita de experiência
+incrementa a geração, invalidando exatamente os resultados que poderiam
+mudar. TTL e limites de entradas/bytes mantêm o cache pequeno.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,;:!?\"'"
+
+
+def normalize_query(query: str) -> str:
+    """Normaliza consulta para que variações triviais compartilhem a entrada"""
+    text = unicodedata.normalize("NFKC", query or "").casefold()
+    return _WHITESPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+
+
+def _estimate_size(value: Any) -> int:
+    """Estimativa barata do tamanho em bytes de um resultado"""
+    if isinstance(value, str):
+        return len(value) + 49
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_estimate_size(v) for v in value)
+    return 28
+
+
+class RetrievalCache:
+    """LRU com geração, TTL e limite de memória"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 4 * 1024 * 1024,
+                 ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[int, float, int, List[Dict]]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(query: str, k: int, filters: Optional[Dict[str, Any]] = None,
+                 mode: str = "vector") -> Tuple:
+        items = tuple(sorted((key, value) for key, value in (filters or {}).items() if value is not None))
+        return (mode, normalize_query(query), k, items)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self):
+        """Chamado após cada escrita: entradas de gerações anteriores expiram"""
+        with self._lock:
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def get(self, key: Tuple) -> Optional[List[Dict]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            generation, expires_at, size, results = entry
+            if generation != self._generation or now >= expires_at:
+                self._drop(key, size)
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        # Cópias rasas: chamadores podem anotar os dicionários
+        return [dict(item) for item in results]
+
+    def put(self, key: Tuple, results: List[Dict], generation: Optional[int] = None):
+        """
+        Armazena resultados. Passe a geração lida antes da consulta para não
+        guardar um resultado calculado antes de uma escrita concorrente.
+        """
+        size = _estimate_size(results)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            generation = self._generation if generation is None else generation
+            if generation != self._generation:
+                return
+
+            if key in self._entries:
+                self._drop(key, self._entries[key][2])
+
+            self._entries[key] = (generation, time.monotonic() + self.ttl_seconds, size,
+                                  [dict(item) for item in results])
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                old_key, (_, _, old_size, _) = next(iter(self._entries.items()))
+                self._drop(old_key, old_size)
+                self._stats["evictions"] += 1
+
+    def _drop(self, key: Tuple, size: int):
+        del self._entries[key]
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                generation=self._generation,
+                hit_rate=self._stats["hits"] / lookups if lookups else 0.0,
+            )
@@ -0,0 +1,225 @@
+"""
+Gerenciador de schema Neo4j para o modelo GraphRAG
+
+Cria de forma idempotente as constraints de unicidade e os índices
+(range e full-text) usados pelas consultas quentes, verifica o schema na
+inicialização e oferece uma checagem de planos que acusa consultas que
+caem em varredura por label.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class SchemaItem:
+    """Constraint ou índice do schema"""
+    name: str
+    kind: str  # "unique", "range" ou "fulltext"
+    label: str
+    properties: Tuple[str, ...]
+
+    def ddl(self) -> str:
+        if self.kind == "unique":
+            props = ", ".join(f"n.{p}" for p in self.properties)
+            if len(self.properties) > 1:
+                props = f"({props})"
+            return (f"CREATE CONSTRAINT {self.name} IF NOT EXISTS "
+                    f"FOR (n:{self.label}) REQUIRE {props} IS UNIQUE")
+        if self.kind == "range":
+            props = ", ".join(f"n.{p}" for p in self.properties)
+            return f"CREATE INDEX {self.name} IF NOT EXISTS FOR (n:{self.label}) ON ({props})"
+        if self.kind == "fulltext":
+            props = ", ".join(f"n.{p}" for p in self.properties)
+            return (f"CREATE FULLTEXT INDEX {self.name} IF NOT EXISTS "
+                    f"FOR (n:{self.label}) ON EACH [{props}]")
+        raise ValueError(f"Tipo de schema desconhecido: {self.kind}")
+
+
+# Chaves de MERGE do GraphRAGMemoryStore, ExperienceGraphRAG e GraphMemory
+CONSTRAINTS = [
+    SchemaItem("experience_id", "unique", "Experience", ("id",)),
+    SchemaItem("task_id", "unique", "Task", ("id",)),
+    SchemaItem("code_hash", "unique", "Code", ("hash",)),
+    SchemaItem("agent_name", "unique", "Agent", ("name",)),
+    SchemaItem("pattern_name", "unique", "Pattern", ("name",)),
+    SchemaItem("agent_domain_day", "unique", "AgentDomainDay", ("agent", "domain", "day")),
+    SchemaItem("task_category_name", "unique", "TaskCategory", ("name",)),
+]
+
+# Propriedades filtradas/ordenadas em consultas quentes
+INDEXES = [
+    SchemaItem("experience_timestamp", "range", "Experience", ("timestamp",)),
+    SchemaItem("experience_quality", "range", "Experience", ("quality_score",)),
+    SchemaItem("experience_agent_name", "range", "Experience", ("agent_name",)),
+    SchemaItem("experience_agent_type", "range", "Experience", ("agent_type",)),
+    SchemaItem("task_domain", "range", "Task", ("domain",)),
+    SchemaItem("pattern_description", "range", "Pattern", ("description",)),
+    SchemaItem("reaction_text", "range", "Reaction", ("text",)),
+    SchemaItem("category_name", "range", "Category", ("name",)),
+    SchemaItem("agent_domain_day_day", "range", "AgentDomainDay", ("day",)),
+    SchemaItem("experience_task_fulltext", "fulltext", "Experience", ("task", "task_description")),
+    SchemaItem("task_description_fulltext", "fulltext", "Task", ("description",)),
+]
+
+SCHEMA = CONSTRAINTS + INDEXES
+
+# Consultas quentes verificadas pela checagem de planos: nome -> (cypher, parâmetros)
+HOT_QUERIES: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "experience_by_id": (
+        "MATCH (e:Experience {id: $id}) RETURN e",
+        {"id": "exp_plan_check"},
+    ),
+    "store_experience_merge": (
+        """
+        MERGE (exp:Experience {id: $exp_id})
+        MERGE (task:Task {id: $task_id})
+        MERGE (code:Code {hash: $code_hash})
+        MERGE (agent:Agent {name: $agent})
+        MERGE (exp)-[:EXECUTED_TASK]->(task)
+        MERGE (exp)-[:GENERATED_CODE]->(code)
+        MERGE (exp)-[:PERFORMED_BY]->(agent)
+        """,
+        {"exp_id": "exp_plan_check", "task_id": "task_plan_check",
+         "code_hash": "code_plan_check", "agent": "PlanCheckAgent"},
+    ),
+    "experiences_by_agent": (
+        "MATCH (e:Experience)-[:PERFORMED_BY]->(a:Agent {name: $agent}) RETURN e.id",
+        {"agent": "CodeAgent"},
+    ),
+    "recent_experiences_window": (
+        """
+        MATCH (e:Experience)
+        WHERE e.timestamp >= datetime($since)
+        RETURN e.id, e.quality_score
+        ORDER BY e.timestamp DESC
+        """,
+        {"since": "2025-01-01T00:00:00"},
+    ),
+    "agent_performance": (
+        "MATCH (a:Agent {name: $agent}) RETURN properties(a)",
+        {"agent": "CodeAgent"},
+    ),
+    "agent_daily_stats": (
+        "MATCH (d:AgentDomainDay) WHERE d.day >= $since_day RETURN d.day, sum(d.exp_count)",
+        {"since_day": "2025-01-01"},
+    ),
+    "category_stats": (
+        """
+        MATCH (c:TaskCategory) WHERE c.name IN $categories
+        MATCH (c)<-[:IN_CATEGORY]-(e:Experience)
+        RETURN c.name, count(e), avg(e.quality_score)
+        """,
+        {"categories": ["API", "cache"]},
+    ),
+    "patterns_by_agent": (
+        "MATCH (a:Agent {name: $agent_name})<-[:OBSERVED_IN]-(p:Pattern) RETURN p.description",
+        {"agent_name": "CodeAgent"},
+    ),
+}
+
+# Operadores que indicam que o planner não encontrou índice aplicável
+SCAN_OPERATORS = ("NodeByLabelScan", "AllNodesScan")
+
+_ensured_lock = threading.Lock()
+_ensured_keys = set()
+
+
+class SchemaError(RuntimeError):
+    """Schema incompleto ou consulta quente sem índice"""
+
+
+def ensure_schema(driver, items: Optional[List[SchemaItem]] = None) -> List[str]:
+    """Executa o DDL idempotente de cada item; retorna os nomes aplicados"""
+    items = items if items is not None else SCHEMA
+    applied = []
+    with driver.session() as session:
+        for item in items:
+            session.run(item.ddl()).consume()
+            applied.append(item.name)
+    return applied
+
+
+def verify_schema(driver, items: Optional[List[SchemaItem]] = None) -> Dict[str, List[str]]:
+    """Confere constraints/índices existentes; retorna ausentes e não-ONLINE"""
+    items = items if items is not None else SCHEMA
+    with driver.session() as session:
+        constraints = {r["name"] for r in session.run("SHOW CONSTRAINTS YIELD name")}
+        indexes = {r["name"]: r["state"] for r in session.run("SHOW INDEXES YIELD name, state")}
+
+    missing, not_online = [], []
+    for item in items:
+        if item.kind == "unique":
+            if item.name not in constraints:
+                missing.append(item.name)
+        elif item.name not in indexes:
+            missing.append(item.name)
+        elif indexes[item.name] != "ONLINE":
+            not_online.append(item.name)
+
+    return {"missing": missing, "not_online": not_online}
+
+
+def bootstrap_schema(driver, verify: bool = True) -> Dict[str, List[str]]:
+    """
+    Garante o schema uma vez por processo e por pool.
+    Chamado na inicialização dos stores; falhas viram aviso, não exceção.
+    """
+    key = getattr(driver, "key", id(driver))
+    with _ensured_lock:
+        if key in _ensured_keys:
+            return {"missing": [], "not_online": []}
+
+    try:
+        ensure_schema(driver)
+        report = verify_schema(driver) if verify else {"missing": [], "not_online": []}
+    except Exception as e:
+        print(f"⚠️ Falha ao preparar schema Neo4j: {e}")
+        return {"missing": [item.name for item in SCHEMA], "not_online": []}
+
+    if report["missing"]:
+        print(f"⚠️ Schema Neo4j incompleto: {', '.join(report['missing'])}")
+    else:
+        with _ensured_lock:
+            _ensured_keys.add(key)
+    return report
+
+
+def find_scan_operators(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """Percorre a árvore do plano e lista operadores de varredura"""
+    if not plan:
+        return []
+
+    found = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        operator = str(node.get("operatorType", "")).split("@")[0]
+        if operator in SCAN_OPERATORS:
+            details = node.get("arguments", {}).get("Details", "")
+            found.append(f"{operator}({details})" if details else operator)
+        stack.extend(node.get("children", []))
+    return found
+
+
+def check_query_plans(driver, queries: Optional[Dict[str, Tuple[str, Dict[str, Any]]]] = None
+                      ) -> Dict[str, List[str]]:
+    """Executa EXPLAIN em cada consulta quente; retorna as que fazem varredura"""
+    queries = queries if queries is not None else HOT_QUERIES
+    offenders = {}
+    with driver.session() as session:
+        for name, (query, params) in queries.items():
+            summary = session.run(f"EXPLAIN {query}", **params).consume()
+            scans = find_scan_operators(summary.plan)
+            if scans:
+                offenders[name] = scans
+    return offenders
+
+
+def assert_query_plans(driver, queries: Optional[Dict[str, Tuple[str, Dict[str, Any]]]] = None):
+    """Como check_query_plans, mas levanta SchemaError se houver varredura"""
+    offenders = check_query_plans(driver, queries)
+    if offenders:
+        details = "; ".join(f"{name}: {', '.join(ops)}" for name, ops in offenders.items())
+        raise SchemaError(f"Consultas quentes com varredura por label: {details}")
@@ -0,0 +1,146 @@
+"""
+Job offline que constrói arestas SIMILAR_TO a partir dos embeddings
+
+Fora do caminho de escrita: lê os vetores armazenados por páginas (cursor
+por chave), calcula os k vizinhos mais próximos de cada experiência nova
+com multiplicação de matrizes em blocos (NumPy) e grava as arestas com o
+peso de similaridade em transações em lote.
+
+Incremental: o estado guarda a marca d'água (timestamp, id) da última
+experiência processada; execuções seguintes só calculam vizinhos das
+experiências posteriores a ela (contra o corpus inteiro). Experiências
+gravadas com timestamp anterior à marca (importações) exigem full=True.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from config.settings import GRAPHRAG_CONFIG
+from memory.experience_stream import ExperienceStream
+from memory.vector_store.quantization import normalize_rows
+
+
+def top_k_neighbours(queries: np.ndarray, query_rows: np.ndarray,
+                     corpus_blocks: List[np.ndarray], k: int,
+                     min_similarity: float) -> List[List[Tuple[int, float]]]:
+    """
+    k vizinhos de cada consulta no corpus dividido em blocos.
+
+    queries: (q, d) normalizadas; query_rows: posição de cada consulta no
+    corpus (para excluir a própria experiência); corpus_blocks: blocos
+    (n_i, d) normalizados, em qualquer dtype float. Retorna, por consulta,
+    [(linha_no_corpus, similaridade)] em ordem decrescente.
+    """
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+    offset = 0
+
+    for block in corpus_blocks:
+        scores = queries @ block.astype(np.float32, copy=False).T
+        rows = np.arange(offset, offset + len(block), dtype=np.int64)
+        inside = (query_rows >= offset) & (query_rows < offset + len(block))
+        scores[np.flatnonzero(inside), query_rows[inside] - offset] = -np.inf
+
+        merged_scores = np.hstack([best_scores, scores])
+        merged_rows = np.hstack([best_rows, np.broadcast_to(rows, scores.shape)])
+        keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+        best_rows = np.take_along_axis(merged_rows, keep, axis=1)
+        offset += len(block)
+
+    order = np.argsort(-best_scores, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_rows = np.take_along_axis(best_rows, order, axis=1)
+    return [
+        [(int(row), float(score)) for row, score in zip(rows, scores)
+         if row >= 0 and score >= min_similarity]
+        for rows, scores in zip(best_rows, best_scores)
+    ]
+
+
+class SimilarityLinkJob:
+    """Calcula e grava arestas de similaridade por embeddings (kNN em blocos)"""
+
+    def __init__(self, store, state_path=None, k: Optional[int] = None,
+                 min_similarity: Optional[float] = None, page_size: Optional[int] = None,
+                 query_block: Optional[int] = None):
+        config = GRAPHRAG_CONFIG["similarity_links"]
+        self.store = store
+        self.state_path = Path(state_path or config["job_state_path"])
+        self.k = k or config["max_links"]
+        self.min_similarity = config["min_embedding_similarity"] if min_similarity is None else min_similarity
+        self.page_size = page_size or config["job_page_size"]
+        self.query_block = query_block or config["job_query_block"]
+
+    def load_state(self) -> Dict[str, Any]:
+        if self.state_path.exists():
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"watermark": None}
+
+    def _save_state(self, state: Dict[str, Any]):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def _load_corpus(self, watermark: Optional[Tuple[str, str]]):
+        """Lê todos os vetores (float16) e marca as linhas posteriores à marca d'água"""
+        ids: List[str] = []
+        blocks: List[np.ndarray] = []
+        new_rows: List[int] = []
+        last = None
+
+        with ExperienceStream(self.store, page_size=self.page_size, include_code=False,
+                              include_embeddings=True) as stream:
+            for raw in stream.pages():
+                page = [row for row in raw if row.get("embedding") is not None]
+                for row in page:
+                    key = (row["timestamp"], row["id"])
+                    if watermark is None or key > watermark:
+                        new_rows.append(len(ids))
+                        last = key
+                    ids.append(row["id"])
+                if page:
+                    blocks.append(normalize_rows(np.asarray([row["embedding"] for row in page],
+                                                            dtype=np.float32)).astype(np.float16))
+
+        return ids, blocks, np.asarray(new_rows, dtype=np.int64), last
+
+    def run(self, full: bool = False) -> Dict[str, Any]:
+        """Processa experiências novas (ou todas, com full=True) e grava as arestas"""
+        start = time.perf_counter()
+        state = self.load_state()
+        watermark = None if full or not state.get("watermark") else tuple(state["watermark"])
+
+        ids, blocks, new_rows, last = self._load_corpus(watermark)
+        report = {"corpus": len(ids), "new_experiences": len(new_rows), "links": 0}
+
+        if len(new_rows):
+            offsets = np.cumsum([0] + [len(block) for block in blocks])
+            for begin in range(0, len(new_rows), self.query_block):
+                rows = new_rows[begin:begin + self.query_block]
+                which = np.searchsorted(offsets, rows, side="right") - 1
+                queries = np.vstack([blocks[b][row - offsets[b]] for b, row in zip(which, rows)])
+                neighbours = top_k_neighbours(queries.astype(np.float32), rows, blocks,
+                                              self.k, self.min_similarity)
+                links = [
+                    {"source": ids[row], "target": ids[target], "similarity": score}
+                    for row, found in zip(rows, neighbours) for target, score in found
+                ]
+                self.store.upsert_similarity_links(links)
+                report["links"] += len(links)
+
+            state["watermark"] = list(last)
+
+        report["seconds"] = time.perf_counter() - start
+        state["last_run"] = dict(report, finished_at=datetime.now().isoformat(), full=full)
+        self._save_state(state)
+        return report
@@ -0,0 +1,141 @@
+"""
+Categorias de tarefa materializadas na escrita
+
+Cada experiência é ligada, no momento da escrita, aos nós TaskCategory
+cujas palavras-chave aparecem na descrição da tarefa como palavras
+inteiras (plural com -s/-es incluído), de modo que "api" não casa com
+"capital" ((:Experience)-[:IN_CATEGORY]->(:TaskCategory)). Regravar uma
+experiência substitui as ligações anteriores. A análise de lacunas e
+de especialização passa a ser uma única agregação agrupada, ancorada nos
+poucos nós TaskCategory, em vez de uma varredura com CONTAINS por
+categoria.
+"""
+
+import re
+from typing import Dict, List, Any, Optional
+
+# Nome da categoria -> palavras-chave (palavras inteiras, em minúsculas)
+TASK_CATEGORIES: Dict[str, List[str]] = {
+    "validação": ["validação", "validar", "validate", "validation"],
+    "autenticação": ["autenticação", "autenticar", "login", "auth"],
+    "banco de dados": ["banco de dados", "database", "sql", "query"],
+    "API": ["api", "endpoint"],
+    "algoritmo": ["algoritmo", "algorithm", "ordenar", "sort", "busca binária"],
+    "estrutura de dados": ["estrutura de dados", "lista", "árvore", "grafo", "fila", "pilha"],
+    "teste": ["teste", "unittest", "pytest"],
+    "logging": ["logging", "logger"],
+    "cache": ["cache"],
+    "performance": ["performance", "otimizar", "optimize"],
+    "segurança": ["segurança", "security", "senha", "criptografia", "encrypt"],
+    "concorrência": ["concorrência", "thread", "async", "paralelo"],
+    "interface": ["interface", "gui", "dashboard"],
+}
+
+_CATEGORY_PATTERNS = {
+    name: re.compile(r"\b(?:" + "|".join(re.escape(keyword) for keyword in keywords) + r")(?:e?s)?\b")
+    for name, keywords in TASK_CATEGORIES.items()
+}
+
+# Fragmento anexado às consultas de escrita. Requer a variável do nó
+# Experience ({var}) e o parâmetro $task_categories (categorize_task()).
+# As ligações antigas saem antes: a tarefa pode ter mudado na regravação.
+_CATEGORY_LINK = """
+    FOREACH (stale IN [({var})-[link:IN_CATEGORY]->(:TaskCategory) | link] | DELETE stale)
+    SET {var}.categorized = true
+    FOREACH (category_name IN $task_categories |
+        MERGE (category:TaskCategory {{name: category_name}})
+        MERGE ({var})-[:IN_CATEGORY]->(category)
+    )
+"""
+
+
+def category_link(var: str) -> str:
+    """Fragmento Cypher que liga o nó `var` às suas categorias"""
+    return _CATEGORY_LINK.format(var=var)
+
+
+def categorize_task(task: str) -> List[str]:
+    """Categorias com alguma palavra-chave como palavra inteira na tarefa"""
+    text = (task or "").lower()
+    return [name for name, pattern in _CATEGORY_PATTERNS.items() if pattern.search(text)]
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"count": 0, "avg_quality": 0.0, "success_rate": 0.0,
+            "success_count": 0, "avg_success_quality": None}
+
+
+def read_category_stats(session, categories: List[str],
+                        agent: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Estatísticas de todas as categorias numa única consulta agrupada.
+
+    Categorias conhecidas usam as relações IN_CATEGORY; nomes fora de
+    TASK_CATEGORIES (não materializados) caem numa varredura CONTAINS,
+    também agrupada numa só consulta.
+    """
+    stats = {category: _empty_stats() for category in categories}
+    known = [category for category in categories if category in TASK_CATEGORIES]
+    unknown = [category for category in categories if category not in TASK_CATEGORIES]
+
+    records = []
+    if known:
+        records += session.run("""
+            MATCH (c:TaskCategory) WHERE c.name IN $categories
+            MATCH (c)<-[:IN_CATEGORY]-(e:Experience)
+            WHERE $agent IS NULL OR (e)-[:PERFORMED_BY]->(:Agent {name: $agent})
+            WITH c.name AS category, e, coalesce(e.success, e.execution_success, false) AS ok
+            RETURN category,
+                   count(e) AS count,
+                   avg(e.quality_score) AS avg_quality,
+                   sum(CASE WHEN ok THEN 1 ELSE 0 END) AS success_count,
+                   avg(CASE WHEN ok THEN e.quality_score END) AS avg_success_quality
+        """, categories=known, agent=agent).data()
+    if unknown:
+        records += session.run("""
+            UNWIND $categories AS category
+            MATCH (e:Experience)
+            WHERE toLower(coalesce(e.task, e.task_description, '')) CONTAINS toLower(category)
+              AND ($agent IS NULL OR (e)-[:PERFORMED_BY]->(:Agent {name: $agent}))
+            WITH category, e, coalesce(e.success, e.execution_success, false) AS ok
+            RETURN category,
+                   count(e) AS count,
+                   avg(e.quality_score) AS avg_quality,
+                   sum(CASE WHEN ok THEN 1 ELSE 0 END) AS success_count,
+                   avg(CASE WHEN ok THEN e.quality_score END) AS avg_success_quality
+        """, categories=unknown, agent=agent).data()
+
+    for record in records:
+        count = record["count"] or 0
+        stats[record["category"]] = {
+            "count": count,
+            "avg_quality": record["avg_quality"] or 0.0,
+            "success_rate": (record["success_count"] / count * 100) if count else 0.0,
+            "success_count": record["success_count"] or 0,
+            "avg_success_quality": record["avg_success_quality"],
+        }
+    return stats
+
+
+def backfill_task_categories(driver, batch_size: int = 1000) -> int:
+    """Liga experiências antigas (sem IN_CATEGORY avaliado) às categorias"""
+    linked = 0
+    with driver.session() as session:
+        while True:
+            rows = session.run("""
+                MATCH (e:Experience) WHERE e.categorized IS NULL
+                RETURN e.id AS id, coalesce(e.task, e.task_description, '') AS task
+                LIMIT $limit
+            """, limit=batch_size).data()
+            if not rows:
+                return linked
+            session.run("""
+                UNWIND $rows AS row
+                MATCH (e:Experience {id: row.id})
+                SET e.categorized = true
+                FOREACH (category_name IN row.categories |
+                    MERGE (category:TaskCategory {name: category_name})
+                    MERGE (e)-[:IN_CATEGORY]->(category)
+                )
+            """, rows=[{"id": row["id"], "categories": categorize_task(row["task"])} for row in rows]).consume()
+            linked += len(rows)
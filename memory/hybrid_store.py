@@ -1,18 +1,51 @@
 """
 Sistema de Memória GraphRAG - Versão simplificada sem YAML legado
-Utiliza exclusivamente Neo4j + ChromaDB para persistência
+Utiliza Neo4j + ChromaDB para persistência; o backend SQLite local
+(memory.sqlite_store) é selecionado por GRAPHRAG_CONFIG["backend"].
 """
 
 import json
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
-from neo4j import GraphDatabase
 import chromadb
 from sentence_transformers import SentenceTransformer
 
+from config.settings import DATABASE_CONFIG, GRAPHRAG_CONFIG
+from memory.graph_rag.driver_registry import get_neo4j_driver
+from memory.graph_rag.content_hash import stable_task_id, stable_code_hash
+from memory.graph_rag.schema import bootstrap_schema
+from memory.graph_rag.fulltext import build_lucene_query
+from memory.graph_rag.hybrid_retriever import HybridRetriever, build_chroma_where, normalize_filters
+from memory.graph_rag.retrieval_cache import RetrievalCache
+from memory.graph_rag.diversity import select_diverse
+from memory.graph_rag.task_categories import category_link, categorize_task
+from memory.graph_rag.retention import ExperienceRetentionEngine
+from memory.graph_rag.aggregates import (
+    AGGREGATE_UPDATE, aggregate_params, read_agent_performance, read_agent_stats,
+    read_global_stats, read_daily_stats
+)
+from memory.vector_store.embedding_cache import EmbeddingCache
+
+def connect_experience_collection():
+    """Conecta ao ChromaDB e retorna a collection de experiências"""
+    chroma_config = DATABASE_CONFIG["chromadb"]
+    chroma_client = chromadb.HttpClient(
+        host=chroma_config["host"],
+        port=chroma_config["port"],
+        headers={"X-Chroma-Token": "rsca_chroma_secret_2025"}
+    )
+    
+    # Collection para experiências de código
+    collection = chroma_client.get_or_create_collection(
+        name=chroma_config["collection_name"],
+        metadata={"description": "RSCA coding experiences with embeddings"}
+    )
+    return chroma_client, collection
+
 @dataclass
 class CodingExperience:
     """Estrutura padronizada para experiências de codificação"""
@@ -26,36 +59,186 @@ class CodingExperience:
     timestamp: datetime
     context: Dict[str, Any]
 
-class GraphRAGMemoryStore:
+class BaseMemoryStore(ABC):
+    """
+    Lógica de recuperação comum aos backends (Neo4j + ChromaDB ou SQLite):
+    encoder com cache de embeddings, cache de resultados e busca híbrida.
+    Subclasses implementam _query_vectors, _graph_search e get_embeddings.
+    """
+    
+    # Nome legado: o armazenamento é sempre GraphRAG (sem fallback YAML)
+    enable_graphrag = True
+    
+    # Chamados após cada store_experience bem-sucedido (ex.: PatternDiscoveryScheduler)
+    _write_listeners: Tuple[Callable[[int], None], ...] = ()
+    
+    def _setup_retrieval(self, encoder=None):
+        """Encoder, cache de embeddings e cache de resultados"""
+        vector_config = GRAPHRAG_CONFIG["vector_store"]
+        self.encoder = encoder if encoder is not None else SentenceTransformer(vector_config["model"])
+        self.embeddings = EmbeddingCache(
+            self.encoder,
+            max_entries=vector_config["embedding_cache_size"],
+            storage=vector_config["embedding_cache_storage"]
+        )
+        self._retriever = None
+        
+        cache_config = GRAPHRAG_CONFIG["retrieval_cache"]
+        self._cache = RetrievalCache(
+            max_entries=cache_config["max_entries"],
+            max_bytes=cache_config["max_bytes"],
+            ttl_seconds=cache_config["ttl_seconds"]
+        ) if cache_config["enabled"] else None
+
+    def _invalidate_cache(self):
+        """Novas escritas invalidam resultados em cache"""
+        if self._cache:
+            self._cache.bump_generation()
+
+    def add_write_listener(self, listener: Callable[[int], None]):
+        """Registra listener(quantidade) chamado após gravar experiências"""
+        self._write_listeners = self._write_listeners + (listener,)
+
+    def remove_write_listener(self, listener: Callable[[int], None]):
+        """Remove um listener registrado com add_write_listener"""
+        self._write_listeners = tuple(item for item in self._write_listeners if item != listener)
+
+    def _notify_written(self, count: int = 1):
+        for listener in self._write_listeners:
+            try:
+                listener(count)
+            except Exception as e:
+                print(f"⚠️ Listener de escrita falhou: {e}")
+
+    def retrieve_similar_experiences(self, query: str, k: int = 5,
+                                     filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Busca experiências similares (apenas vetorial).
+        filters aceita agent, domain e min_quality como pré-filtros de metadados.
+        """
+        try:
+            return self._cached("vector", query, k, filters, self._query_vectors)
+        except Exception as e:
+            print(f"⚠️ Busca falhou: {e}")
+            return []
+
+    def _cached(self, mode: str, query: str, k: int, filters: Optional[Dict[str, Any]],
+                compute) -> List[Dict]:
+        """Serve do cache ou calcula e armazena com a geração lida antes da consulta"""
+        filters = normalize_filters(filters)
+        if not self._cache:
+            return compute(query, k, filters)
+        
+        key = RetrievalCache.make_key(query, k, filters, mode)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        
+        generation = self._cache.generation
+        results = compute(query, k, filters)
+        # Resultado parcial (etapa com falha) não fica preso no cache pelo TTL
+        if not getattr(results, "failed_stages", None):
+            self._cache.put(key, results, generation=generation)
+        return results
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Estatísticas do cache de recuperação"""
+        stats = self._cache.get_stats() if self._cache else {"enabled": False}
+        stats["embeddings"] = self.embeddings.get_stats()
+        return stats
+
+    @abstractmethod
+    def _query_vectors(self, query: str, k: int, filters: Dict[str, Any]) -> List[Dict]:
+        """Busca vetorial com pré-filtros de metadados"""
+
+    @abstractmethod
+    def _graph_search(self, query: str, limit: int, filters: Dict[str, Any]) -> List[Dict]:
+        """Etapa de grafo (texto completo + vizinhança) da busca híbrida"""
+
+    @abstractmethod
+    def get_embeddings(self, experience_ids: List[str]) -> Dict[str, List[float]]:
+        """Embeddings armazenados por id (ids ausentes são omitidos)"""
+
+    def select_diverse_experiences(self, query: str, experiences: List[Dict],
+                                   cost, token_budget: Optional[int] = None) -> List[Dict]:
+        """
+        Reduz candidatos recuperados a um conjunto diverso (MMR) que cabe
+        em token_budget; cost(exp) dá os tokens que a experiência ocupa.
+        """
+        selection = GRAPHRAG_CONFIG["context_selection"]
+        if not experiences:
+            return []
+        try:
+            vectors = self.get_embeddings([exp["experience_id"] for exp in experiences])
+        except Exception as e:
+            print(f"⚠️ Embeddings indisponíveis para seleção diversa: {e}")
+            vectors = {}
+        return select_diverse(
+            self.embeddings.encode(query), experiences, vectors, cost,
+            token_budget if token_budget is not None else selection["token_budget"],
+            mmr_lambda=selection["mmr_lambda"],
+            max_items=selection["max_experiences"],
+            duplicate_threshold=selection["duplicate_threshold"],
+        )
+
+    def retrieve_hybrid(self, query: str, k: int = 5,
+                        filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Busca híbrida: vetorial + expansão no grafo, executadas em paralelo
+        e fundidas por RRF com pesos de qualidade e recência.
+        """
+        if GRAPHRAG_CONFIG["retrieval"]["mode"] != "hybrid":
+            return self.retrieve_similar_experiences(query, k=k, filters=filters)
+        
+        if self._retriever is None:
+            self._retriever = HybridRetriever(self._vector_search, self._graph_search)
+        return self._cached("hybrid", query, k, filters, self._retriever.retrieve)
+
+    def get_retrieval_latency(self) -> Dict[str, Any]:
+        """Latência por etapa da recuperação híbrida"""
+        return self._retriever.get_latency_stats() if self._retriever else {}
+
+    def _vector_search(self, query: str, limit: int, filters: Dict[str, Any]) -> List[Dict]:
+        """Etapa vetorial da busca híbrida"""
+        return self._query_vectors(query, limit, filters)
+
+    def _extract_domain(self, task: str) -> str:
+        """Extrai domínio da tarefa"""
+        task_lower = task.lower()
+        if "login" in task_lower or "auth" in task_lower:
+            return "authentication"
+        elif "api" in task_lower:
+            return "api_development"
+        elif "database" in task_lower or "db" in task_lower:
+            return "database"
+        else:
+            return "general"
+
+    def close(self):
+        """Encerra o executor da busca híbrida"""
+        if getattr(self, '_retriever', None):
+            self._retriever.close()
+
+
+class GraphRAGMemoryStore(BaseMemoryStore):
     """
     Armazena experiências apenas em GraphRAG (Neo4j + ChromaDB)
     """
     
-    def __init__(self):
+    def __init__(self, encoder=None):
         self._setup_graphrag()
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        self._setup_retrieval(encoder)
         
     def _setup_graphrag(self):
         """Inicializa conexões Neo4j e ChromaDB"""
         try:
-            # Neo4j
-            self.neo4j = GraphDatabase.driver(
-                "bolt://localhost:7687",
-                auth=("neo4j", "rsca_secure_2025")
-            )
+            # Neo4j (pool compartilhado com os demais componentes de grafo)
+            self.neo4j = get_neo4j_driver()
+            if DATABASE_CONFIG["neo4j"]["auto_schema"]:
+                bootstrap_schema(self.neo4j)
             
             # ChromaDB
-            self.chroma_client = chromadb.HttpClient(
-                host="localhost",
-                port=8000,
-                headers={"X-Chroma-Token": "rsca_chroma_secret_2025"}
-            )
-            
-            # Collection para experiências de código
-            self.experiences_collection = self.chroma_client.get_or_create_collection(
-                name="coding_experiences",
-                metadata={"description": "RSCA coding experiences with embeddings"}
-            )
+            self.chroma_client, self.experiences_collection = connect_experience_collection()
             
             print("✅ GraphRAG conectado: Neo4j + ChromaDB")
             
@@ -63,17 +246,23 @@ class GraphRAGMemoryStore:
             print(f"⚠️ Falha ao conectar GraphRAG: {e}")
             raise RuntimeError("GraphRAG initialization failed")
 
-    def store_experience(self, experience: CodingExperience) -> bool:
+    def store_experience(self, experience: CodingExperience,
+                         embedding: Optional[List[float]] = None) -> bool:
         """
-        Armazena experiência no GraphRAG
+        Armazena experiência no GraphRAG.
+        embedding permite reaproveitar um vetor já calculado (importação).
         """
         try:
             # 1. Gerar embedding
-            text_to_embed = f"{experience.task_description} {experience.code_generated}"
-            embedding = self.encoder.encode(text_to_embed).tolist()
+            if embedding is None:
+                text_to_embed = f"{experience.task_description} {experience.code_generated}"
+                embedding = self.embeddings.encode(text_to_embed).tolist()
+            else:
+                embedding = [float(x) for x in embedding]
             
-            # 2. Armazenar em ChromaDB
-            self.experiences_collection.add(
+            # 2. Armazenar em ChromaDB (upsert: regravar a mesma experiência é idempotente)
+            domain = self._extract_domain(experience.task_description)
+            self.experiences_collection.upsert(
                 documents=[experience.code_generated],
                 embeddings=[embedding],
                 metadatas=[{
@@ -81,6 +270,8 @@ class GraphRAGMemoryStore:
                     "task": experience.task_description,
                     "quality": experience.quality_score,
                     "agent": experience.agent_name,
+                    "domain": domain,
+                    "success": experience.execution_success,
                     "timestamp": experience.timestamp.isoformat()
                 }],
                 ids=[experience.id]
@@ -90,7 +281,9 @@ class GraphRAGMemoryStore:
             with self.neo4j.session() as session:
                 session.run("""
                     MERGE (exp:Experience {id: $exp_id})
-                    SET exp.task_description = $task,
+                    WITH exp, exp.aggregated IS NULL AS is_new
+                    SET exp.aggregated = true,
+                        exp.task_description = $task,
                         exp.quality_score = $quality,
                         exp.execution_success = $success,
                         exp.timestamp = datetime($timestamp),
@@ -98,22 +291,21 @@ class GraphRAGMemoryStore:
                         exp.llm_model = $llm_model
                     
                     MERGE (task:Task {id: $task_id})
-                    SET task.description = $task,
+                    ON CREATE SET task.description = $task,
                         task.domain = $domain
                     
                     MERGE (code:Code {hash: $code_hash})
-                    SET code.content = $code,
+                    ON CREATE SET code.content = $code,
                         code.language = "python",
-                        code.syntax_valid = $syntax_valid
+                        code.size_bytes = $code_bytes
+                    SET code.syntax_valid = $syntax_valid
                     
                     MERGE (agent:Agent {name: $agent})
-                    SET agent.total_experiences = COALESCE(agent.total_experiences, 0) + 1,
-                        agent.avg_quality_score = $avg_quality
                     
-                    CREATE (exp)-[:EXECUTED_TASK]->(task)
-                    CREATE (exp)-[:GENERATED_CODE]->(code)
-                    CREATE (exp)-[:PERFORMED_BY]->(agent)
-                """, 
+                    MERGE (exp)-[:EXECUTED_TASK]->(task)
+                    MERGE (exp)-[:GENERATED_CODE]->(code)
+                    MERGE (exp)-[:PERFORMED_BY]->(agent)
+                """ + AGGREGATE_UPDATE + category_link("exp"),
                     exp_id=experience.id,
                     task=experience.task_description,
                     quality=experience.quality_score,
@@ -121,75 +313,317 @@ class GraphRAGMemoryStore:
                     timestamp=experience.timestamp.isoformat(),
                     agent=experience.agent_name,
                     llm_model=experience.llm_model,
-                    task_id=f"task_{hash(experience.task_description)}",
-                    domain=self._extract_domain(experience.task_description),
-                    code_hash=f"code_{hash(experience.code_generated)}",
+                    task_id=stable_task_id(experience.task_description),
+                    domain=domain,
+                    code_hash=stable_code_hash(experience.code_generated),
                     code=experience.code_generated,
+                    code_bytes=len(experience.code_generated.encode("utf-8")),
                     syntax_valid=experience.execution_success,
-                    avg_quality=experience.quality_score
+                    task_categories=categorize_task(experience.task_description),
+                    **aggregate_params(experience.quality_score, experience.execution_success,
+                                       domain, experience.timestamp)
                 )
             
+            self._invalidate_cache()
+            self._notify_written()
             return True
             
         except Exception as e:
             print(f"❌ Erro ao salvar experiência: {e}")
             return False
     
-    def retrieve_similar_experiences(self, query: str, k: int = 5) -> List[Dict]:
+    def _query_vectors(self, query: str, k: int, filters: Dict[str, Any]) -> List[Dict]:
+        """Consulta o ChromaDB; exceções sobem para o chamador"""
+        query_embedding = self.embeddings.encode(query).tolist()
+        
+        results = self.experiences_collection.query(
+            query_embeddings=[query_embedding],
+            n_results=k,
+            where=build_chroma_where(filters),
+            include=['documents', 'metadatas', 'distances']
+        )
+        
+        formatted_results = []
+        for doc, metadata, distance in zip(
+            results['documents'][0],
+            results['metadatas'][0], 
+            results['distances'][0]
+        ):
+            formatted_results.append({
+                "experience_id": metadata['experience_id'],
+                "task": metadata.get('task', ''),
+                "code": doc,
+                "quality": metadata.get('quality', 0),
+                "agent": metadata.get('agent', ''),
+                "domain": metadata.get('domain'),
+                "timestamp": metadata.get('timestamp'),
+                "similarity": 1.0 - distance
+            })
+        
+        return formatted_results
+
+    def _graph_search(self, query: str, limit: int, filters: Dict[str, Any]) -> List[Dict]:
         """
-        Busca experiências similares usando GraphRAG
+        Etapa de grafo: tarefas encontradas pelo índice full-text e vizinhos
+        SIMILAR_TO das experiências que as executaram.
         """
-        try:
-            query_embedding = self.encoder.encode(query).tolist()
-            
-            results = self.experiences_collection.query(
-                query_embeddings=[query_embedding],
-                n_results=k,
-                include=['documents', 'metadatas', 'distances']
+        text_query = build_lucene_query(query)
+        if not text_query:
+            return []
+        
+        with self.neo4j.session() as session:
+            result = session.run("""
+                CALL db.index.fulltext.queryNodes('task_description_fulltext', $text_query, {limit: $limit})
+                YIELD node AS task, score
+                MATCH (task)<-[:EXECUTED_TASK]-(seed:Experience)
+                OPTIONAL MATCH (seed)-[:SIMILAR_TO]-(neighbour:Experience)
+                WITH collect({e: seed, score: score}) +
+                     collect({e: neighbour, score: score * $neighbour_decay}) AS hits
+                UNWIND hits AS hit
+                WITH hit.e AS e, max(hit.score) AS score
+                WHERE e IS NOT NULL
+                  AND ($agent IS NULL OR e.agent_name = $agent)
+                  AND ($min_quality IS NULL OR e.quality_score >= $min_quality)
+                MATCH (e)-[:EXECUTED_TASK]->(t:Task)
+                WHERE $domain IS NULL OR t.domain = $domain
+                OPTIONAL MATCH (e)-[:GENERATED_CODE]->(c:Code)
+                RETURN e.id AS experience_id,
+                       e.task_description AS task,
+                       c.content AS code,
+                       e.quality_score AS quality,
+                       e.agent_name AS agent,
+                       t.domain AS domain,
+                       toString(e.timestamp) AS timestamp,
+                       score
+                ORDER BY score DESC
+                LIMIT $limit
+            """,
+                text_query=text_query,
+                limit=limit,
+                neighbour_decay=GRAPHRAG_CONFIG["retrieval"]["graph_neighbour_decay"],
+                agent=filters.get("agent"),
+                domain=filters.get("domain"),
+                min_quality=filters.get("min_quality")
             )
             
-            formatted_results = []
-            for doc, metadata, distance in zip(
-                results['documents'][0],
-                results['metadatas'][0], 
-                results['distances'][0]
-            ):
-                formatted_results.append({
-                    "experience_id": metadata['experience_id'],
-                    "task": metadata.get('task', ''),
-                    "code": doc,
-                    "quality": metadata.get('quality', 0),
-                    "agent": metadata.get('agent', ''),
-                    "similarity": 1.0 - distance
-                })
+            return [
+                {
+                    "experience_id": record["experience_id"],
+                    "task": record["task"] or "",
+                    "code": record["code"] or "",
+                    "quality": record["quality"] or 0,
+                    "agent": record["agent"] or "",
+                    "domain": record["domain"],
+                    "timestamp": record["timestamp"],
+                    "graph_score": record["score"]
+                }
+                for record in result
+            ]
+
+    def get_storage_metrics(self) -> Dict[str, Any]:
+        """
+        Métricas de armazenamento do grafo: nós por label e bytes de conteúdo
+        """
+        try:
+            with self.neo4j.session() as session:
+                record = session.run("""
+                    CALL { MATCH (e:Experience) RETURN count(e) AS experiences }
+                    CALL { MATCH (t:Task)
+                           RETURN count(t) AS tasks,
+                                  sum(size(coalesce(t.description, ''))) AS task_chars }
+                    CALL { MATCH (c:Code)
+                           RETURN count(c) AS codes,
+                                  sum(coalesce(c.size_bytes, size(coalesce(c.content, '')))) AS code_bytes }
+                    CALL { MATCH (a:Agent) RETURN count(a) AS agents }
+                    RETURN experiences, tasks, task_chars, codes, code_bytes, agents
+                """).single()
             
-            return formatted_results
+            experiences = record["experiences"] or 0
+            codes = record["codes"] or 0
+            return {
+                "nodes": {
+                    "Experience": experiences,
+                    "Task": record["tasks"] or 0,
+                    "Code": codes,
+                    "Agent": record["agents"] or 0
+                },
+                "code_bytes": record["code_bytes"] or 0,
+                "task_chars": record["task_chars"] or 0,
+                # Experiências por nó Code: > 1 indica código deduplicado
+                "code_dedup_ratio": experiences / codes if codes else 0.0
+            }
             
         except Exception as e:
-            print(f"⚠️ Busca falhou: {e}")
-            return []
+            print(f"⚠️ Falha ao coletar métricas de armazenamento: {e}")
+            return {}
 
-    def _extract_domain(self, task: str) -> str:
-        """Extrai domínio da tarefa"""
-        task_lower = task.lower()
-        if "login" in task_lower or "auth" in task_lower:
-            return "authentication"
-        elif "api" in task_lower:
-            return "api_development"
-        elif "database" in task_lower or "db" in task_lower:
-            return "database"
-        else:
-            return "general"
+    def apply_retention(self, max_age_days: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Aplica os limites de GRAPHRAG_CONFIG["experience_storage"] (uma rodada
+        limitada de lotes) no Neo4j e no ChromaDB.
+        """
+        report = ExperienceRetentionEngine(self.neo4j, self.experiences_collection).run(
+            max_age_days=max_age_days
+        )
+        if report["experiences_removed"]:
+            self._invalidate_cache()
+        return report
+
+    def get_recent_experiences(self, days: int = 30, limit: int = 100) -> List[Dict[str, Any]]:
+        """Experiências recentes com código, da mais nova para a mais antiga"""
+        with self.neo4j.session() as session:
+            result = session.run("""
+                MATCH (e:Experience)-[:GENERATED_CODE]->(c:Code)
+                WHERE e.timestamp > datetime() - duration({days: $days})
+                RETURN e, c
+                ORDER BY e.timestamp DESC
+                LIMIT $limit
+            """, days=days, limit=limit)
+            
+            return [
+                {
+                    'id': record['e']['id'],
+                    'task': record['e']['task_description'],
+                    'code': record['c']['content'],
+                    'quality': record['e']['quality_score'],
+                    'success': record['e']['execution_success'],
+                    'agent': record['e']['agent_name'],
+                    'timestamp': record['e']['timestamp'],
+                    'source': 'graphrag'
+                }
+                for record in result
+            ]
+
+    def upsert_similarity_links(self, links: List[Dict[str, Any]], batch_size: int = 1000):
+        """
+        Grava arestas SIMILAR_TO {similarity, method: 'embedding'} em lotes
+        (job offline memory.graph_rag.similarity_links). links: source, target, similarity.
+        """
+        def write(tx, batch):
+            tx.run("""
+                UNWIND $links AS link
+                MATCH (a:Experience {id: link.source})
+                MATCH (b:Experience {id: link.target})
+                MERGE (a)-[r:SIMILAR_TO]-(b)
+                SET r.similarity = link.similarity, r.method = 'embedding'
+            """, links=batch)
+        
+        with self.neo4j.session() as session:
+            for start in range(0, len(links), batch_size):
+                session.execute_write(write, links[start:start + batch_size])
+        if links:
+            self._invalidate_cache()
+
+    def get_embeddings(self, experience_ids: List[str]) -> Dict[str, List[float]]:
+        """Embeddings armazenados no ChromaDB"""
+        if not experience_ids:
+            return {}
+        stored = self.experiences_collection.get(ids=list(experience_ids), include=["embeddings"])
+        return {exp_id: vector for exp_id, vector in zip(stored["ids"], stored["embeddings"])
+                if vector is not None}
+
+    def fetch_experience_page(self, after: Optional[Tuple[str, str]] = None, limit: int = 500,
+                              agent: Optional[str] = None,
+                              include_embeddings: bool = False,
+                              include_code: bool = True) -> List[Dict[str, Any]]:
+        """
+        Página de experiências em ordem (timestamp, id), a partir do cursor
+        `after` = (timestamp, id) da última linha da página anterior.
+        Paginação por chave: custo constante por página, sem SKIP.
+        Com include_code=False o nó Code não é lido (code=None).
+        Só nós gravados por este store (timestamp datetime, agent_name): os do
+        ExperienceGraphRAG guardam o timestamp como texto, e a comparação de
+        texto com datetime é nula no Cypher.
+        """
+        after_ts, after_id = after if after else (None, None)
+        code_match = "OPTIONAL MATCH (e)-[:GENERATED_CODE]->(c:Code)" if include_code else ""
+        code_column = "c.content" if include_code else "null"
+        with self.neo4j.session() as session:
+            result = session.run(f"""
+                MATCH (e:Experience)
+                WHERE e.timestamp IS NOT NULL AND e.agent_name IS NOT NULL
+                  AND ($agent IS NULL OR e.agent_name = $agent)
+                  AND ($after_ts IS NULL OR e.timestamp > datetime($after_ts)
+                       OR (e.timestamp = datetime($after_ts) AND e.id > $after_id))
+                WITH e ORDER BY e.timestamp, e.id LIMIT $limit
+                {code_match}
+                OPTIONAL MATCH (e)-[:EXECUTED_TASK]->(t:Task)
+                RETURN e.id AS id, e.task_description AS task, {code_column} AS code,
+                       e.quality_score AS quality, e.execution_success AS success,
+                       e.agent_name AS agent, e.llm_model AS llm_model,
+                       toString(e.timestamp) AS timestamp, t.domain AS domain
+            """, agent=agent, after_ts=after_ts, after_id=after_id, limit=limit)
+            rows = [dict(record, context={}) for record in result]
+        
+        if include_embeddings and rows:
+            vectors = self.get_embeddings([row["id"] for row in rows])
+            for row in rows:
+                vector = vectors.get(row["id"])
+                row["embedding"] = [float(x) for x in vector] if vector is not None else None
+        return rows
+
+    def get_agent_performance(self, agent_name: str) -> Dict[str, Any]:
+        """Estatísticas do agente a partir dos agregados incrementais (O(1))"""
+        with self.neo4j.session() as session:
+            return read_agent_performance(session, agent_name)
+
+    def get_agent_stats(self) -> List[Dict[str, Any]]:
+        """Estatísticas agregadas de todos os agentes"""
+        with self.neo4j.session() as session:
+            return read_agent_stats(session)
+
+    def get_global_stats(self) -> Dict[str, Any]:
+        """Totais do sistema somando os agregados dos agentes"""
+        with self.neo4j.session() as session:
+            return read_global_stats(session)
+
+    def get_quality_timeline(self, days: int = 30, agent: Optional[str] = None,
+                             domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Qualidade média e volume por dia, dos nós AgentDomainDay"""
+        since_day = (datetime.now() - timedelta(days=days)).date().isoformat()
+        with self.neo4j.session() as session:
+            return read_daily_stats(session, since_day, agent=agent, domain=domain)
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Métricas de utilização do pool Neo4j compartilhado"""
+        return self.neo4j.get_metrics() if hasattr(self, 'neo4j') else {}
 
     def close(self):
-        """Fecha conexões"""
+        """Fecha conexões (libera a referência ao pool compartilhado)"""
+        super().close()
         if hasattr(self, 'neo4j'):
             self.neo4j.close()
 
+class HybridMemoryStore(GraphRAGMemoryStore):
+    """
+    Nome anterior à remoção do YAML legado. Aceita enable_graphrag dos
+    chamadores antigos e o ignora: o store sempre usa Neo4j + ChromaDB.
+    """
+
+    def __init__(self, enable_graphrag: bool = True, encoder=None):
+        if not enable_graphrag:
+            print("⚠️ enable_graphrag=False não é mais suportado (YAML legado removido); usando GraphRAG")
+        super().__init__(encoder=encoder)
+
+
+def create_memory_store(backend: Optional[str] = None, encoder=None) -> BaseMemoryStore:
+    """
+    Cria o store configurado em GRAPHRAG_CONFIG["backend"]:
+    "neo4j" (Neo4j + ChromaDB) ou "sqlite" (arquivo local + índice embarcado).
+    """
+    backend = backend or GRAPHRAG_CONFIG["backend"]
+    if backend == "sqlite":
+        from memory.sqlite_store import SQLiteMemoryStore
+        return SQLiteMemoryStore(encoder=encoder)
+    if backend == "neo4j":
+        return GraphRAGMemoryStore(encoder=encoder)
+    raise ValueError(f"Backend de memória desconhecido: {backend}")
+
+
 # Exemplo de uso atualizado
 if __name__ == "__main__":
     try:
-        memory = GraphRAGMemoryStore()
+        memory = create_memory_store()
         
         test_exp = CodingExperience(
             id="exp_test_001",
@@ -0,0 +1,85 @@
+"""
+Clustering de código sem densificar matrizes
+
+O DBSCAN recebe um grafo esparso de vizinhança por raio já calculado
+(metric='precomputed'), em vez de uma matriz densa n × features:
+
+  - vetores esparsos (TF-IDF): produto em blocos de linhas contra a
+    transposta CSR, que funciona como índice invertido (só pares com
+    termos em comum são calculados); guarda apenas os pares com
+    distância de cosseno <= eps;
+  - vetores densos (embeddings): produto em blocos de linhas (BLAS)
+    contra a matriz normalizada, guardando os mesmos pares. Em centenas
+    de dimensões uma árvore (KD/Ball) degenera em força bruta com mais
+    custo; os blocos são independentes, então o grafo pode ser montado
+    por faixas de linhas em processos diferentes (dense_radius_rows).
+
+Os rótulos seguem a ordem das linhas de entrada, então o mapeamento de
+volta para as experiências é posicional (sem busca por conteúdo).
+"""
+
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import DBSCAN
+from sklearn.preprocessing import normalize
+
+
+def sparse_radius_graph(vectors: sparse.spmatrix, eps: float, block_size: int = 1024) -> sparse.csr_matrix:
+    """Grafo (n, n) de distâncias de cosseno <= eps entre linhas esparsas"""
+    vectors = normalize(sparse.csr_matrix(vectors, dtype=np.float64))
+    postings = vectors.T.tocsr()
+    count = vectors.shape[0]
+    blocks = []
+
+    for start in range(0, count, block_size):
+        similarity = (vectors[start:start + block_size] @ postings).tocsr()
+        similarity.data[similarity.data < 1.0 - eps] = 0.0
+        similarity.eliminate_zeros()
+        # Distância 0 (duplicatas) continua armazenada explicitamente
+        similarity.data = np.clip(1.0 - similarity.data, 0.0, None)
+        blocks.append(similarity)
+
+    if not blocks:
+        return sparse.csr_matrix((count, count))
+    return sparse.vstack(blocks, format='csr')
+
+
+def dense_radius_rows(unit_vectors: np.ndarray, eps: float, start: int, stop: int,
+                      block_size: int = 1024) -> sparse.csr_matrix:
+    """Linhas [start, stop) do grafo de distâncias <= eps; vetores já normalizados"""
+    count = unit_vectors.shape[0]
+    blocks = []
+    for begin in range(start, stop, block_size):
+        similarity = unit_vectors[begin:min(begin + block_size, stop)] @ unit_vectors.T
+        rows, cols = np.nonzero(similarity >= 1.0 - eps)
+        distances = np.clip(1.0 - similarity[rows, cols], 0.0, None)
+        blocks.append(sparse.csr_matrix((distances, (rows, cols)), shape=(len(similarity), count)))
+    if not blocks:
+        return sparse.csr_matrix((0, count))
+    return sparse.vstack(blocks, format='csr')
+
+
+def dense_radius_graph(vectors: np.ndarray, eps: float) -> sparse.csr_matrix:
+    """Grafo de distâncias de cosseno <= eps entre linhas densas"""
+    vectors = normalize(np.asarray(vectors, dtype=np.float32))
+    return dense_radius_rows(vectors, eps, 0, vectors.shape[0])
+
+
+def radius_graph(vectors, eps: float) -> sparse.csr_matrix:
+    if sparse.issparse(vectors):
+        return sparse_radius_graph(vectors, eps)
+    return dense_radius_graph(vectors, eps)
+
+
+def dbscan_labels(vectors, eps: float, min_samples: int = 2) -> np.ndarray:
+    """Rótulos DBSCAN (distância de cosseno) por linha de entrada; -1 = ruído"""
+    if vectors.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+    return dbscan_from_graph(radius_graph(vectors, eps), eps, min_samples)
+
+
+def dbscan_from_graph(graph: sparse.csr_matrix, eps: float, min_samples: int = 2) -> np.ndarray:
+    """Rótulos DBSCAN a partir de um grafo de distâncias já montado"""
+    if graph.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+    return DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit_predict(graph)
@@ -2,36 +2,66 @@
 """
 Sistema de Descoberta de Padrões - Identifica padrões emergentes nas experiências
 Integra com sistema simbólico atual para manter compatibilidade
+
+Descoberta incremental: o estado (centroides e agregados dos clusters,
+agregados por domínio e de qualidade) é persistido em
+memory.pattern_state. Cada execução consome apenas as experiências
+posteriores à marca d'água, atribui-as aos clusters existentes (média
+incremental dos centroides) e agrupa o buffer de outliers com DBSCAN. A
+reconstrução completa sobre a janela de histórico só ocorre quando não há
+estado ou quando há deriva (dimensão dos vetores alterada, excesso de
+outliers ou crescimento além de rebuild_growth × a base da última
+reconstrução).
+
+Os vetores de código são os embeddings já armazenados no vector store
+(lidos em lote junto com as páginas de experiências), combinados com a
+impressão digital estrutural de memory.code_fingerprint; nada é
+revetorizado a cada execução.
+
+As recomendações vêm de um índice {contexto: padrões pré-ordenados pela
+relevância} montado uma vez por conjunto de padrões (invalidado quando
+discovered_patterns é substituído), ou, dado o embedding da tarefa, da
+busca pelos padrões mais próximos.
+
+Os padrões validados e suas versões são gravados no PatternStore
+(memory/pattern_store.py) a cada execução e recarregados no construtor,
+de modo que consumidores leem o último resultado sem nova descoberta.
 """
 
+import os
+import sqlite3
+import time
 import yaml
 import json
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
-from collections import Counter, defaultdict
-from sklearn.cluster import DBSCAN
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from collections import Counter, deque
+from contextlib import ExitStack
+from scipy import sparse
+from sklearn.preprocessing import normalize
 
-from memory.hybrid_store import GraphRAGMemoryStore # Alterado de HybridMemoryStore
+from memory.hybrid_store import BaseMemoryStore, create_memory_store
+from memory.code_fingerprint import fingerprint, structural_vector
+from memory.experience_stream import ExperienceStream
+from memory.pattern_clustering import dbscan_from_graph, dbscan_labels
+from memory.pattern_stages import (
+    assign_stage, graph_rows_stage, task_stage, quality_stage, run_stages, share_array
+)
+from memory.pattern_state import PatternState, QUALITY_ELEMENTS, add_to_cluster, merge_domains, merge_quality
+from memory.pattern_store import DiscoveredPattern, PatternStore, summarize_patterns
 from config.paths import IDENTITY_STATE # Removido SYMBOLIC_TIMELINE, MEMORY_LOG
+from config.settings import GRAPHRAG_CONFIG
+
+MIN_CODE_LENGTH = 20      # códigos menores não entram no clustering
+MAX_SUMMARY_CODE = 2000   # código guardado por experiência no buffer de outliers
+MAX_RECOMMENDATIONS = 5
+MAX_PATTERN_EMBEDDING_IDS = 20  # experiências usadas no vetor médio de cada padrão
 
-@dataclass
-class DiscoveredPattern:
-    """Padrão descoberto pelo sistema"""
-    id: str
-    name: str
-    description: str
-    template: str
-    success_rate: float
-    usage_count: int
-    contexts: List[str]
-    quality_impact: float
-    discovery_date: datetime
-    related_experiences: List[str]
-    confidence_score: float
+# Contextos devolvidos por _extract_context (chaves do índice de recomendações)
+TASK_CONTEXTS = ('authentication', 'api_development', 'database', 'testing',
+                 'file_processing', 'mathematical', 'general')
 
 
 class PatternDiscoveryEngine:
@@ -39,40 +69,94 @@ class PatternDiscoveryEngine:
     Engine para descoberta automática de padrões de codificação
     """
     
-    def __init__(self, memory_store: GraphRAGMemoryStore): # Alterado de HybridMemoryStore
+    def __init__(self, memory_store: BaseMemoryStore, state_path=None,
+                 incremental: Optional[bool] = None, pattern_store: Optional[PatternStore] = None):
         self.memory = memory_store
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 3)
-        )
+        self.config = GRAPHRAG_CONFIG["pattern_discovery"]
+        self.incremental = self.config["incremental"] if incremental is None else incremental
+        self.state_path = state_path or self.config["state_path"]
+        self.state: Optional[PatternState] = None
+        self._recommendation_index: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._pattern_vectors: Optional[Tuple[List[DiscoveredPattern], np.ndarray]] = None
         self.discovered_patterns = []
         self.pattern_evolution = {}
+        self.last_run: Dict[str, Any] = {}
+        self._stage_seconds: Dict[str, float] = {}
+        if pattern_store is None and self.config["persist_patterns"]:
+            pattern_store = PatternStore(self.config["store_path"])
+        self.pattern_store = pattern_store
+        self._warm_start()
+    
+    def _warm_start(self):
+        """Carrega os padrões da última execução persistida (sem rodar a descoberta)"""
+        if self.pattern_store is None:
+            return
+        try:
+            self.discovered_patterns = self.pattern_store.load_patterns()
+            self._load_evolution(self.discovered_patterns)
+            self.last_run = self.pattern_store.last_run()
+        except sqlite3.Error as e:
+            print(f"⚠️ Padrões persistidos indisponíveis: {e}")
+    
+    def find_patterns(self, context: str) -> List[DiscoveredPattern]:
+        """Padrões conhecidos de um contexto, por confiança decrescente"""
+        return [p for p in self.discovered_patterns if context in p.contexts]
         
     def discover_patterns(self, min_occurrences: int = 3, 
-                         min_success_rate: float = 0.7) -> List[DiscoveredPattern]:
+                         min_success_rate: float = 0.7,
+                         force_rebuild: bool = False) -> List[DiscoveredPattern]:
         """
-        Descobre padrões emergentes nas experiências armazenadas
+        Descobre padrões emergentes nas experiências armazenadas.
+        
+        Com estado persistido, processa só as experiências novas; a
+        reconstrução completa ocorre sem estado, com force_rebuild ou
+        quando _detect_drift() indica deriva.
         """
         print("🔍 Iniciando descoberta de padrões...")
         
-        # 1. Coletar experiências recentes
-        experiences = self._collect_recent_experiences()
-        if len(experiences) < min_occurrences:
-            print(f"⚠️ Poucas experiências ({len(experiences)}) para descobrir padrões")
-            return []
+        # 1. Carregar estado ou coletar o histórico para reconstrução
+        state = None
+        if self.incremental and not force_rebuild:
+            state = self.state or PatternState.load(self.state_path)
         
-        # 2. Análise de clustering por similaridade
-        code_clusters = self._cluster_by_code_similarity(experiences)
+        new_count = 0
+        reason = "sem estado" if state is None else None
+        if state is not None:
+            batch, truncated = self._collect_new_experiences(state.watermark)
+            new_count = len(batch)
+            summaries, items, vectors = self._prepare_batch([] if truncated else batch)
+            reason = "volume de novas experiências" if truncated else self._detect_drift(state, items, vectors, len(batch))
+            if reason is None and batch:
+                # 2-4. Atualização online: clusters, domínios e qualidade
+                self._run_stages(state, summaries, items, vectors, rebuild=False)
+                state.since_rebuild += len(batch)
+                state.advance_watermark(batch)
         
-        # 3. Análise de padrões por domínio/tarefa  
-        task_patterns = self._analyze_task_patterns(experiences)
+        if reason is not None:
+            if state is not None:
+                print(f"🔄 Reconstruindo padrões: {reason}")
+            experiences = self._collect_recent_experiences(self.config["history_days"])
+            if len(experiences) < min_occurrences:
+                print(f"⚠️ Poucas experiências ({len(experiences)}) para descobrir padrões")
+                return []
+            state = self._rebuild_state(experiences)
+            new_count = len(experiences)
         
-        # 4. Análise de qualidade vs abordagem
-        quality_patterns = self._analyze_quality_patterns(experiences)
+        if self.incremental:
+            try:
+                state.save(self.state_path)
+            except OSError as e:
+                print(f"⚠️ Erro ao salvar estado da descoberta: {e}")
+        self.state = state
+        self.last_run = {"mode": "rebuild" if reason else "incremental", "reason": reason,
+                         "experiences_processed": new_count,
+                         "clusters": len(state.clusters), "outliers": len(state.outliers),
+                         "stage_seconds": self._stage_seconds}
+        self._stage_seconds = {}
         
-        # 5. Combinar e validar padrões
-        all_patterns = code_clusters + task_patterns + quality_patterns
+        # 5. Derivar padrões do estado, combinar e validar
+        all_patterns = (self._code_cluster_patterns(state) + self._task_patterns(state)
+                        + self._quality_patterns(state))
         validated_patterns = self._validate_patterns(all_patterns, min_occurrences, min_success_rate)
         
         # 6. Atualizar padrões conhecidos
@@ -82,102 +166,313 @@ class PatternDiscoveryEngine:
         self._integrate_with_symbolic_system(validated_patterns)
         
         self.discovered_patterns = validated_patterns
-        print(f"✅ {len(validated_patterns)} padrões descobertos")
+        self._persist_patterns(validated_patterns)
+        print(f"✅ {len(validated_patterns)} padrões descobertos "
+              f"({self.last_run['mode']}, {new_count} experiências processadas)")
         
         return validated_patterns
     
     def _collect_recent_experiences(self, days_ago: int = 30) -> List[Dict]:
-        """Coleta experiências recentes do GraphRAG"""
-        experiences = []
+        """
+        Coleta as experiências da janela de histórico (reconstrução).
+        
+        Paginação por chave a partir do início da janela; guarda no máximo
+        rebuild_limit experiências (as mais recentes).
+        """
+        experiences = deque(maxlen=self.config["rebuild_limit"])
         
         try:
-            # Experiências do GraphRAG
+            # Experiências do GraphRAG (qualquer backend de memória)
             if self.memory: # Verificar se a memória está inicializada
-                with self.memory.neo4j.session() as session:
-                    result = session.run("""
-                        MATCH (e:Experience)-[:GENERATED_CODE]->(c:Code)
-                        WHERE e.timestamp > datetime() - duration('P30D')
-                        RETURN e, c
-                        ORDER BY e.timestamp DESC
-                        LIMIT 100
-                    """)
-                    
-                    for record in result:
-                        exp = record['e']
-                        code = record['c']
-                        experiences.append({
-                            'id': exp['id'],
-                            'task': exp['task_description'],
-                            'code': code['content'],
-                            'quality': exp['quality_score'], 
-                            'success': exp['execution_success'],
-                            'agent': exp['agent_name'],
-                            'timestamp': exp['timestamp'],
-                            'source': 'graphrag'
-                        })
+                since = (datetime.now() - timedelta(days=days_ago)).isoformat()
+                for page in self._iter_pages(since=since):
+                    experiences.extend(page)
             
         except Exception as e:
             print(f"⚠️ Erro ao coletar experiências do GraphRAG: {e}")
         
-        return experiences
+        return list(experiences)
+    
+    def _collect_new_experiences(self, watermark: Optional[Tuple[str, str]]) -> Tuple[List[Dict], bool]:
+        """Experiências posteriores à marca d'água; truncated=True se passar de rebuild_limit"""
+        experiences = []
+        limit = self.config["rebuild_limit"]
+        
+        try:
+            for page in self._iter_pages(after=tuple(watermark) if watermark else None):
+                experiences.extend(page)
+                if len(experiences) > limit:
+                    return experiences, True
+        except Exception as e:
+            print(f"⚠️ Erro ao coletar experiências novas: {e}")
+        
+        return experiences, False
+    
+    def _iter_pages(self, after: Optional[Tuple[str, str]] = None, since: Optional[str] = None):
+        """Páginas de experiências (com embeddings) em ordem (timestamp, id)"""
+        with ExperienceStream(self.memory, after=after, since=since, include_embeddings=True) as stream:
+            yield from stream.pages()
     
     # Removido _extract_yaml_experiences
     
-    def _cluster_by_code_similarity(self, experiences: List[Dict]) -> List[DiscoveredPattern]:
-        """Agrupa experiências por similaridade de código"""
-        patterns = []
+    def _summarize_experience(self, exp: Dict) -> Dict[str, Any]:
+        """
+        Campos usados pelos agregados. A impressão digital estrutural é
+        calculada sobre o código completo (em cache); o código guardado no
+        estado é truncado.
+        """
+        code = exp.get('code') or ''
+        structure = fingerprint(code)
+        return {
+            'id': exp.get('id', ''),
+            'code': code[:MAX_SUMMARY_CODE],
+            'success': bool(exp.get('success', False)),
+            'quality': float(exp.get('quality') or 0.0),
+            'context': self._extract_context(exp.get('task') or ''),
+            'features': sorted(structure.features),
+            'shape': structure.shape,
+            'fingerprint': structure.hash,
+        }
+    
+    def _prepare_batch(self, experiences: List[Dict]) -> Tuple[List[Dict], List[Dict], np.ndarray]:
+        """
+        Resumos de todas as experiências e, para as que entram no clustering,
+        os resumos (items) alinhados aos vetores de código (linhas normalizadas).
+        """
+        summaries = [self._summarize_experience(exp) for exp in experiences]
+        positions = [i for i, s in enumerate(summaries) if len(s['code'].strip()) > MIN_CODE_LENGTH]
+        vectors, kept = self._code_vectors([experiences[i] for i in positions])
+        return summaries, [summaries[positions[i]] for i in kept], vectors
+    
+    def _code_vectors(self, experiences: List[Dict]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Embedding armazenado (ou calculado pelo cache de embeddings do store,
+        se faltar) concatenado à impressão digital estrutural, com pesos tais
+        que o cosseno combinado = (1 - w)·cos_semântico + w·cos_estrutural.
+        Retorna (vetores normalizados, posições das experiências que têm vetor).
+        """
+        embeddings = [exp.get('embedding') for exp in experiences]
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        if missing:
+            try:
+                encoded = self.memory.embeddings.encode_batch(
+                    [f"{experiences[i].get('task') or ''} {experiences[i].get('code') or ''}" for i in missing]
+                )
+                for i, vector in zip(missing, encoded):
+                    embeddings[i] = vector
+            except Exception as e:
+                print(f"⚠️ Embeddings indisponíveis para {len(missing)} experiências: {e}")
+        
+        kept = [i for i, vector in enumerate(embeddings) if vector is not None]
+        if not kept:
+            return np.zeros((0, 0), dtype=np.float32), kept
+        
+        semantic = normalize(np.asarray([embeddings[i] for i in kept], dtype=np.float32))
+        weight = self.config["fingerprint_weight"]
+        if weight <= 0:
+            return semantic, kept
+        structure = np.vstack([structural_vector(experiences[i].get('code') or '') for i in kept])
+        combined = np.hstack([np.sqrt(1.0 - weight) * semantic, np.sqrt(weight) * structure])
+        return normalize(combined).astype(np.float32), kept
+    
+    # ------------------------------------------------------------ reconstrução
+    
+    def _rebuild_state(self, experiences: List[Dict]) -> PatternState:
+        """Reconstrói o estado completo a partir da janela de histórico"""
+        state = PatternState()
+        summaries, items, vectors = self._prepare_batch(experiences)
+        
+        self._run_stages(state, summaries, items, vectors, rebuild=True)
+        
+        state.advance_watermark(experiences)
+        state.baseline = {
+            'size': len(summaries),
+            'outlier_rate': len(state.outliers) / len(items) if items else 0.0,
+        }
+        state.since_rebuild = 0
+        state.rebuilt_at = datetime.now().isoformat()
+        return state
+    
+    # ---------------------------------------------------------------- estágios
+    
+    def _stage_workers(self, batch_size: int) -> int:
+        """
+        Processos para os estágios: 1 (em série) abaixo de parallel_min_experiences.
+        Lotes são limitados a rebuild_limit, que por isso também limita o limiar.
+        """
+        threshold = min(self.config["parallel_min_experiences"], self.config["rebuild_limit"])
+        if batch_size < threshold:
+            return 1
+        return self.config["parallel_workers"] or os.cpu_count() or 1
+    
+    def _stage_jobs(self, summaries: List[Dict], vectors, count: int, centroids: Optional[np.ndarray],
+                    parts: int) -> Dict[str, Tuple[Any, tuple]]:
+        """
+        Reconstrução (centroids=None): o grafo de vizinhança é dividido em
+        `parts` faixas de linhas; atualização: atribuição aos centroides.
+        parts=0 desliga o clustering.
+        """
+        jobs = {
+            'task_patterns': (task_stage, (summaries,)),
+            'quality_patterns': (quality_stage, (summaries,)),
+        }
+        if parts and centroids is None:
+            bounds = np.linspace(0, count, parts + 1).astype(int)
+            for part, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+                jobs[f'code_graph_{part}'] = (graph_rows_stage, (vectors, self.config["cluster_eps"], start, stop))
+        elif parts:
+            jobs['code_assign'] = (assign_stage, (vectors, centroids))
+        return jobs
+    
+    def _run_stages(self, state: PatternState, summaries: List[Dict], items: List[Dict],
+                    vectors: np.ndarray, rebuild: bool):
+        """
+        Executa clusters de código, agregados por domínio e de qualidade sobre
+        o mesmo lote (em processos paralelos para lotes grandes, com os vetores
+        em shared_memory) e funde os resultados parciais no estado.
+        """
+        start = time.perf_counter()
+        cluster_ids, centroids = (None, None) if rebuild else state.centroid_matrix()
+        cluster = len(items) >= (3 if rebuild else 1)
+        workers = self._stage_workers(len(summaries))
+        parts = (workers if rebuild else 1) if cluster else 0
         
         try:
-            # Extrair códigos válidos
-            codes = [exp['code'] for exp in experiences if exp.get('code') and len(exp['code'].strip()) > 20]
-            
-            if len(codes) < 3:
-                return patterns
-            
-            # Vetorizar códigos
-            code_vectors = self.vectorizer.fit_transform(codes)
-            
-            # Clustering DBSCAN
-            clustering = DBSCAN(eps=0.3, min_samples=2, metric='cosine')
-            clusters = clustering.fit_predict(code_vectors.toarray())
-            
-            # Processar cada cluster
-            cluster_groups = defaultdict(list)
-            for i, cluster_id in enumerate(clusters):
-                if cluster_id != -1:  # Ignorar outliers
-                    cluster_groups[cluster_id].append(i)
-            
-            for cluster_id, indices in cluster_groups.items():
-                if len(indices) >= 2:  # Mínimo 2 experiências similares
-                    cluster_experiences = [experiences[codes.index(experiences[i]['code'])] for i in indices]
-                    pattern = self._extract_code_pattern(cluster_experiences, f"code_cluster_{cluster_id}")
-                    if pattern:
-                        patterns.append(pattern)
-                        
+            with ExitStack() as stack:
+                shared = stack.enter_context(share_array(vectors)) if workers > 1 and cluster else vectors
+                results = run_stages(self._stage_jobs(summaries, shared, len(items), centroids, parts), workers)
         except Exception as e:
-            print(f"⚠️ Erro no clustering de código: {e}")
+            if workers == 1:
+                raise
+            print(f"⚠️ Estágios paralelos falharam, executando em série: {e}")
+            workers = 1
+            parts = 1 if cluster else 0
+            results = run_stages(self._stage_jobs(summaries, vectors, len(items), centroids, parts), workers)
+        
+        domains, task_seconds = results.pop('task_patterns')
+        quality, quality_seconds = results.pop('quality_patterns')
+        merge_domains(state.domains, domains)
+        merge_quality(state.quality, quality)
+        self._stage_seconds = {'task_patterns': task_seconds, 'quality_patterns': quality_seconds}
+        if len(items):
+            state.vector_dimension = vectors.shape[1]
+        if cluster and rebuild:
+            graph = sparse.vstack([results[f'code_graph_{part}'][0] for part in range(parts)], format='csr')
+            clustering_start = time.perf_counter()
+            labels = dbscan_from_graph(graph, self.config["cluster_eps"], min_samples=2)
+            self._apply_cluster_labels(state, items, vectors, labels)
+            code_seconds = (max(seconds for _, seconds in results.values())
+                            + time.perf_counter() - clustering_start)
+        elif cluster:
+            assignment, code_seconds = results['code_assign']
+            self._apply_assignments(state, cluster_ids, items, vectors, assignment)
+        if cluster:
+            self._stage_seconds['code_clusters'] = code_seconds
+        self._stage_seconds.update(total=time.perf_counter() - start, workers=workers)
+    
+    def _apply_cluster_labels(self, state: PatternState, items: List[Dict], vectors: np.ndarray,
+                              labels: np.ndarray):
+        """Reconstrução: clusters a partir dos rótulos DBSCAN; ruído vai para o buffer de outliers"""
+        for label in sorted(set(labels) - {-1}):
+            members = np.flatnonzero(labels == label)
+            cluster = state.add_cluster(vectors[members].mean(axis=0))
+            for index in members:
+                add_to_cluster(cluster, items[index], None)
+        
+        noise = np.flatnonzero(labels == -1)
+        self._buffer_outliers(state, [items[i] for i in noise], vectors[noise])
+    
+    def _apply_assignments(self, state: PatternState, cluster_ids: List[str], items: List[Dict],
+                           vectors: np.ndarray, assignment: Dict[str, np.ndarray]):
+        """Atualização: cada experiência entra no centroide mais próximo ou vira outlier"""
+        threshold = 1 - self.config["cluster_eps"]
+        outliers = []
+        for index, (nearest, score) in enumerate(zip(assignment['nearest'], assignment['similarity'])):
+            if nearest >= 0 and score >= threshold:
+                add_to_cluster(state.clusters[cluster_ids[nearest]], items[index], vectors[index])
+            else:
+                outliers.append(index)
+        
+        self._buffer_outliers(state, [items[i] for i in outliers], vectors[outliers])
+        self._cluster_outliers(state)
+    
+    def _dbscan(self, vectors: np.ndarray) -> np.ndarray:
+        """DBSCAN sobre o grafo esparso de vizinhança por raio"""
+        return dbscan_labels(vectors, eps=self.config["cluster_eps"], min_samples=2)
+    
+    # ------------------------------------------------------- atualização online
+    
+    def _detect_drift(self, state: PatternState, items: List[Dict], vectors: np.ndarray,
+                      batch_size: int) -> Optional[str]:
+        """Motivo para reconstrução completa, ou None se o lote cabe no estado atual"""
+        if len(items) and state.vector_dimension not in (None, vectors.shape[1]):
+            return "dimensão dos vetores de código alterada"
+        if state.since_rebuild + batch_size > self.config["rebuild_growth"] * max(state.baseline.get('size', 0), 1):
+            return "crescimento desde a última reconstrução"
+        if len(items) < self.config["drift_min_batch"]:
+            return None
+        
+        _, similarity = self._nearest_clusters(state, vectors)
+        outlier_rate = float(np.mean(similarity < 1 - self.config["cluster_eps"]))
+        if outlier_rate > max(self.config["drift_outlier_rate"], state.baseline.get('outlier_rate', 0.0)):
+            return f"excesso de outliers ({outlier_rate:.0%})"
+        return None
+    
+    def _nearest_clusters(self, state: PatternState, vectors: np.ndarray) -> Tuple[List[Optional[str]], np.ndarray]:
+        """Cluster mais próximo (cosseno) de cada vetor"""
+        cluster_ids, centroids = state.centroid_matrix()
+        if not cluster_ids:
+            return [None] * vectors.shape[0], np.full(vectors.shape[0], -1.0)
+        similarities = normalize(vectors) @ centroids.T
+        best = similarities.argmax(axis=1)
+        return [cluster_ids[i] for i in best], similarities[np.arange(len(best)), best]
+    
+    def _buffer_outliers(self, state: PatternState, items: List[Dict], vectors: np.ndarray):
+        state.outliers.extend({'summary': item, 'vector': vectors[i]} for i, item in enumerate(items))
+        del state.outliers[:-self.config["max_outliers"]]
+    
+    def _cluster_outliers(self, state: PatternState):
+        """DBSCAN sobre o buffer de outliers: grupos densos viram clusters novos"""
+        if len(state.outliers) < 2:
+            return
         
+        vectors = np.vstack([item['vector'] for item in state.outliers])
+        labels = self._dbscan(vectors)
+        for label in sorted(set(labels) - {-1}):
+            members = np.flatnonzero(labels == label)
+            cluster = state.add_cluster(vectors[members].mean(axis=0))
+            for index in members:
+                add_to_cluster(cluster, state.outliers[index]['summary'], None)
+        state.outliers = [item for item, label in zip(state.outliers, labels) if label == -1]
+    
+    # ------------------------------------------------------ padrões do estado
+    
+    def _code_cluster_patterns(self, state: PatternState) -> List[DiscoveredPattern]:
+        """Padrões dos clusters de código (mínimo 2 experiências similares)"""
+        patterns = []
+        for cluster_id, cluster in state.clusters.items():
+            if cluster['count'] >= 2:
+                pattern = self._extract_code_pattern(cluster, f"code_cluster_{cluster_id}")
+                if pattern:
+                    patterns.append(pattern)
         return patterns
     
-    def _extract_code_pattern(self, similar_experiences: List[Dict], pattern_id: str) -> Optional[DiscoveredPattern]:
-        """Extrai padrão comum de experiências similares"""
+    def _extract_code_pattern(self, cluster: Dict[str, Any], pattern_id: str) -> Optional[DiscoveredPattern]:
+        """Extrai padrão comum de um cluster de experiências similares"""
         try:
             # Calcular métricas do padrão
-            success_rate = sum(1 for exp in similar_experiences if exp.get('success', False)) / len(similar_experiences)
-            avg_quality = sum(exp.get('quality', 0) for exp in similar_experiences) / len(similar_experiences)
+            count = cluster['count']
+            success_rate = cluster['success_count'] / count
+            avg_quality = cluster['quality_sum'] / count
             
-            # Extrair características comuns
-            codes = [exp.get('code', '') for exp in similar_experiences]
-            tasks = [exp.get('task', '') for exp in similar_experiences]
+            # Identificar template comum (características estruturais do cluster)
+            template = self._find_common_code_structure(cluster)
             
-            # Identificar template comum
-            template = self._find_common_code_structure(codes)
-            
-            # Identificar contextos
-            contexts = list(set([self._extract_context(task) for task in tasks]))
+            # Identificar contextos (mais frequentes primeiro)
+            contexts = [context for context, _ in Counter(cluster['contexts']).most_common()]
             
             # Gerar descrição
-            description = self._generate_pattern_description(template, contexts, similar_experiences)
+            description = self._generate_pattern_description(template, contexts, count, cluster['success_count'])
             
             return DiscoveredPattern(
                 id=pattern_id,
@@ -185,172 +480,146 @@ class PatternDiscoveryEngine:
                 description=description,
                 template=template,
                 success_rate=success_rate,
-                usage_count=len(similar_experiences),
+                usage_count=count,
                 contexts=contexts,
                 quality_impact=avg_quality,
                 discovery_date=datetime.now(),
-                related_experiences=[exp.get('id', '') for exp in similar_experiences],
-                confidence_score=min(success_rate + (len(similar_experiences) / 10), 1.0)
+                related_experiences=list(cluster['ids']),
+                confidence_score=min(success_rate + (count / 10), 1.0)
             )
             
         except Exception as e:
             print(f"⚠️ Erro ao extrair padrão: {e}")
             return None
     
-    def _find_common_code_structure(self, codes: List[str]) -> str:
-        """Encontra estrutura comum entre códigos"""
-        if not codes:
+    def _find_common_code_structure(self, cluster: Dict[str, Any]) -> str:
+        """Encontra estrutura comum do cluster (contagens de características da AST)"""
+        count = cluster['count']
+        features = cluster.get('features', {})
+        if not count:
             return ""
         
-        # Análise simples de estruturas comuns
+        # Estrutura comum a partir das impressões digitais
         common_patterns = []
         
         # Verificar padrões de função
-        if all('def ' in code for code in codes):
+        if features.get('function', 0) == count:
             common_patterns.append("def {function_name}({parameters}):")
         
         # Verificar padrões de validação
-        if any(pattern in ' '.join(codes).lower() for pattern in ['if not', 'raise', 'assert']):
+        if features.get('validation', 0):
             common_patterns.append("    # Validação de entrada")
         
         # Verificar padrões de retorno
-        if all('return' in code for code in codes):
+        if features.get('return', 0) == count:
             common_patterns.append("    return {result}")
         
         # Verificar padrões de erro
-        if any('try:' in code for code in codes):
+        if features.get('error_handling', 0):
             common_patterns.append("    # Tratamento de erro")
         
-        template = '\n'.join(common_patterns) if common_patterns else codes[0][:100] + "..."
-        return template
+        # Forma de fluxo de controle mais frequente (grupo por hash da impressão digital)
+        structures = cluster.get('structures', {})
+        if structures:
+            dominant = max(structures.values(), key=lambda structure: structure['count'])
+            if dominant['shape']:
+                common_patterns.append(f"# Estrutura: {dominant['shape']}")
+        
+        if common_patterns:
+            return '\n'.join(common_patterns)
+        samples = cluster.get('samples') or ['']
+        return samples[0][:100] + "..."
     
-    def _analyze_task_patterns(self, experiences: List[Dict]) -> List[DiscoveredPattern]:
-        """Analisa padrões por tipo de tarefa"""
+    def _task_patterns(self, state: PatternState) -> List[DiscoveredPattern]:
+        """Padrões por tipo de tarefa (mínimo 3 experiências por domínio)"""
         patterns = []
-        
-        try:
-            # Agrupar por domínio de tarefa
-            task_groups = defaultdict(list)
-            
-            for exp in experiences:
-                domain = self._extract_context(exp.get('task', ''))
-                task_groups[domain].append(exp)
-            
-            # Analisar cada grupo
-            for domain, group_experiences in task_groups.items():
-                if len(group_experiences) >= 3:  # Mínimo 3 experiências por domínio
-                    pattern = self._create_task_pattern(domain, group_experiences)
-                    if pattern:
-                        patterns.append(pattern)
-                        
-        except Exception as e:
-            print(f"⚠️ Erro na análise de padrões de tarefa: {e}")
-        
+        for domain, aggregate in state.domains.items():
+            if aggregate['count'] >= 3:
+                pattern = self._create_task_pattern(domain, aggregate)
+                if pattern:
+                    patterns.append(pattern)
         return patterns
     
-    def _create_task_pattern(self, domain: str, experiences: List[Dict]) -> Optional[DiscoveredPattern]:
+    def _create_task_pattern(self, domain: str, aggregate: Dict[str, Any]) -> Optional[DiscoveredPattern]:
         """Cria padrão baseado em domínio de tarefa"""
         try:
             # Calcular métricas
-            success_rate = sum(1 for exp in experiences if exp.get('success', False)) / len(experiences)
-            avg_quality = sum(exp.get('quality', 0) for exp in experiences) / len(experiences)
+            count = aggregate['count']
+            success_rate = aggregate['success_count'] / count
+            avg_quality = aggregate['quality_sum'] / count
             
-            # Identificar abordagens bem-sucedidas
-            successful_approaches = [
-                exp for exp in experiences 
-                if exp.get('success', False) and exp.get('quality', 0) >= 7.0
-            ]
-            
-            if not successful_approaches:
+            # Abordagens bem-sucedidas (sucesso e qualidade >= 7)
+            successful = aggregate['successful']
+            if not successful:
                 return None
             
-            # Extrair template de abordagem
-            best_approach = max(successful_approaches, key=lambda x: x.get('quality', 0))
-            template = best_approach.get('code', '')[:200] + "..." if len(best_approach.get('code', '')) > 200 else best_approach.get('code', '')
-            
             # Gerar descrição
-            description = f"Padrão para tarefas de {domain}: abordagem bem-sucedida em {len(successful_approaches)}/{len(experiences)} casos"
+            description = f"Padrão para tarefas de {domain}: abordagem bem-sucedida em {successful}/{count} casos"
             
             return DiscoveredPattern(
                 id=f"task_pattern_{domain}",
                 name=f"Padrão {domain.title()}",
                 description=description,
-                template=template,
+                template=aggregate['best']['template'],
                 success_rate=success_rate,
-                usage_count=len(experiences),
+                usage_count=count,
                 contexts=[domain],
                 quality_impact=avg_quality,
                 discovery_date=datetime.now(),
-                related_experiences=[exp.get('id', '') for exp in experiences],
-                confidence_score=min(success_rate * (len(successful_approaches) / len(experiences)), 1.0)
+                related_experiences=list(aggregate['ids']),
+                confidence_score=min(success_rate * (successful / count), 1.0)
             )
             
         except Exception as e:
             print(f"⚠️ Erro ao criar padrão de tarefa: {e}")
             return None
     
-    def _analyze_quality_patterns(self, experiences: List[Dict]) -> List[DiscoveredPattern]:
-        """Analisa padrões que levam a alta qualidade"""
+    def _quality_patterns(self, state: PatternState) -> List[DiscoveredPattern]:
+        """Padrões que levam a alta qualidade"""
         patterns = []
+        quality = state.quality
+        high = quality['high']
         
-        try:
-            # Dividir em alta e baixa qualidade
-            high_quality = [exp for exp in experiences if exp.get('quality', 0) >= 8.0]
-            low_quality = [exp for exp in experiences if exp.get('quality', 0) < 6.0]
-            
-            if len(high_quality) < 3:
-                return patterns
-            
-            # Analisar características de alta qualidade
-            hq_codes = [exp.get('code', '') for exp in high_quality]
-            lq_codes = [exp.get('code', '') for exp in low_quality]
-            
-            # Encontrar elementos que aparecem mais em alta qualidade
-            quality_indicators = self._find_quality_indicators(hq_codes, lq_codes)
-            
-            if quality_indicators:
-                pattern = DiscoveredPattern(
-                    id="quality_pattern_high",
-                    name="Padrão de Alta Qualidade",
-                    description=f"Elementos que aumentam qualidade: {', '.join(quality_indicators)}",
-                    template=f"# Incluir: {', '.join(quality_indicators)}",
-                    success_rate=1.0,
-                    usage_count=len(high_quality),
-                    contexts=["quality_improvement"],
-                    quality_impact=sum(exp.get('quality', 0) for exp in high_quality) / len(high_quality),
-                    discovery_date=datetime.now(),
-                    related_experiences=[exp.get('id', '') for exp in high_quality],
-                    confidence_score=len(high_quality) / len(experiences)
-                )
-                patterns.append(pattern)
-                
-        except Exception as e:
-            print(f"⚠️ Erro na análise de padrões de qualidade: {e}")
+        if high['count'] < 3:
+            return patterns
+        
+        # Encontrar elementos que aparecem mais em alta qualidade
+        quality_indicators = self._find_quality_indicators(quality['high_elements'], quality['low_elements'],
+                                                           high['count'], quality['low_count'])
+        
+        if quality_indicators:
+            patterns.append(DiscoveredPattern(
+                id="quality_pattern_high",
+                name="Padrão de Alta Qualidade",
+                description=f"Elementos que aumentam qualidade: {', '.join(quality_indicators)}",
+                template=f"# Incluir: {', '.join(quality_indicators)}",
+                success_rate=1.0,
+                usage_count=high['count'],
+                contexts=["quality_improvement"],
+                quality_impact=high['quality_sum'] / high['count'],
+                discovery_date=datetime.now(),
+                related_experiences=list(high['ids']),
+                confidence_score=high['count'] / quality['total']
+            ))
         
         return patterns
     
-    def _find_quality_indicators(self, high_quality_codes: List[str], low_quality_codes: List[str]) -> List[str]:
-        """Encontra elementos que indicam alta qualidade"""
+    def _find_quality_indicators(self, high_quality_counts: Dict[str, int],
+                                 low_quality_counts: Dict[str, int],
+                                 high_total: int = 1, low_total: int = 1) -> List[str]:
+        """
+        Encontra elementos que indicam alta qualidade: fração dos trechos de
+        alta qualidade com o elemento (quality_element_counts) contra a
+        fração nos de baixa qualidade.
+        """
         indicators = []
         
-        # Elementos a verificar
-        quality_elements = [
-            ('docstrings', ['"""', "'''"]),
-            ('error_handling', ['try:', 'except:', 'raise']),
-            ('validation', ['if not', 'assert', 'validate']),
-            ('comments', ['#']),
-            ('type_hints', [': str', ': int', ': float', ': bool', '->'])
-        ]
-        
-        hq_text = ' '.join(high_quality_codes).lower()
-        lq_text = ' '.join(low_quality_codes).lower() if low_quality_codes else ''
-        
-        for element_name, keywords in quality_elements:
-            hq_count = sum(hq_text.count(keyword) for keyword in keywords)
-            lq_count = sum(lq_text.count(keyword) for keyword in keywords) if lq_text else 0
+        for element_name in QUALITY_ELEMENTS:
+            hq_rate = high_quality_counts.get(element_name, 0) / max(high_total, 1)
+            lq_rate = low_quality_counts.get(element_name, 0) / max(low_total, 1)
             
             # Se aparece mais em alta qualidade
-            if hq_count > lq_count * 1.5:  # 50% mais frequente
+            if hq_rate > 0 and hq_rate > lq_rate * 1.5:  # 50% mais frequente
                 indicators.append(element_name)
         
         return indicators
@@ -372,7 +641,15 @@ class PatternDiscoveryEngine:
         return validated
     
     def _update_pattern_evolution(self, new_patterns: List[DiscoveredPattern]):
-        """Atualiza evolução dos padrões ao longo do tempo"""
+        """
+        Atualiza evolução dos padrões ao longo do tempo.
+        
+        Só sem PatternStore: com ele, a série é a do store (uma versão por
+        mudança) e é recarregada em _persist_patterns, para que o resumo do
+        motor e PatternStore.export_summary() não divirjam.
+        """
+        if self.pattern_store is not None:
+            return
         timestamp = datetime.now().isoformat()
         
         for pattern in new_patterns:
@@ -386,6 +663,23 @@ class PatternDiscoveryEngine:
                 'quality_impact': pattern.quality_impact,
                 'confidence_score': pattern.confidence_score
             })
+            del self.pattern_evolution[pattern.id][:-self.config["evolution_history"]]
+    
+    def _persist_patterns(self, patterns: List[DiscoveredPattern]):
+        """Grava a execução no PatternStore (nova versão dos padrões alterados)"""
+        if self.pattern_store is None:
+            return
+        try:
+            self.pattern_store.save_run(patterns, self.last_run)
+            self.last_run = self.pattern_store.last_run()  # com run_id e finished_at, como no warm start
+            self._load_evolution(patterns)
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao persistir padrões: {e}")
+    
+    def _load_evolution(self, patterns: List[DiscoveredPattern]):
+        """pattern_evolution a partir das versões gravadas dos padrões ativos"""
+        self.pattern_evolution = self.pattern_store.load_evolution([p.id for p in patterns],
+                                                                   limit=self.config["evolution_history"])
     
     def _integrate_with_symbolic_system(self, patterns: List[DiscoveredPattern]):
         """
@@ -534,57 +828,110 @@ class PatternDiscoveryEngine:
             return 'general'
     
     def _generate_pattern_description(self, template: str, contexts: List[str], 
-                                    experiences: List[Dict]) -> str:
+                                    usage_count: int, success_count: int) -> str:
         """Gera descrição humana do padrão"""
         context_str = ', '.join(contexts) if contexts else 'geral'
-        success_count = sum(1 for exp in experiences if exp.get('success', False))
         
-        return f"Padrão comum para {context_str}: usado em {len(experiences)} casos, {success_count} sucessos"
+        return f"Padrão comum para {context_str}: usado em {usage_count} casos, {success_count} sucessos"
+    
+    @property
+    def discovered_patterns(self) -> List[DiscoveredPattern]:
+        return self._discovered_patterns
+    
+    @discovered_patterns.setter
+    def discovered_patterns(self, patterns: List[DiscoveredPattern]):
+        """Substituir os padrões invalida o índice de recomendações"""
+        self._discovered_patterns = list(patterns)
+        self._recommendation_index = None
+        self._pattern_vectors = None
     
-    def get_pattern_recommendations(self, current_task: str) -> List[Dict[str, Any]]:
-        """Retorna recomendações de padrões para tarefa atual"""
+    def get_pattern_recommendations(self, current_task: str,
+                                    task_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna recomendações de padrões para tarefa atual.
+        
+        Sem task_embedding: consulta ao índice por contexto (pré-ordenado,
+        custo constante). Com task_embedding (o vetor da tarefa que o agente
+        já calculou para a recuperação): padrões mais próximos pelo vetor
+        médio das suas experiências.
+        """
         if not self.discovered_patterns:
             return []
         
-        task_context = self._extract_context(current_task)
-        recommendations = []
-        
-        for pattern in self.discovered_patterns:
-            if (task_context in pattern.contexts or 
-                'general' in pattern.contexts or
-                pattern.success_rate > 0.9):
-                
-                relevance_score = self._calculate_relevance(pattern, current_task, task_context)
-                
-                recommendations.append({
-                    'pattern': pattern,
-                    'relevance_score': relevance_score,
-                    'recommendation': self._generate_recommendation_text(pattern, current_task)
-                })
+        if task_embedding is not None:
+            return self._nearest_pattern_recommendations(task_embedding)
         
-        # Ordenar por relevância
-        recommendations.sort(key=lambda x: x['relevance_score'], reverse=True)
+        if self._recommendation_index is None:
+            self._recommendation_index = self._build_recommendation_index()
         
-        return recommendations[:5]  # Top 5 recomendações
+        task_context = self._extract_context(current_task)
+        return [dict(item) for item in self._recommendation_index.get(task_context, [])]
     
-    def _calculate_relevance(self, pattern: DiscoveredPattern, task: str, context: str) -> float:
-        """Calcula relevância do padrão para a tarefa"""
-        score = 0.0
-        
-        # Contexto matching
-        if context in pattern.contexts:
-            score += 0.4
-        
-        # Success rate
-        score += pattern.success_rate * 0.3
+    def _recommendation(self, pattern: DiscoveredPattern, relevance_score: float, **extra) -> Dict[str, Any]:
+        return dict({
+            'pattern': pattern,
+            'relevance_score': relevance_score,
+            'recommendation': self._generate_recommendation_text(pattern, '')
+        }, **extra)
+    
+    def _build_recommendation_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """{contexto: top recomendações} com a parte estática da relevância pré-calculada"""
+        scored = [(pattern, self._static_score(pattern)) for pattern in self.discovered_patterns]
+        contexts = set(TASK_CONTEXTS) | {context for pattern in self.discovered_patterns for context in pattern.contexts}
         
-        # Quality impact
-        score += (pattern.quality_impact / 10.0) * 0.2
+        index = {}
+        for context in contexts:
+            candidates = [
+                (min(score + (0.4 if context in pattern.contexts else 0.0), 1.0), pattern)
+                for pattern, score in scored
+                if context in pattern.contexts or 'general' in pattern.contexts or pattern.success_rate > 0.9
+            ]
+            # Ordenação estável: empates mantêm a ordem de discovered_patterns
+            candidates.sort(key=lambda item: item[0], reverse=True)
+            index[context] = [self._recommendation(pattern, relevance)
+                              for relevance, pattern in candidates[:MAX_RECOMMENDATIONS]]
+        return index
+    
+    def _build_pattern_vectors(self) -> Tuple[List[DiscoveredPattern], np.ndarray]:
+        """Vetor médio (normalizado) dos embeddings das experiências de cada padrão"""
+        ids = {pattern.id: pattern.related_experiences[-MAX_PATTERN_EMBEDDING_IDS:]
+               for pattern in self.discovered_patterns}
+        try:
+            embeddings = self.memory.get_embeddings(sorted({exp_id for group in ids.values() for exp_id in group}))
+        except Exception as e:
+            print(f"⚠️ Embeddings dos padrões indisponíveis: {e}")
+            embeddings = {}
         
-        # Confidence
-        score += pattern.confidence_score * 0.1
+        patterns, vectors = [], []
+        for pattern in self.discovered_patterns:
+            found = [embeddings[exp_id] for exp_id in ids[pattern.id] if exp_id in embeddings]
+            if found:
+                patterns.append(pattern)
+                vectors.append(np.mean(np.asarray(found, dtype=np.float32), axis=0))
+        if not vectors:
+            return [], np.zeros((0, 0), dtype=np.float32)
+        return patterns, normalize(np.vstack(vectors))
+    
+    def _nearest_pattern_recommendations(self, task_embedding: List[float]) -> List[Dict[str, Any]]:
+        if self._pattern_vectors is None:
+            self._pattern_vectors = self._build_pattern_vectors()
+        patterns, vectors = self._pattern_vectors
+        query = np.asarray(task_embedding, dtype=np.float32)
+        if not patterns or query.shape[0] != vectors.shape[1]:
+            return []
         
-        return min(score, 1.0)
+        similarities = vectors @ (query / (np.linalg.norm(query) or 1.0))
+        scored = [(min(self._static_score(pattern) + 0.4 * max(float(similarity), 0.0), 1.0), pattern, float(similarity))
+                  for pattern, similarity in zip(patterns, similarities)]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [self._recommendation(pattern, relevance, similarity=similarity)
+                for relevance, pattern, similarity in scored[:MAX_RECOMMENDATIONS]]
+    
+    def _static_score(self, pattern: DiscoveredPattern) -> float:
+        """Parte da relevância que não depende da tarefa"""
+        return (pattern.success_rate * 0.3
+                + (pattern.quality_impact / 10.0) * 0.2
+                + pattern.confidence_score * 0.1)
     
     def _generate_recommendation_text(self, pattern: DiscoveredPattern, task: str) -> str:
         """Gera texto de recomendação para o padrão"""
@@ -592,80 +939,196 @@ class PatternDiscoveryEngine:
     
     def export_patterns_summary(self) -> Dict[str, Any]:
         """Exporta resumo dos padrões para dashboard"""
-        return {
-            'total_patterns': len(self.discovered_patterns),
-            'patterns': [
-                {
-                    'id': p.id,
-                    'name': p.name,
-                    'description': p.description,
-                    'success_rate': p.success_rate,
-                    'usage_count': p.usage_count,
-                    'quality_impact': p.quality_impact,
-                    'contexts': p.contexts,
-                    'confidence_score': p.confidence_score,
-                    'discovery_date': p.discovery_date.isoformat()
-                }
-                for p in self.discovered_patterns
-            ],
-            'pattern_evolution': self.pattern_evolution,
-            'summary_stats': {
-                'avg_success_rate': sum(p.success_rate for p in self.discovered_patterns) / len(self.discovered_patterns) if self.discovered_patterns else 0,
-                'total_experiences_analyzed': sum(p.usage_count for p in self.discovered_patterns),
-                'high_confidence_patterns': len([p for p in self.discovered_patterns if p.confidence_score > 0.8])
-            }
-        }
+        return summarize_patterns(self.discovered_patterns, self.pattern_evolution, self.last_run)
 
 
-# Scheduler para execução automática (mantido inalterado)
+# Scheduler para execução automática (dirigido por eventos)
 import threading
-import time
 
 class PatternDiscoveryScheduler:
-    """Scheduler para executar descoberta de padrões automaticamente"""
+    """
+    Scheduler para executar descoberta de padrões automaticamente.
+    
+    Dispara quando há min_new_experiences experiências novas desde a última
+    execução ou quando interval_hours se passaram. A thread espera num
+    threading.Event (stop() e notify_new_experiences() a acordam na hora) e
+    consulta a memória a cada check_seconds. O scheduler se registra como
+    listener de escrita do memory store, então cada store_experience conta;
+    stop() remove o listener (start() o registra de novo), para que o store
+    não mantenha vivo um scheduler parado. Execuções sobrepostas são
+    ignoradas; horário, marca d'água e durações ficam em state_path.
+    """
+    
+    MAX_DURATIONS = 20
     
     def __init__(self, discovery_engine: PatternDiscoveryEngine, 
-                 interval_hours: int = 24):
+                 interval_hours: int = 24,
+                 min_new_experiences: Optional[int] = None,
+                 check_seconds: Optional[float] = None,
+                 state_path=None):
+        config = GRAPHRAG_CONFIG["pattern_discovery"]
         self.engine = discovery_engine
         self.interval_hours = interval_hours
+        self.min_new_experiences = min_new_experiences or config["scheduler_min_new_experiences"]
+        self.check_seconds = check_seconds or config["scheduler_check_seconds"]
+        self.state_path = Path(state_path or config["scheduler_state_path"])
         self.running = False
         self.thread = None
+        self._wake = threading.Event()
+        self._run_lock = threading.Lock()
+        # _run_lock fica preso durante a descoberta; _pending tem lock próprio
+        # para que a escrita que notifica nunca espere uma execução
+        self._pending_lock = threading.Lock()
+        self._pending = 0
+        self.last_run_at: Optional[datetime] = None
+        self.watermark: Optional[Tuple[str, str]] = None
+        self.durations: deque = deque(maxlen=self.MAX_DURATIONS)
+        self._listening = False
+        self._load_state()
+        self._set_listening(True)
     
     def start(self):
         """Inicia execução automática"""
         if not self.running:
             self.running = True
+            self._set_listening(True)
+            self._wake.clear()
             self.thread = threading.Thread(target=self._run_discovery_loop)
             self.thread.daemon = True
             self.thread.start()
-            print(f"🔄 Pattern Discovery agendado a cada {self.interval_hours}h")
+            print(f"🔄 Pattern Discovery agendado: {self.min_new_experiences} experiências novas "
+                  f"ou a cada {self.interval_hours}h")
     
     def stop(self):
-        """Para execução automática"""
+        """Para execução automática (não espera o intervalo; aguarda só a execução em curso)"""
         self.running = False
+        self._set_listening(False)
+        self._wake.set()
         if self.thread:
             self.thread.join()
+            self.thread = None
         print("⏹️ Pattern Discovery interrompido")
     
+    def _set_listening(self, listening: bool):
+        """Registra ou remove notify_new_experiences nos listeners de escrita do store"""
+        name = "add_write_listener" if listening else "remove_write_listener"
+        method = getattr(self.engine.memory, name, None)
+        if callable(method) and listening != self._listening:
+            method(self.notify_new_experiences)
+            self._listening = listening
+    
+    def notify_new_experiences(self, count: int = 1):
+        """Avisa que experiências foram gravadas; acorda o scheduler ao atingir o limite"""
+        with self._pending_lock:
+            self._pending += count
+            reached = self._pending >= self.min_new_experiences
+        if reached:
+            self._wake.set()
+    
     def _run_discovery_loop(self):
         """Loop principal de descoberta"""
         while self.running:
+            reason = self._trigger_reason()
+            if reason:
+                self.run_now(reason)
+            self._wake.wait(self.check_seconds)
+            self._wake.clear()
+    
+    def _trigger_reason(self) -> Optional[str]:
+        """Motivo para executar agora, ou None"""
+        if self.last_run_at is None:
+            return "primeira execução"
+        if datetime.now() - self.last_run_at >= timedelta(hours=self.interval_hours):
+            return f"{self.interval_hours}h desde a última execução"
+        new_experiences = self._count_new_experiences()
+        if new_experiences >= self.min_new_experiences:
+            return f"{new_experiences} experiências novas"
+        return None
+    
+    def _count_new_experiences(self) -> int:
+        """Experiências após a marca d'água (até min_new_experiences, uma página)"""
+        with self._pending_lock:
+            pending = self._pending
+        if pending >= self.min_new_experiences:
+            return pending
+        try:
+            page = self.engine.memory.fetch_experience_page(after=self.watermark, limit=self.min_new_experiences,
+                                                            include_code=False)
+        except Exception as e:
+            print(f"⚠️ Não foi possível contar experiências novas: {e}")
+            return pending
+        return max(pending, len(page))
+    
+    def run_now(self, reason: str = "manual") -> Optional[List[DiscoveredPattern]]:
+        """Executa a descoberta; retorna None se já houver uma execução em curso"""
+        if not self._run_lock.acquire(blocking=False):
+            print("⏭️ Descoberta de padrões já em execução, ignorando disparo")
+            return None
+        try:
+            print(f"🕐 Executando descoberta automática de padrões ({reason})...")
+            with self._pending_lock:
+                self._pending = 0
+            started = time.perf_counter()
             try:
-                print("🕐 Executando descoberta automática de padrões...")
                 patterns = self.engine.discover_patterns()
                 print(f"✅ Descoberta concluída: {len(patterns)} padrões")
-                
             except Exception as e:
+                patterns = None
                 print(f"❌ Erro na descoberta automática: {e}")
-            
-            # Aguardar próxima execução
-            time.sleep(self.interval_hours * 3600)
+            self.durations.append(round(time.perf_counter() - started, 3))
+            self.last_run_at = datetime.now()
+            if self.engine.state is not None and self.engine.state.watermark:
+                self.watermark = tuple(self.engine.state.watermark)
+            self._save_state()
+            return patterns
+        finally:
+            self._run_lock.release()
+    
+    def status(self) -> Dict[str, Any]:
+        """Situação do scheduler (para dashboard/logs)"""
+        with self._pending_lock:
+            pending = self._pending
+        return {
+            "running": self.running,
+            "in_progress": self._run_lock.locked(),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "pending_experiences": pending,
+            "run_durations": list(self.durations),
+            "avg_duration": sum(self.durations) / len(self.durations) if self.durations else None
+        }
+    
+    def _load_state(self):
+        if not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.last_run_at = datetime.fromisoformat(data["last_run_at"]) if data.get("last_run_at") else None
+            self.watermark = tuple(data["watermark"]) if data.get("watermark") else None
+            self.durations.extend(data.get("durations", []))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Estado do scheduler inválido, ignorando: {e}")
+    
+    def _save_state(self):
+        data = {
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "watermark": list(self.watermark) if self.watermark else None,
+            "durations": list(self.durations)
+        }
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            print(f"⚠️ Erro ao salvar estado do scheduler: {e}")
 
 
 # Exemplo de uso (mantido inalterado)
 if __name__ == "__main__":
     # Inicializar sistema
-    memory_store = GraphRAGMemoryStore() # Alterado de HybridMemoryStore
+    memory_store = create_memory_store()
     discovery_engine = PatternDiscoveryEngine(memory_store)
     
     # Descobrir padrões
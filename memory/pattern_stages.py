@@ -0,0 +1,130 @@
+"""
+Estágios da descoberta de padrões como funções puras
+
+Cada estágio recebe um instantâneo somente leitura do lote e devolve um
+resultado parcial, que o processo principal funde no PatternState. Assim
+os estágios (clusters de código, agregados por domínio e de qualidade)
+podem rodar em paralelo num pool de processos: a matriz de vetores de
+código vai por shared_memory (sem cópia via pickle) e os resumos das
+experiências, por pickle. O grafo de vizinhança do clustering, que
+domina o custo, é dividido em faixas de linhas, uma por processo.
+
+Cada estágio devolve (resultado, segundos) para o relatório de tempos.
+Os processos nascem por forkserver (spawn onde não há): a descoberta roda
+ao lado de outras threads (scheduler, prefetch, drivers), e um fork do
+processo com threads pode herdar locks presos.
+"""
+
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from memory.pattern_clustering import dense_radius_rows
+from memory.pattern_state import (
+    quality_element_counts, add_to_aggregate, new_domain_aggregate, new_quality_aggregate
+)
+
+# Descritor de array em memória compartilhada: (nome, shape, dtype)
+SharedRef = Tuple[str, Tuple[int, ...], str]
+
+
+@contextmanager
+def share_array(array: np.ndarray):
+    """Copia o array para um bloco shared_memory e devolve o descritor"""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    try:
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        yield (block.name, array.shape, array.dtype.str)
+    finally:
+        block.close()
+        block.unlink()
+
+
+@contextmanager
+def _attach(vectors):
+    """ndarray a partir de um descritor SharedRef (ou o próprio ndarray)"""
+    if isinstance(vectors, np.ndarray):
+        yield vectors
+        return
+    name, shape, dtype = vectors
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        yield np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    finally:
+        block.close()
+
+
+def graph_rows_stage(vectors, eps: float, start: int, stop: int) -> Tuple[Any, float]:
+    """Faixa [start, stop) do grafo de vizinhança por raio (vetores normalizados)"""
+    started = time.perf_counter()
+    with _attach(vectors) as matrix:
+        rows = dense_radius_rows(matrix, eps, start, stop)
+    return rows, time.perf_counter() - started
+
+
+def assign_stage(vectors, centroids: np.ndarray) -> Tuple[Dict[str, np.ndarray], float]:
+    """Índice do centroide mais próximo de cada vetor e a similaridade de cosseno"""
+    start = time.perf_counter()
+    with _attach(vectors) as matrix:
+        if len(centroids) == 0 or len(matrix) == 0:
+            result = {"nearest": np.full(len(matrix), -1), "similarity": np.full(len(matrix), -1.0)}
+        else:
+            similarities = matrix @ centroids.T
+            nearest = similarities.argmax(axis=1)
+            result = {"nearest": nearest, "similarity": similarities[np.arange(len(nearest)), nearest]}
+    return result, time.perf_counter() - start
+
+
+def task_stage(summaries: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], float]:
+    """Agregados parciais por domínio (melhor abordagem bem-sucedida incluída)"""
+    start = time.perf_counter()
+    domains: Dict[str, Dict[str, Any]] = {}
+    for summary in summaries:
+        domain = domains.setdefault(summary['context'], new_domain_aggregate())
+        add_to_aggregate(domain, summary)
+        if summary['success'] and summary['quality'] >= 7.0:
+            domain['successful'] += 1
+            if domain['best'] is None or summary['quality'] > domain['best']['quality']:
+                code = summary['code']
+                domain['best'] = {
+                    'quality': summary['quality'],
+                    'template': code[:200] + "..." if len(code) > 200 else code,
+                }
+    return domains, time.perf_counter() - start
+
+
+def quality_stage(summaries: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], float]:
+    """Contagens parciais de indicadores em alta (>= 8) e baixa (< 6) qualidade"""
+    start = time.perf_counter()
+    quality = new_quality_aggregate()
+    high = [s for s in summaries if s['quality'] >= 8.0]
+    low = [s for s in summaries if s['quality'] < 6.0]
+
+    quality['total'] = len(summaries)
+    for summary in high:
+        add_to_aggregate(quality['high'], summary)
+    quality['low_count'] = len(low)
+    quality['high_elements'] = quality_element_counts([s['features'] for s in high])
+    quality['low_elements'] = quality_element_counts([s['features'] for s in low])
+    return quality, time.perf_counter() - start
+
+
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def run_stages(jobs: Dict[str, Tuple[Any, tuple]], workers: int) -> Dict[str, Tuple[Any, float]]:
+    """
+    Executa {nome: (função, args)}; com workers > 1, num ProcessPoolExecutor.
+    Retorna {nome: (resultado, segundos)}.
+    """
+    if workers <= 1:
+        return {name: function(*args) for name, (function, args) in jobs.items()}
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                             mp_context=multiprocessing.get_context(START_METHOD)) as pool:
+        futures = {name: pool.submit(function, *args) for name, (function, args) in jobs.items()}
+        return {name: future.result() for name, future in futures.items()}
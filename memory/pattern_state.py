@@ -0,0 +1,210 @@
+"""
+Estado persistido da descoberta incremental de padrões
+
+Guarda tudo o que a descoberta precisa para continuar de onde parou sem
+reprocessar o histórico: marca d'água (timestamp, id) da última
+experiência consumida, dimensão dos vetores de código (embedding
+armazenado + impressão digital estrutural), clusters de código
+(centroide + agregados + amostras), buffer de outliers ainda não
+agrupados, agregados por domínio e contagens de indicadores de
+qualidade. Listas de ids e amostras são limitadas, de modo que o tamanho
+do estado não cresce com o histórico.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+from sklearn.preprocessing import normalize
+
+from memory.experience_export import encode_vector, decode_vector
+
+STATE_VERSION = 3
+MAX_IDS = 200          # ids relacionados guardados por padrão
+MAX_SAMPLES = 10       # códigos de amostra por cluster (template)
+MAX_STRUCTURES = 50    # formas distintas (hash da impressão digital) por cluster
+
+# Características de memory.code_fingerprint usadas por _find_quality_indicators
+QUALITY_ELEMENTS = ('docstrings', 'error_handling', 'validation', 'comments', 'type_hints')
+
+
+def quality_element_counts(feature_sets: List[List[str]]) -> Dict[str, int]:
+    """Trechos que apresentam cada elemento de qualidade (somáveis entre lotes)"""
+    return {name: sum(1 for features in feature_sets if name in features) for name in QUALITY_ELEMENTS}
+
+
+def new_aggregate() -> Dict[str, Any]:
+    return {"count": 0, "success_count": 0, "quality_sum": 0.0, "ids": []}
+
+
+def add_to_aggregate(aggregate: Dict[str, Any], summary: Dict[str, Any]):
+    aggregate["count"] += 1
+    aggregate["success_count"] += int(bool(summary.get("success")))
+    aggregate["quality_sum"] += float(summary.get("quality") or 0.0)
+    aggregate["ids"] = (aggregate["ids"] + [summary.get("id", "")])[-MAX_IDS:]
+
+
+def merge_aggregate(target: Dict[str, Any], partial: Dict[str, Any]):
+    """Soma um agregado parcial (mesmo formato de new_aggregate) em target"""
+    target["count"] += partial["count"]
+    target["success_count"] += partial["success_count"]
+    target["quality_sum"] += partial["quality_sum"]
+    target["ids"] = (target["ids"] + partial["ids"])[-MAX_IDS:]
+
+
+def new_domain_aggregate() -> Dict[str, Any]:
+    return dict(new_aggregate(), successful=0, best=None)
+
+
+def merge_domains(domains: Dict[str, Dict[str, Any]], partial: Dict[str, Dict[str, Any]]):
+    for name, aggregate in partial.items():
+        target = domains.setdefault(name, new_domain_aggregate())
+        merge_aggregate(target, aggregate)
+        target["successful"] += aggregate["successful"]
+        best = aggregate["best"]
+        if best is not None and (target["best"] is None or best["quality"] > target["best"]["quality"]):
+            target["best"] = best
+
+
+def new_quality_aggregate() -> Dict[str, Any]:
+    return {
+        "total": 0,
+        "high": new_aggregate(),
+        "low_count": 0,
+        "high_elements": {name: 0 for name in QUALITY_ELEMENTS},
+        "low_elements": {name: 0 for name in QUALITY_ELEMENTS},
+    }
+
+
+def merge_quality(quality: Dict[str, Any], partial: Dict[str, Any]):
+    quality["total"] += partial["total"]
+    quality["low_count"] += partial["low_count"]
+    merge_aggregate(quality["high"], partial["high"])
+    for key in ("high_elements", "low_elements"):
+        for name, count in partial[key].items():
+            quality[key][name] = quality[key].get(name, 0) + count
+
+
+def new_cluster(centroid: np.ndarray) -> Dict[str, Any]:
+    return dict(new_aggregate(), centroid=np.asarray(centroid, dtype=np.float64),
+                contexts={}, samples=[], features={}, structures={})
+
+
+def add_to_cluster(cluster: Dict[str, Any], summary: Dict[str, Any], vector: Optional[np.ndarray]):
+    """Agrega a experiência e move o centroide (média incremental)"""
+    if vector is not None:
+        count = cluster["count"]
+        cluster["centroid"] = (cluster["centroid"] * count + vector) / (count + 1)
+    add_to_aggregate(cluster, summary)
+    context = summary.get("context", "general")
+    cluster["contexts"][context] = cluster["contexts"].get(context, 0) + 1
+    if len(cluster["samples"]) < MAX_SAMPLES:
+        cluster["samples"].append(summary.get("code", ""))
+    for name in summary.get("features", []):
+        cluster["features"][name] = cluster["features"].get(name, 0) + 1
+    # Agrupamento por hash da impressão digital: {hash: {"shape", "count"}}
+    structure = cluster["structures"].get(summary.get("fingerprint"))
+    if structure is not None:
+        structure["count"] += 1
+    elif summary.get("fingerprint") and len(cluster["structures"]) < MAX_STRUCTURES:
+        cluster["structures"][summary["fingerprint"]] = {"shape": summary.get("shape", ""), "count": 1}
+
+
+class PatternState:
+    """Estado da descoberta incremental (serializável em JSON)"""
+
+    def __init__(self):
+        self.watermark: Optional[Tuple[str, str]] = None
+        self.vector_dimension: Optional[int] = None
+        self.clusters: Dict[str, Dict[str, Any]] = {}
+        self.next_cluster_id = 0
+        self.outliers: List[Dict[str, Any]] = []   # {"summary", "vector": ndarray (d,)}
+        self.domains: Dict[str, Dict[str, Any]] = {}
+        self.quality: Dict[str, Any] = new_quality_aggregate()
+        self.baseline: Dict[str, Any] = {}
+        self.since_rebuild = 0
+        self.rebuilt_at: Optional[str] = None
+        self.updated_at: Optional[str] = None
+
+    def advance_watermark(self, rows: List[Dict[str, Any]]):
+        keys = [(str(row["timestamp"]), str(row["id"])) for row in rows if row.get("timestamp")]
+        if keys:
+            latest = max(keys)
+            if self.watermark is None or latest > tuple(self.watermark):
+                self.watermark = latest
+
+    def add_cluster(self, centroid: np.ndarray) -> Dict[str, Any]:
+        cluster_id = str(self.next_cluster_id)
+        self.next_cluster_id += 1
+        self.clusters[cluster_id] = new_cluster(centroid)
+        return self.clusters[cluster_id]
+
+    def centroid_matrix(self) -> Tuple[List[str], np.ndarray]:
+        ids = list(self.clusters)
+        if not ids:
+            return ids, np.zeros((0, self.vector_dimension or 0))
+        return ids, normalize(np.vstack([self.clusters[cid]["centroid"] for cid in ids]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "watermark": list(self.watermark) if self.watermark else None,
+            "vector_dimension": self.vector_dimension,
+            "clusters": {cid: dict(cluster, centroid=np.round(cluster["centroid"], 6).tolist())
+                         for cid, cluster in self.clusters.items()},
+            "next_cluster_id": self.next_cluster_id,
+            "outliers": [{"summary": item["summary"], "vector": encode_vector(item["vector"])}
+                         for item in self.outliers],
+            "domains": self.domains,
+            "quality": self.quality,
+            "baseline": self.baseline,
+            "since_rebuild": self.since_rebuild,
+            "rebuilt_at": self.rebuilt_at,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PatternState":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Versão de estado não suportada: {data.get('version')}")
+        state = cls()
+        state.watermark = tuple(data["watermark"]) if data.get("watermark") else None
+        state.vector_dimension = data["vector_dimension"]
+        state.clusters = {cid: dict(cluster, centroid=np.asarray(cluster["centroid"], dtype=np.float64))
+                          for cid, cluster in data["clusters"].items()}
+        state.next_cluster_id = data["next_cluster_id"]
+        state.outliers = [{"summary": item["summary"],
+                           "vector": np.asarray(decode_vector(item["vector"]), dtype=np.float32)}
+                          for item in data["outliers"]]
+        state.domains = data["domains"]
+        state.quality = data["quality"]
+        state.baseline = data["baseline"]
+        state.since_rebuild = data["since_rebuild"]
+        state.rebuilt_at = data.get("rebuilt_at")
+        state.updated_at = data.get("updated_at")
+        return state
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.updated_at = datetime.now().isoformat()
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> Optional["PatternState"]:
+        """Estado salvo, ou None se não existir/for inválido (força reconstrução)"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (ValueError, KeyError) as e:
+            print(f"⚠️ Estado de descoberta inválido, reconstruindo: {e}")
+            return None
@@ -0,0 +1,319 @@
+"""
+Store persistente dos padrões descobertos
+
+Os padrões validados de cada execução da descoberta ficam num arquivo
+SQLite local (modo WAL), com:
+  - a versão atual de cada padrão (incrementada só quando métricas,
+    template ou contextos mudam) e a marca de ativo na última execução;
+  - o histórico de versões com data, que substitui pattern_evolution;
+  - um índice padrão × contexto para consultas por contexto;
+  - o resumo de cada execução (last_run do engine).
+
+O PatternDiscoveryEngine carrega o último conjunto no construtor (warm
+start em milissegundos) e o dashboard lê daqui, sem rodar a descoberta.
+A conexão só é aberta quando necessária; leituras de um arquivo
+inexistente devolvem vazio sem criá-lo.
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from config.settings import DATABASE_CONFIG, GRAPHRAG_CONFIG
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS patterns (
+    id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    name TEXT NOT NULL,
+    description TEXT,
+    template TEXT,
+    success_rate REAL NOT NULL,
+    usage_count INTEGER NOT NULL,
+    quality_impact REAL NOT NULL,
+    confidence_score REAL NOT NULL,
+    contexts TEXT NOT NULL,
+    related_experiences TEXT NOT NULL,
+    discovery_date TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_patterns_active ON patterns(active, confidence_score DESC);
+
+CREATE TABLE IF NOT EXISTS pattern_contexts (
+    context TEXT NOT NULL,
+    pattern_id TEXT NOT NULL REFERENCES patterns(id) ON DELETE CASCADE,
+    PRIMARY KEY (context, pattern_id)
+);
+
+CREATE TABLE IF NOT EXISTS pattern_versions (
+    pattern_id TEXT NOT NULL REFERENCES patterns(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    recorded_at TEXT NOT NULL,
+    usage_count INTEGER NOT NULL,
+    success_rate REAL NOT NULL,
+    quality_impact REAL NOT NULL,
+    confidence_score REAL NOT NULL,
+    PRIMARY KEY (pattern_id, version)
+);
+
+CREATE TABLE IF NOT EXISTS discovery_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    finished_at TEXT NOT NULL,
+    pattern_count INTEGER NOT NULL,
+    details TEXT NOT NULL
+);
+"""
+
+# Campos que definem uma nova versão do padrão
+VERSIONED_FIELDS = ('name', 'template', 'success_rate', 'usage_count',
+                    'quality_impact', 'confidence_score', 'contexts')
+METRIC_FIELDS = ('usage_count', 'success_rate', 'quality_impact', 'confidence_score')
+
+
+@dataclass
+class DiscoveredPattern:
+    """Padrão descoberto pelo sistema"""
+    id: str
+    name: str
+    description: str
+    template: str
+    success_rate: float
+    usage_count: int
+    contexts: List[str]
+    quality_impact: float
+    discovery_date: datetime
+    related_experiences: List[str]
+    confidence_score: float
+
+
+def pattern_to_dict(pattern: DiscoveredPattern) -> Dict[str, Any]:
+    """Representação serializável (sem o template) usada no resumo"""
+    return {
+        'id': pattern.id,
+        'name': pattern.name,
+        'description': pattern.description,
+        'success_rate': pattern.success_rate,
+        'usage_count': pattern.usage_count,
+        'quality_impact': pattern.quality_impact,
+        'contexts': pattern.contexts,
+        'confidence_score': pattern.confidence_score,
+        'discovery_date': pattern.discovery_date.isoformat()
+    }
+
+
+def summarize_patterns(patterns: List[DiscoveredPattern], evolution: Dict[str, List[Dict[str, Any]]],
+                       last_run: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumo dos padrões para o dashboard"""
+    return {
+        'total_patterns': len(patterns),
+        'patterns': [pattern_to_dict(p) for p in patterns],
+        'pattern_evolution': evolution,
+        'last_run': last_run,
+        'summary_stats': {
+            'avg_success_rate': sum(p.success_rate for p in patterns) / len(patterns) if patterns else 0,
+            'total_experiences_analyzed': sum(p.usage_count for p in patterns),
+            'high_confidence_patterns': len([p for p in patterns if p.confidence_score > 0.8])
+        }
+    }
+
+
+def _record(pattern: DiscoveredPattern) -> Dict[str, Any]:
+    return {
+        'id': pattern.id,
+        'name': pattern.name,
+        'description': pattern.description,
+        'template': pattern.template,
+        'success_rate': float(pattern.success_rate),
+        'usage_count': int(pattern.usage_count),
+        'quality_impact': float(pattern.quality_impact),
+        'confidence_score': float(pattern.confidence_score),
+        'contexts': json.dumps(list(pattern.contexts)),
+        'related_experiences': json.dumps(list(pattern.related_experiences)),
+        'discovery_date': pattern.discovery_date.isoformat(),
+    }
+
+
+def _pattern_from_row(row: sqlite3.Row) -> DiscoveredPattern:
+    return DiscoveredPattern(
+        id=row['id'], name=row['name'], description=row['description'] or "",
+        template=row['template'] or "", success_rate=row['success_rate'],
+        usage_count=row['usage_count'], contexts=json.loads(row['contexts']),
+        quality_impact=row['quality_impact'],
+        discovery_date=datetime.fromisoformat(row['discovery_date']),
+        related_experiences=json.loads(row['related_experiences']),
+        confidence_score=row['confidence_score']
+    )
+
+
+class PatternStore:
+    """Padrões descobertos, versões e execuções em SQLite"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or GRAPHRAG_CONFIG["pattern_discovery"]["store_path"])
+        self._lock = threading.RLock()
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self, create: bool = True) -> Optional[sqlite3.Connection]:
+        """Conexão aberta sob demanda; None se o arquivo não existe e create=False"""
+        if self.conn is None:
+            if not create and not self.path.exists():
+                return None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute(f"PRAGMA busy_timeout={int(DATABASE_CONFIG['sqlite']['busy_timeout_ms'])}")
+            conn.executescript(SCHEMA_SQL)
+            self.conn = conn
+        return self.conn
+
+    @contextmanager
+    def _transaction(self):
+        """Transação de escrita (BEGIN IMMEDIATE); rollback em caso de erro"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn.cursor()
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    # ---------------------------------------------------------------- escrita
+
+    def save_run(self, patterns: List[DiscoveredPattern], details: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Grava o resultado de uma execução da descoberta.
+
+        Padrões novos ou alterados ganham uma nova versão; os que não
+        aparecem nesta execução ficam inativos (o histórico é mantido).
+        Retorna o id da execução.
+        """
+        now = datetime.now().isoformat()
+        records = [_record(p) for p in patterns]
+        with self._lock, self._transaction() as cur:
+            cur.execute("INSERT INTO discovery_runs (finished_at, pattern_count, details) VALUES (?, ?, ?)",
+                        (now, len(records), json.dumps(details or {}, default=str)))
+            run_id = cur.lastrowid
+
+            current = {}
+            ids = [record['id'] for record in records]
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = cur.execute(f"SELECT * FROM patterns WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+                current.update((row['id'], row) for row in rows)
+
+            cur.execute("UPDATE patterns SET active = 0 WHERE active = 1")
+            for record in records:
+                stored = current.get(record['id'])
+                changed = stored is None or any(stored[name] != record[name] for name in VERSIONED_FIELDS)
+                version = (stored['version'] if stored is not None else 0) + int(changed)
+                cur.execute(
+                    "INSERT INTO patterns (id, version, active, name, description, template, success_rate, "
+                    "usage_count, quality_impact, confidence_score, contexts, related_experiences, "
+                    "discovery_date, updated_at) VALUES (:id, :version, 1, :name, :description, :template, "
+                    ":success_rate, :usage_count, :quality_impact, :confidence_score, :contexts, "
+                    ":related_experiences, :discovery_date, :updated_at) "
+                    "ON CONFLICT(id) DO UPDATE SET version = excluded.version, active = 1, name = excluded.name, "
+                    "description = excluded.description, template = excluded.template, "
+                    "success_rate = excluded.success_rate, usage_count = excluded.usage_count, "
+                    "quality_impact = excluded.quality_impact, confidence_score = excluded.confidence_score, "
+                    "contexts = excluded.contexts, related_experiences = excluded.related_experiences, "
+                    "updated_at = excluded.updated_at",
+                    dict(record, version=version, updated_at=now)
+                )
+                if changed:
+                    cur.execute(
+                        "INSERT INTO pattern_versions (pattern_id, version, run_id, recorded_at, usage_count, "
+                        "success_rate, quality_impact, confidence_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (record['id'], version, run_id, now, *(record[name] for name in METRIC_FIELDS))
+                    )
+                cur.execute("DELETE FROM pattern_contexts WHERE pattern_id = ?", (record['id'],))
+                cur.executemany("INSERT OR IGNORE INTO pattern_contexts (context, pattern_id) VALUES (?, ?)",
+                                [(context, record['id']) for context in json.loads(record['contexts'])])
+        return run_id
+
+    # ---------------------------------------------------------------- leitura
+
+    def load_patterns(self, context: Optional[str] = None,
+                      include_inactive: bool = False) -> List[DiscoveredPattern]:
+        """Padrões da última execução (ou de um contexto), por confiança decrescente"""
+        where, params = ([] if include_inactive else ["p.active = 1"]), []
+        join = ""
+        if context is not None:
+            join = "JOIN pattern_contexts c ON c.pattern_id = p.id"
+            where.append("c.context = ?")
+            params.append(context)
+        query = (f"SELECT p.* FROM patterns p {join} "
+                 f"{'WHERE ' + ' AND '.join(where) if where else ''} "
+                 "ORDER BY p.confidence_score DESC, p.id")
+        with self._lock:
+            conn = self._connection(create=False)
+            if conn is None:
+                return []
+            return [_pattern_from_row(row) for row in conn.execute(query, params)]
+
+    def load_evolution(self, pattern_ids: Optional[List[str]] = None,
+                       limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """{padrão: versões em ordem cronológica}, no máximo as últimas `limit` por padrão"""
+        where, params = "", []
+        if pattern_ids is not None:
+            if not pattern_ids:
+                return {}
+            where = f"WHERE pattern_id IN ({','.join('?' * len(pattern_ids))})"
+            params = list(pattern_ids)
+        query = (
+            "SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY pattern_id ORDER BY version DESC) AS recency "
+            f"FROM pattern_versions {where}) "
+            + ("WHERE recency <= ? " if limit else "")
+            + "ORDER BY pattern_id, version"
+        )
+        if limit:
+            params.append(int(limit))
+        with self._lock:
+            conn = self._connection(create=False)
+            if conn is None:
+                return {}
+            rows = conn.execute(query, params).fetchall()
+
+        evolution: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            evolution.setdefault(row['pattern_id'], []).append({
+                'timestamp': row['recorded_at'],
+                'version': row['version'],
+                **{name: row[name] for name in METRIC_FIELDS}
+            })
+        return evolution
+
+    def last_run(self) -> Dict[str, Any]:
+        """Resumo da execução mais recente (vazio se nenhuma)"""
+        with self._lock:
+            conn = self._connection(create=False)
+            if conn is None:
+                return {}
+            row = conn.execute("SELECT * FROM discovery_runs ORDER BY id DESC LIMIT 1").fetchone()
+        if row is None:
+            return {}
+        return dict(json.loads(row['details']), run_id=row['id'], finished_at=row['finished_at'])
+
+    def export_summary(self) -> Dict[str, Any]:
+        """Mesmo formato de PatternDiscoveryEngine.export_patterns_summary()"""
+        patterns = self.load_patterns()
+        evolution = self.load_evolution([p.id for p in patterns],
+                                        limit=GRAPHRAG_CONFIG["pattern_discovery"]["evolution_history"])
+        return summarize_patterns(patterns, evolution, self.last_run())
@@ -0,0 +1,777 @@
+"""
+Store GraphRAG local em SQLite
+
+Implementa a mesma interface do GraphRAGMemoryStore sem servidores: o
+"grafo" (experiências, tarefas, código, agentes, similaridades e padrões)
+fica em tabelas indexadas de um arquivo SQLite em modo WAL, a busca textual
+usa FTS5 e os vetores ficam no EmbeddedVectorIndex.
+
+O SQLite é a fonte da verdade, inclusive dos embeddings (float32). O índice
+vetorial é persistido ao fechar o store e, na abertura, reconciliado com a
+tabela de embeddings, de modo que uma queda do processo nunca perde vetores.
+
+Selecionado com GRAPHRAG_BACKEND=sqlite (ver create_memory_store).
+"""
+
+import json
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from config.settings import DATABASE_CONFIG, GRAPHRAG_CONFIG
+from memory.hybrid_store import BaseMemoryStore, CodingExperience
+from memory.graph_rag.content_hash import stable_task_id, stable_code_hash
+from memory.graph_rag.fulltext import extract_terms
+from memory.graph_rag.hybrid_retriever import build_chroma_where
+from memory.graph_rag.aggregates import aggregate_params, summarize_aggregate, merge_aggregates
+from memory.graph_rag.retention import select_for_pruning, VECTOR_BYTES
+from memory.vector_store.embedded_index import EmbeddedVectorIndex
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS agents (
+    name TEXT PRIMARY KEY,
+    exp_count INTEGER NOT NULL DEFAULT 0,
+    quality_sum REAL NOT NULL DEFAULT 0,
+    quality_sumsq REAL NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    quality_min REAL,
+    quality_max REAL,
+    first_experience_at TEXT,
+    last_experience_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS agent_domain_days (
+    agent TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    day TEXT NOT NULL,
+    exp_count INTEGER NOT NULL DEFAULT 0,
+    quality_sum REAL NOT NULL DEFAULT 0,
+    quality_sumsq REAL NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    quality_min REAL,
+    quality_max REAL,
+    PRIMARY KEY (agent, domain, day)
+);
+CREATE INDEX IF NOT EXISTS idx_agent_domain_days_day ON agent_domain_days(day);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    domain TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_domain ON tasks(domain);
+
+CREATE TABLE IF NOT EXISTS code (
+    hash TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    language TEXT,
+    size_bytes INTEGER,
+    syntax_valid INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS experiences (
+    id TEXT PRIMARY KEY,
+    task_id TEXT NOT NULL REFERENCES tasks(id),
+    code_hash TEXT NOT NULL REFERENCES code(hash),
+    agent TEXT NOT NULL REFERENCES agents(name),
+    task_description TEXT,
+    quality_score REAL,
+    execution_success INTEGER,
+    timestamp TEXT,
+    llm_model TEXT,
+    domain TEXT,
+    context TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_experiences_timestamp ON experiences(timestamp);
+CREATE INDEX IF NOT EXISTS idx_experiences_agent ON experiences(agent, timestamp);
+CREATE INDEX IF NOT EXISTS idx_experiences_quality ON experiences(quality_score);
+CREATE INDEX IF NOT EXISTS idx_experiences_domain ON experiences(domain);
+CREATE INDEX IF NOT EXISTS idx_experiences_task ON experiences(task_id);
+CREATE INDEX IF NOT EXISTS idx_experiences_code ON experiences(code_hash);
+
+CREATE TABLE IF NOT EXISTS embeddings (
+    experience_id TEXT PRIMARY KEY REFERENCES experiences(id) ON DELETE CASCADE,
+    vector BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS similar_experiences (
+    source TEXT NOT NULL REFERENCES experiences(id) ON DELETE CASCADE,
+    target TEXT NOT NULL REFERENCES experiences(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    PRIMARY KEY (source, target)
+);
+CREATE INDEX IF NOT EXISTS idx_similar_target ON similar_experiences(target);
+
+CREATE TABLE IF NOT EXISTS experience_summaries (
+    agent TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    success_count INTEGER NOT NULL DEFAULT 0,
+    quality_sum REAL NOT NULL DEFAULT 0,
+    best_quality REAL,
+    sample_tasks TEXT NOT NULL DEFAULT '[]',
+    updated_at TEXT,
+    PRIMARY KEY (agent, domain)
+);
+
+CREATE TABLE IF NOT EXISTS pattern_observations (
+    reaction TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    category TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    PRIMARY KEY (reaction, pattern, category, agent)
+);
+CREATE INDEX IF NOT EXISTS idx_pattern_observations_agent ON pattern_observations(agent);
+CREATE INDEX IF NOT EXISTS idx_pattern_observations_category ON pattern_observations(category, pattern);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    description, content='tasks', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts(rowid, description) VALUES (new.rowid, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, description) VALUES ('delete', old.rowid, old.description);
+END;
+"""
+
+_AGGREGATE_UPSERT = """
+    INSERT INTO {table} ({keys}, exp_count, quality_sum, quality_sumsq, success_count,
+                         quality_min, quality_max{extra_cols})
+    VALUES ({placeholders}, 1, :q, :q * :q, :ok, :q, :q{extra_vals})
+    ON CONFLICT ({keys}) DO UPDATE SET
+        exp_count = exp_count + 1,
+        quality_sum = quality_sum + :q,
+        quality_sumsq = quality_sumsq + :q * :q,
+        success_count = success_count + :ok,
+        quality_min = min(coalesce(quality_min, :q), :q),
+        quality_max = max(coalesce(quality_max, :q), :q){extra_update}
+"""
+
+AGENT_UPSERT = _AGGREGATE_UPSERT.format(
+    table="agents", keys="name", placeholders=":agent",
+    extra_cols=", first_experience_at, last_experience_at", extra_vals=", :ts, :ts",
+    extra_update=""",
+        first_experience_at = min(coalesce(first_experience_at, :ts), :ts),
+        last_experience_at = max(coalesce(last_experience_at, :ts), :ts)""",
+)
+
+DAY_UPSERT = _AGGREGATE_UPSERT.format(
+    table="agent_domain_days", keys="agent, domain, day", placeholders=":agent, :domain, :day",
+    extra_cols="", extra_vals="", extra_update="",
+)
+
+# Retira a contribuição de uma experiência regravada (mínimo e máximo
+# continuam como limites do histórico, como na retenção)
+_AGGREGATE_RETRACT = """
+    UPDATE {table} SET
+        exp_count = max(exp_count - 1, 0),
+        quality_sum = quality_sum - :q,
+        quality_sumsq = quality_sumsq - :q * :q,
+        success_count = max(success_count - :ok, 0)
+    WHERE {where}
+"""
+
+AGENT_RETRACT = _AGGREGATE_RETRACT.format(table="agents", where="name = :agent")
+DAY_RETRACT = _AGGREGATE_RETRACT.format(table="agent_domain_days",
+                                        where="agent = :agent AND domain = :domain AND day = :day")
+
+
+def build_fts_query(text: str, max_terms: int = 8) -> str:
+    """Consulta FTS5 OR com prefixo (equivalente ao term~ do Lucene)"""
+    terms = extract_terms(text, max_terms=max_terms)
+    return " OR ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+class SQLiteMemoryStore(BaseMemoryStore):
+    """Store GraphRAG em um único arquivo SQLite + índice vetorial embarcado"""
+
+    def __init__(self, path: Optional[str] = None, vector_index_path: Optional[str] = None,
+                 encoder=None):
+        sqlite_config = DATABASE_CONFIG["sqlite"]
+        self.path = Path(path or sqlite_config["path"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.vector_index_path = Path(vector_index_path) if vector_index_path else (
+            Path(sqlite_config["vector_index_path"]) if path is None
+            else self.path.with_suffix(".vectors")
+        )
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.execute(f"PRAGMA busy_timeout={int(sqlite_config['busy_timeout_ms'])}")
+        self.conn.executescript(SCHEMA_SQL)
+
+        self._setup_retrieval(encoder)
+        self.index = self._open_vector_index()
+        print(f"✅ GraphRAG local (SQLite): {self.path.name}, {len(self.index)} vetores")
+
+    # ---------------------------------------------------------------- vetores
+
+    def _open_vector_index(self) -> EmbeddedVectorIndex:
+        vector_config = GRAPHRAG_CONFIG["vector_store"]
+        options = dict(dimension=vector_config["dimension"], storage=vector_config["quantization"],
+                       rerank_candidates=vector_config["rerank_candidates"])
+        try:
+            index = EmbeddedVectorIndex(path=str(self.vector_index_path), **options)
+        except (ValueError, OSError, KeyError) as e:
+            print(f"⚠️ Índice vetorial recriado: {e}")
+            shutil.rmtree(self.vector_index_path, ignore_errors=True)
+            index = EmbeddedVectorIndex(path=str(self.vector_index_path), **options)
+
+        # Reconciliar com a tabela de embeddings (fonte da verdade)
+        with self._lock:
+            stored = {row[0] for row in self.conn.execute("SELECT experience_id FROM embeddings")}
+        stale = [exp_id for exp_id in index.ids() if exp_id not in stored]
+        if stale:
+            index.delete(stale)
+        missing = [exp_id for exp_id in stored if exp_id not in index]
+        for start in range(0, len(missing), 1000):
+            self._index_rows(index, missing[start:start + 1000])
+        return index
+
+    def _index_rows(self, index: EmbeddedVectorIndex, ids: List[str]):
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self.conn.execute(f"""
+                SELECT e.id, e.agent, e.domain, e.quality_score, v.vector
+                FROM experiences e JOIN embeddings v ON v.experience_id = e.id
+                WHERE e.id IN ({placeholders})
+            """, ids).fetchall()
+        if rows:
+            index.add(
+                [row["id"] for row in rows],
+                np.vstack([np.frombuffer(row["vector"], dtype=np.float32) for row in rows]),
+                [self._vector_metadata(row["agent"], row["domain"], row["quality_score"]) for row in rows],
+            )
+
+    @staticmethod
+    def _vector_metadata(agent: str, domain: str, quality: float) -> Dict[str, Any]:
+        return {"agent": agent, "domain": domain, "quality": float(quality or 0.0)}
+
+    # ---------------------------------------------------------------- escrita
+
+    def store_experience(self, experience: CodingExperience,
+                         embedding: Optional[List[float]] = None) -> bool:
+        """Armazena experiência (tabelas, agregados, similaridades e vetor)"""
+        try:
+            if embedding is None:
+                text_to_embed = f"{experience.task_description} {experience.code_generated}"
+                embedding = self.embeddings.encode(text_to_embed)
+            embedding = np.asarray(embedding, dtype=np.float32)
+            domain = self._extract_domain(experience.task_description)
+            timestamp = experience.timestamp.isoformat()
+            agg = aggregate_params(experience.quality_score, experience.execution_success,
+                                   domain, experience.timestamp)
+
+            # Vizinhos para as arestas de similaridade (antes de inserir o próprio vetor)
+            threshold = GRAPHRAG_CONFIG["vector_store"]["similarity_threshold"]
+            neighbours = [(exp_id, score) for exp_id, score, _ in self.index.query(embedding, k=5)
+                          if exp_id != experience.id and score >= threshold]
+
+            with self._lock, self._transaction() as cur:
+                previous = cur.execute("""
+                    SELECT agent, domain, quality_score, execution_success, timestamp
+                    FROM experiences WHERE id = ?
+                """, (experience.id,)).fetchone()
+
+                cur.execute("INSERT OR IGNORE INTO tasks (id, description, domain) VALUES (?, ?, ?)",
+                            (stable_task_id(experience.task_description), experience.task_description, domain))
+                code_hash = stable_code_hash(experience.code_generated)
+                cur.execute("""
+                    INSERT INTO code (hash, content, language, size_bytes, syntax_valid)
+                    VALUES (?, ?, 'python', ?, ?)
+                    ON CONFLICT (hash) DO UPDATE SET syntax_valid = excluded.syntax_valid
+                """, (code_hash, experience.code_generated,
+                      len(experience.code_generated.encode("utf-8")), int(experience.execution_success)))
+                cur.execute("INSERT OR IGNORE INTO agents (name) VALUES (?)", (experience.agent_name,))
+
+                cur.execute("""
+                    INSERT INTO experiences (id, task_id, code_hash, agent, task_description,
+                                             quality_score, execution_success, timestamp,
+                                             llm_model, domain, context)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        task_id = excluded.task_id,
+                        code_hash = excluded.code_hash,
+                        agent = excluded.agent,
+                        task_description = excluded.task_description,
+                        quality_score = excluded.quality_score,
+                        execution_success = excluded.execution_success,
+                        timestamp = excluded.timestamp,
+                        llm_model = excluded.llm_model,
+                        domain = excluded.domain,
+                        context = excluded.context
+                """, (experience.id, stable_task_id(experience.task_description), code_hash,
+                      experience.agent_name, experience.task_description, experience.quality_score,
+                      int(experience.execution_success), timestamp, experience.llm_model, domain,
+                      json.dumps(experience.context or {}, default=str)))
+
+                cur.execute("INSERT OR REPLACE INTO embeddings (experience_id, vector) VALUES (?, ?)",
+                            (experience.id, embedding.tobytes()))
+                cur.executemany(
+                    "INSERT OR REPLACE INTO similar_experiences (source, target, score) VALUES (?, ?, ?)",
+                    [(experience.id, exp_id, score) for exp_id, score in neighbours],
+                )
+
+                # Regravação: a contribuição antiga sai dos agregados antes da nova entrar
+                if previous is not None:
+                    old = aggregate_params(previous["quality_score"], previous["execution_success"],
+                                           previous["domain"], previous["timestamp"])
+                    old_params = {"agent": previous["agent"], "domain": old["agg_domain"],
+                                  "day": old["agg_day"], "q": old["agg_quality"], "ok": int(old["agg_success"])}
+                    cur.execute(AGENT_RETRACT, old_params)
+                    cur.execute(DAY_RETRACT, old_params)
+                params = {"agent": experience.agent_name, "domain": agg["agg_domain"],
+                          "day": agg["agg_day"], "q": agg["agg_quality"],
+                          "ok": int(agg["agg_success"]), "ts": timestamp}
+                cur.execute(AGENT_UPSERT, params)
+                cur.execute(DAY_UPSERT, params)
+
+            self.index.add([experience.id], embedding[None, :],
+                           [self._vector_metadata(experience.agent_name, domain, experience.quality_score)])
+            self._invalidate_cache()
+            self._notify_written()
+            return True
+
+        except Exception as e:
+            print(f"❌ Erro ao salvar experiência: {e}")
+            return False
+
+    @contextmanager
+    def _transaction(self):
+        """Transação de escrita (BEGIN IMMEDIATE); rollback em caso de erro"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn.cursor()
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def upsert_similarity_links(self, links: List[Dict[str, Any]]):
+        """Grava arestas de similaridade calculadas pelo job offline"""
+        if not links:
+            return
+        with self._lock, self._transaction() as cur:
+            cur.executemany(
+                "INSERT OR REPLACE INTO similar_experiences (source, target, score) VALUES (?, ?, ?)",
+                [(link["source"], link["target"], link["similarity"]) for link in links],
+            )
+        self._invalidate_cache()
+
+    # ---------------------------------------------------------------- leitura
+
+    def _fetch_experiences(self, ids: List[str]) -> Dict[str, sqlite3.Row]:
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self.conn.execute(f"""
+                SELECT e.id, e.task_description, c.content AS code, e.quality_score,
+                       e.agent, e.domain, e.timestamp
+                FROM experiences e LEFT JOIN code c ON c.hash = e.code_hash
+                WHERE e.id IN ({placeholders})
+            """, ids).fetchall()
+        return {row["id"]: row for row in rows}
+
+    @staticmethod
+    def _format(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "experience_id": row["id"],
+            "task": row["task_description"] or "",
+            "code": row["code"] or "",
+            "quality": row["quality_score"] or 0,
+            "agent": row["agent"] or "",
+            "domain": row["domain"],
+            "timestamp": row["timestamp"],
+        }
+
+    def _query_vectors(self, query: str, k: int, filters: Dict[str, Any]) -> List[Dict]:
+        """Consulta o índice embarcado com pré-filtros de metadados"""
+        hits = self.index.query(self.embeddings.encode(query), k=k, where=build_chroma_where(filters))
+        rows = self._fetch_experiences([exp_id for exp_id, _, _ in hits])
+        return [
+            dict(self._format(rows[exp_id]), similarity=score)
+            for exp_id, score, _ in hits if exp_id in rows
+        ]
+
+    def _graph_search(self, query: str, limit: int, filters: Dict[str, Any]) -> List[Dict]:
+        """
+        Etapa de grafo: tarefas encontradas pelo FTS5 e vizinhos em
+        similar_experiences das experiências que as executaram.
+        """
+        text_query = build_fts_query(query)
+        if not text_query:
+            return []
+
+        with self._lock:
+            rows = self.conn.execute("""
+                WITH hits AS (
+                    SELECT t.id AS task_id, -bm25(tasks_fts) AS score
+                    FROM tasks_fts JOIN tasks t ON t.rowid = tasks_fts.rowid
+                    WHERE tasks_fts MATCH :text_query
+                    ORDER BY bm25(tasks_fts)
+                    LIMIT :limit
+                ),
+                seeds AS (
+                    SELECT e.id, h.score FROM hits h JOIN experiences e ON e.task_id = h.task_id
+                ),
+                expanded AS (
+                    SELECT id, score FROM seeds
+                    UNION ALL
+                    SELECT s.target, seeds.score * :decay
+                    FROM seeds JOIN similar_experiences s ON s.source = seeds.id
+                    UNION ALL
+                    SELECT s.source, seeds.score * :decay
+                    FROM seeds JOIN similar_experiences s ON s.target = seeds.id
+                ),
+                best AS (SELECT id, max(score) AS score FROM expanded GROUP BY id)
+                SELECT e.id, e.task_description, c.content AS code, e.quality_score,
+                       e.agent, e.domain, e.timestamp, best.score
+                FROM best
+                JOIN experiences e ON e.id = best.id
+                LEFT JOIN code c ON c.hash = e.code_hash
+                WHERE (:agent IS NULL OR e.agent = :agent)
+                  AND (:min_quality IS NULL OR e.quality_score >= :min_quality)
+                  AND (:domain IS NULL OR e.domain = :domain)
+                ORDER BY best.score DESC
+                LIMIT :limit
+            """, {
+                "text_query": text_query,
+                "limit": limit,
+                "decay": GRAPHRAG_CONFIG["retrieval"]["graph_neighbour_decay"],
+                "agent": filters.get("agent"),
+                "domain": filters.get("domain"),
+                "min_quality": filters.get("min_quality"),
+            }).fetchall()
+
+        return [dict(self._format(row), graph_score=row["score"]) for row in rows]
+
+    def get_recent_experiences(self, days: int = 30, limit: int = 100) -> List[Dict[str, Any]]:
+        """Experiências recentes com código, da mais nova para a mais antiga"""
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT e.id, e.task_description, c.content, e.quality_score,
+                       e.execution_success, e.agent, e.timestamp
+                FROM experiences e JOIN code c ON c.hash = e.code_hash
+                WHERE e.timestamp > ?
+                ORDER BY e.timestamp DESC
+                LIMIT ?
+            """, (since, limit)).fetchall()
+        return [
+            {
+                'id': row['id'],
+                'task': row['task_description'],
+                'code': row['content'],
+                'quality': row['quality_score'],
+                'success': bool(row['execution_success']),
+                'agent': row['agent'],
+                'timestamp': row['timestamp'],
+                'source': 'graphrag'
+            }
+            for row in rows
+        ]
+
+    def get_embeddings(self, experience_ids: List[str]) -> Dict[str, List[float]]:
+        """Vetores float32 do índice embutido"""
+        known = [exp_id for exp_id in experience_ids if exp_id in self.index]
+        if not known:
+            return {}
+        return dict(zip(known, self.index.get_embeddings(known)))
+
+    def fetch_experience_page(self, after: Optional[Tuple[str, str]] = None, limit: int = 500,
+                              agent: Optional[str] = None,
+                              include_embeddings: bool = False,
+                              include_code: bool = True) -> List[Dict[str, Any]]:
+        """
+        Página de experiências em ordem (timestamp, id), a partir do cursor
+        `after` = (timestamp, id) da última linha da página anterior.
+        Com include_code=False a tabela de código não é lida (code=None).
+        """
+        after_ts, after_id = after if after else ("", "")
+        with self._lock:
+            rows = self.conn.execute(f"""
+                SELECT e.id, e.task_description AS task, {"c.content" if include_code else "NULL"} AS code,
+                       e.quality_score AS quality,
+                       e.execution_success AS success, e.agent, e.llm_model, e.timestamp, e.domain,
+                       e.context{", v.vector" if include_embeddings else ""}
+                FROM experiences e
+                {"JOIN code c ON c.hash = e.code_hash" if include_code else ""}
+                {"LEFT JOIN embeddings v ON v.experience_id = e.id" if include_embeddings else ""}
+                WHERE (e.timestamp, e.id) > (?, ?) AND (? IS NULL OR e.agent = ?)
+                ORDER BY e.timestamp, e.id
+                LIMIT ?
+            """, (after_ts, after_id, agent, agent, limit)).fetchall()
+
+        page = []
+        for row in rows:
+            item = {key: row[key] for key in ("id", "task", "code", "quality", "agent",
+                                              "llm_model", "timestamp", "domain")}
+            item["success"] = bool(row["success"])
+            item["context"] = json.loads(row["context"] or "{}")
+            if include_embeddings:
+                item["embedding"] = (np.frombuffer(row["vector"], dtype=np.float32).tolist()
+                                     if row["vector"] is not None else None)
+            page.append(item)
+        return page
+
+    # ------------------------------------------------------------- agregados
+
+    def get_agent_performance(self, agent_name: str) -> Dict[str, Any]:
+        """Estatísticas do agente a partir dos agregados incrementais (O(1))"""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM agents WHERE name = ?", (agent_name,)).fetchone()
+        return dict(summarize_aggregate(dict(row) if row else None), agent=agent_name)
+
+    def get_agent_stats(self) -> List[Dict[str, Any]]:
+        """Estatísticas agregadas de todos os agentes"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM agents WHERE exp_count > 0 ORDER BY exp_count DESC").fetchall()
+        return [dict(summarize_aggregate(dict(row)), agent=row["name"]) for row in rows]
+
+    def get_global_stats(self) -> Dict[str, Any]:
+        """Totais do sistema somando os agregados dos agentes"""
+        with self._lock:
+            rows = [dict(row) for row in self.conn.execute("SELECT * FROM agents WHERE exp_count > 0")]
+        summary = summarize_aggregate(merge_aggregates(rows))
+        summary["max_quality"] = summary.pop("best_quality")
+        summary["min_quality"] = summary.pop("worst_quality")
+        return summary
+
+    def get_quality_timeline(self, days: int = 30, agent: Optional[str] = None,
+                             domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Qualidade média e volume por dia"""
+        since_day = (datetime.now() - timedelta(days=days)).date().isoformat()
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT day, sum(exp_count) AS count, sum(quality_sum) AS quality_sum,
+                       sum(success_count) AS successes
+                FROM agent_domain_days
+                WHERE day >= ? AND (? IS NULL OR agent = ?) AND (? IS NULL OR domain = ?)
+                GROUP BY day
+                ORDER BY day DESC
+            """, (since_day, agent, agent, domain, domain)).fetchall()
+        return [
+            {
+                "date": row["day"],
+                "experience_count": row["count"],
+                "avg_quality": row["quality_sum"] / row["count"] if row["count"] else 0.0,
+                "success_rate": row["successes"] * 100.0 / row["count"] if row["count"] else 0.0,
+            }
+            for row in rows
+        ]
+
+    def get_storage_metrics(self) -> Dict[str, Any]:
+        """Linhas por tabela, bytes de conteúdo e uso do índice vetorial"""
+        with self._lock:
+            row = self.conn.execute("""
+                SELECT (SELECT count(*) FROM experiences) AS experiences,
+                       (SELECT count(*) FROM tasks) AS tasks,
+                       (SELECT coalesce(sum(length(description)), 0) FROM tasks) AS task_chars,
+                       (SELECT count(*) FROM code) AS codes,
+                       (SELECT coalesce(sum(size_bytes), 0) FROM code) AS code_bytes,
+                       (SELECT count(*) FROM agents) AS agents
+            """).fetchone()
+        experiences, codes = row["experiences"], row["codes"]
+        return {
+            "nodes": {
+                "Experience": experiences,
+                "Task": row["tasks"],
+                "Code": codes,
+                "Agent": row["agents"]
+            },
+            "code_bytes": row["code_bytes"],
+            "task_chars": row["task_chars"],
+            "code_dedup_ratio": experiences / codes if codes else 0.0,
+            "database_bytes": self.path.stat().st_size if self.path.exists() else 0,
+            "vector_index": self.index.memory_usage()
+        }
+
+    # -------------------------------------------------------------- retenção
+
+    def apply_retention(self, max_age_days: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Aplica os limites de GRAPHRAG_CONFIG["experience_storage"] com a
+        mesma política do ExperienceRetentionEngine, numa única transação.
+        """
+        start = time.perf_counter()
+        config = GRAPHRAG_CONFIG["experience_storage"]
+        max_per_agent = config["max_experiences_per_agent"]
+        target = max(int(max_per_agent * config["cleanup_threshold"]), 1)
+        budget = config["retention_batch_size"] * config["retention_max_batches"]
+
+        report = {
+            "agents_over_limit": [],
+            "experiences_removed": 0,
+            "experiences_summarized": 0,
+            "vectors_removed": 0,
+            "code_nodes_removed": 0,
+            "task_nodes_removed": 0,
+            "bytes_reclaimed": 0,
+            "batches": 0,
+            "complete": True,
+        }
+
+        with self._lock:
+            over = self.conn.execute("""
+                SELECT agent, count(*) AS count FROM experiences
+                GROUP BY agent HAVING count(*) > ?
+            """, (max_per_agent,)).fetchall()
+
+            to_remove: List[str] = []
+            for row in over:
+                report["agents_over_limit"].append({"agent": row["agent"], "count": row["count"]})
+                rows = [dict(r) for r in self.conn.execute("""
+                    SELECT id, domain, quality_score AS quality, execution_success AS success, timestamp
+                    FROM experiences WHERE agent = ?
+                """, (row["agent"],))]
+                to_remove.extend(select_for_pruning(rows, target, max_age_days))
+
+            if len(to_remove) > budget:
+                to_remove = to_remove[:budget]
+                report["complete"] = False
+            if to_remove:
+                with self._transaction() as cur:
+                    self._prune(cur, to_remove, config["compress_old_experiences"], report)
+                report["batches"] = -(-len(to_remove) // config["retention_batch_size"])
+
+        if to_remove:
+            self.index.delete(to_remove)
+            report["vectors_removed"] = len(to_remove)
+            report["bytes_reclaimed"] += len(to_remove) * VECTOR_BYTES
+            self._invalidate_cache()
+
+        report["duration"] = time.perf_counter() - start
+        return report
+
+    @staticmethod
+    def _prune(cur: sqlite3.Cursor, ids: List[str], compress: bool, report: Dict[str, Any]):
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS prune_ids (id TEXT PRIMARY KEY)")
+        cur.execute("DELETE FROM prune_ids")
+        cur.executemany("INSERT INTO prune_ids (id) VALUES (?)", [(i,) for i in ids])
+
+        if compress:
+            groups = cur.execute("""
+                SELECT agent, coalesce(domain, 'general') AS domain, count(*) AS n,
+                       sum(execution_success) AS ok, sum(coalesce(quality_score, 0)) AS q,
+                       max(quality_score) AS best, json_group_array(task_description) AS tasks
+                FROM experiences WHERE id IN (SELECT id FROM prune_ids)
+                GROUP BY agent, coalesce(domain, 'general')
+            """).fetchall()
+            for g in groups:
+                existing = cur.execute("SELECT sample_tasks FROM experience_summaries WHERE agent = ? AND domain = ?",
+                                       (g["agent"], g["domain"])).fetchone()
+                samples = (json.loads(existing["sample_tasks"]) if existing else []) + json.loads(g["tasks"])
+                cur.execute("""
+                    INSERT INTO experience_summaries (agent, domain, count, success_count, quality_sum,
+                                                      best_quality, sample_tasks, updated_at)
+                    VALUES (:agent, :domain, :n, :ok, :q, :best, :samples, :now)
+                    ON CONFLICT (agent, domain) DO UPDATE SET
+                        count = count + :n,
+                        success_count = success_count + :ok,
+                        quality_sum = quality_sum + :q,
+                        best_quality = max(coalesce(best_quality, 0), :best),
+                        sample_tasks = :samples,
+                        updated_at = :now
+                """, {"agent": g["agent"], "domain": g["domain"], "n": g["n"], "ok": g["ok"], "q": g["q"],
+                      "best": g["best"], "samples": json.dumps(samples[:5], ensure_ascii=False),
+                      "now": datetime.now().isoformat()})
+                report["experiences_summarized"] += g["n"]
+
+        refs = cur.execute("""
+            SELECT count(*) AS n, coalesce(sum(length(task_description)), 0) AS text_bytes
+            FROM experiences WHERE id IN (SELECT id FROM prune_ids)
+        """).fetchone()
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS prune_refs (kind TEXT, ref TEXT, PRIMARY KEY (kind, ref))
+        """)
+        cur.execute("DELETE FROM prune_refs")
+        cur.execute("""
+            INSERT OR IGNORE INTO prune_refs
+            SELECT 'code', code_hash FROM experiences WHERE id IN (SELECT id FROM prune_ids)
+            UNION SELECT 'task', task_id FROM experiences WHERE id IN (SELECT id FROM prune_ids)
+        """)
+        cur.execute("DELETE FROM experiences WHERE id IN (SELECT id FROM prune_ids)")
+
+        code = cur.execute("""
+            SELECT count(*) AS n, coalesce(sum(size_bytes), 0) AS bytes FROM code
+            WHERE hash IN (SELECT ref FROM prune_refs WHERE kind = 'code')
+              AND NOT EXISTS (SELECT 1 FROM experiences e WHERE e.code_hash = code.hash)
+        """).fetchone()
+        cur.execute("""
+            DELETE FROM code WHERE hash IN (SELECT ref FROM prune_refs WHERE kind = 'code')
+              AND NOT EXISTS (SELECT 1 FROM experiences e WHERE e.code_hash = code.hash)
+        """)
+        tasks = cur.execute("""
+            SELECT count(*) AS n, coalesce(sum(length(description)), 0) AS bytes FROM tasks
+            WHERE id IN (SELECT ref FROM prune_refs WHERE kind = 'task')
+              AND NOT EXISTS (SELECT 1 FROM experiences e WHERE e.task_id = tasks.id)
+        """).fetchone()
+        cur.execute("""
+            DELETE FROM tasks WHERE id IN (SELECT ref FROM prune_refs WHERE kind = 'task')
+              AND NOT EXISTS (SELECT 1 FROM experiences e WHERE e.task_id = tasks.id)
+        """)
+
+        report["experiences_removed"] += refs["n"]
+        report["code_nodes_removed"] += code["n"]
+        report["task_nodes_removed"] += tasks["n"]
+        report["bytes_reclaimed"] += refs["text_bytes"] + code["bytes"] + tasks["bytes"]
+
+    # -------------------------------------------------------------- padrões
+
+    def register_pattern(self, reaction: str, pattern: str, category: str, agent_name: str) -> None:
+        """Registra um padrão (mesma semântica de MERGE do GraphMemory)"""
+        with self._lock:
+            self.conn.execute("""
+                INSERT OR IGNORE INTO pattern_observations (reaction, pattern, category, agent)
+                VALUES (?, ?, ?, ?)
+            """, (reaction, pattern, category, agent_name))
+
+    def get_patterns_by_agent(self, agent_name: str) -> List[str]:
+        """Obtém padrões por agente"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT pattern FROM pattern_observations WHERE agent = ?", (agent_name,))
+            return [row["pattern"] for row in rows]
+
+    def get_categories_and_counts(self) -> List[Dict[str, int]]:
+        """Obtém categorias e contagens"""
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT category, count(DISTINCT pattern) AS count FROM pattern_observations
+                GROUP BY category ORDER BY count DESC
+            """)
+            return [{"category": row["category"], "count": row["count"]} for row in rows]
+
+    # ----------------------------------------------------------------- geral
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Sem pool de conexões: informa o backend e o modo de journal"""
+        with self._lock:
+            journal = self.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        return {"backend": "sqlite", "path": str(self.path), "journal_mode": journal}
+
+    def close(self):
+        """Persiste o índice vetorial e fecha o banco"""
+        super().close()
+        if getattr(self, "index", None) is not None:
+            try:
+                self.index.save()
+            except Exception as e:
+                print(f"⚠️ Falha ao salvar índice vetorial: {e}")
+        if getattr(self, "conn", None) is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,345 @@
+"""
+Índice vetorial embarcado com armazenamento quantizado
+
+A matriz de varredura fica em RAM no modo configurado (float32, float16 ou
+int8 com escala por vetor). Os vetores originais em float32 são mantidos
+para re-ranqueamento exato dos melhores candidatos; com `path` eles vivem
+num arquivo append-only lido via memmap, de forma que só as linhas
+candidatas são paginadas para a memória.
+
+Filtros usam o mesmo formato `where` do ChromaDB ($eq, $ne, $gte, $lte,
+$gt, $lt, $in, $and, $or), permitindo reaproveitar build_chroma_where.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from memory.vector_store.quantization import normalize_rows, quantize, quantized_scores, storage_dtype
+
+_OPERATORS = {
+    "$eq": lambda value, arg: value == arg,
+    "$ne": lambda value, arg: value != arg,
+    "$gt": lambda value, arg: value is not None and value > arg,
+    "$gte": lambda value, arg: value is not None and value >= arg,
+    "$lt": lambda value, arg: value is not None and value < arg,
+    "$lte": lambda value, arg: value is not None and value <= arg,
+    "$in": lambda value, arg: value in arg,
+}
+
+
+def match_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Avalia uma cláusula where no formato do ChromaDB"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(match_where(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(match_where(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, arg in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Operador de filtro não suportado: {op}")
+                if not _OPERATORS[op](value, arg):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class EmbeddedVectorIndex:
+    """Busca por similaridade de cosseno com varredura quantizada e re-rank exato"""
+
+    def __init__(self, dimension: int = 384, storage: str = "float32",
+                 rerank_candidates: int = 50, path: Optional[str] = None,
+                 initial_capacity: int = 1024):
+        storage_dtype(storage)  # valida o modo
+        self.dimension = dimension
+        self.storage = storage
+        self.rerank_candidates = rerank_candidates
+        self.path = Path(path) if path else None
+
+        self._lock = threading.RLock()
+        self._size = 0
+        self._capacity = 0
+        self._data = np.empty((0, dimension), dtype=storage_dtype(storage))
+        self._scales = np.empty(0, dtype=np.float32) if storage == "int8" else None
+        self._alive = np.empty(0, dtype=bool)
+        self._ids: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+
+        # Vetores float32 originais (memória ou arquivo)
+        self._full = np.empty((0, dimension), dtype=np.float32)
+        self._full_map: Optional[np.memmap] = None
+
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            if (self.path / "index.json").exists():
+                self._load()
+        if self._capacity == 0:
+            self._grow(initial_capacity)
+
+    # ------------------------------------------------------------------ escrita
+
+    def add(self, ids: List[str], embeddings, metadatas: Optional[List[Dict[str, Any]]] = None):
+        """Adiciona (ou substitui) vetores. Embeddings são normalizados."""
+        vectors = normalize_rows(embeddings)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Dimensão {vectors.shape[1]} diferente de {self.dimension}")
+        metadatas = metadatas or [{} for _ in ids]
+
+        with self._lock:
+            self.delete([i for i in ids if i in self._rows])
+            count = len(ids)
+            if self._size + count > self._capacity:
+                self._grow(max(self._capacity * 2, self._size + count))
+
+            start, end = self._size, self._size + count
+            data, scales = quantize(vectors, self.storage)
+            self._data[start:end] = data
+            if scales is not None:
+                self._scales[start:end] = scales
+            self._alive[start:end] = True
+            self._append_full(vectors)
+
+            for offset, (exp_id, metadata) in enumerate(zip(ids, metadatas)):
+                self._ids.append(exp_id)
+                self._metadatas.append(dict(metadata or {}))
+                self._rows[exp_id] = start + offset
+            self._size = end
+
+    def delete(self, ids: List[str]):
+        """Remove vetores (marcação; o espaço é recuperado em compact)"""
+        with self._lock:
+            for exp_id in ids:
+                row = self._rows.pop(exp_id, None)
+                if row is not None:
+                    self._alive[row] = False
+            if self._size and self.dead_rows() > self._size // 4:
+                self.compact()
+
+    def dead_rows(self) -> int:
+        return self._size - len(self._rows)
+
+    def compact(self):
+        """
+        Reescreve as estruturas sem as linhas removidas. Com `path`, o novo
+        arquivo float32 é escrito com nome temporário, trocado por rename e
+        o índice é salvo em seguida, mantendo a ordem das linhas em disco.
+        """
+        with self._lock:
+            keep = np.flatnonzero(self._alive[:self._size])
+            full = np.array(self._full_rows(keep), dtype=np.float32).reshape(-1, self.dimension)
+            data = self._data[keep].copy()
+            scales = self._scales[keep].copy() if self._scales is not None else None
+            ids = [self._ids[i] for i in keep]
+            metadatas = [self._metadatas[i] for i in keep]
+            if self.path is not None:
+                pending = self.path / "vectors.f32.tmp"
+                with open(pending, "wb") as handle:
+                    handle.write(np.ascontiguousarray(full).tobytes())
+
+            self._size = 0
+            self._capacity = 0
+            self._ids, self._metadatas, self._rows = [], [], {}
+            self._full = np.empty((0, self.dimension), dtype=np.float32)
+            self._grow(max(len(keep), 1024))
+
+            count = len(keep)
+            self._data[:count] = data
+            if scales is not None:
+                self._scales[:count] = scales
+            self._alive[:count] = True
+            if self.path is not None:
+                self._full_map = None
+                os.replace(pending, self.path / "vectors.f32")
+            else:
+                self._append_full(full)
+            self._ids, self._metadatas = ids, metadatas
+            self._rows = {exp_id: row for row, exp_id in enumerate(ids)}
+            self._size = count
+            if self.path is not None:
+                self.save()
+
+    # ------------------------------------------------------------------ leitura
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, exp_id: str) -> bool:
+        return exp_id in self._rows
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._rows)
+
+    def get_metadata(self, exp_id: str) -> Optional[Dict[str, Any]]:
+        row = self._rows.get(exp_id)
+        return dict(self._metadatas[row]) if row is not None else None
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """Vetores float32 originais (normalizados) na ordem pedida"""
+        with self._lock:
+            rows = np.array([self._rows[i] for i in ids], dtype=np.int64)
+            return np.array(self._full_rows(rows), dtype=np.float32).reshape(-1, self.dimension)
+
+    def query(self, embedding, k: int = 5, where: Optional[Dict[str, Any]] = None,
+              rerank: bool = True) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Retorna até k tuplas (id, similaridade, metadados), da mais similar
+        para a menos. A varredura usa a matriz quantizada; os melhores
+        `rerank_candidates` são re-ranqueados com os vetores float32.
+        """
+        query = normalize_rows(embedding)[0]
+        with self._lock:
+            if not self._rows or k <= 0:
+                return []
+
+            candidate_rows = np.flatnonzero(self._alive[:self._size])
+            if where:
+                candidate_rows = np.array(
+                    [row for row in candidate_rows if match_where(self._metadatas[row], where)],
+                    dtype=np.int64,
+                )
+                if len(candidate_rows) == 0:
+                    return []
+
+            scores = self._scan(query, candidate_rows)
+            exact_needed = rerank and self.storage != "float32"
+            shortlist = min(max(k, self.rerank_candidates) if exact_needed else k, len(candidate_rows))
+
+            top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+            rows, scores = candidate_rows[top], scores[top]
+
+            if exact_needed:
+                full = np.array(self._full_rows(rows), dtype=np.float32).reshape(-1, self.dimension)
+                scores = full @ query
+
+            order = np.argsort(-scores)[:k]
+            return [(self._ids[rows[i]], float(scores[i]), dict(self._metadatas[rows[i]])) for i in order]
+
+    def _scan(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        if len(rows) == self._size:
+            return quantized_scores(query, self._data[:self._size],
+                                    self._scales[:self._size] if self._scales is not None else None)
+        scales = self._scales[rows] if self._scales is not None else None
+        return quantized_scores(query, self._data[rows], scales)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes da matriz de varredura e dos vetores float32 em RAM"""
+        scan = self._data[:self._size].nbytes
+        if self._scales is not None:
+            scan += self._scales[:self._size].nbytes
+        full_in_ram = 0 if self.path is not None else self._full[:self._size].nbytes
+        return {
+            "vectors": self._size,
+            "scan_bytes": scan,
+            "full_precision_bytes_in_ram": full_in_ram,
+            "float32_equivalent_bytes": self._size * self.dimension * 4,
+        }
+
+    # -------------------------------------------------------------- armazenamento
+
+    def _grow(self, capacity: int):
+        dtype = storage_dtype(self.storage)
+        data = np.zeros((capacity, self.dimension), dtype=dtype)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+
+        if self._scales is not None:
+            scales = np.ones(capacity, dtype=np.float32)
+            scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+
+        if self.path is None and self.storage != "float32":
+            full = np.zeros((capacity, self.dimension), dtype=np.float32)
+            full[:self._size] = self._full[:self._size]
+            self._full = full
+        self._capacity = capacity
+
+    def _append_full(self, vectors: np.ndarray):
+        if self.path is not None:
+            with open(self.path / "vectors.f32", "ab") as handle:
+                handle.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            self._full_map = None
+        elif self.storage != "float32":
+            self._full[self._size:self._size + len(vectors)] = vectors
+
+    def _full_rows(self, rows: np.ndarray):
+        """Linhas float32 originais; no modo float32 em memória, a própria matriz"""
+        if self.path is not None:
+            if self._full_map is None or self._full_map.shape[0] < self._size:
+                self._full_map = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r",
+                                           shape=(self._size, self.dimension))
+            return np.asarray(self._full_map[rows])
+        if self.storage == "float32":
+            return self._data[rows]
+        return self._full[rows]
+
+    def save(self):
+        """Persiste matriz quantizada e metadados (vetores float32 já estão em disco)"""
+        if self.path is None:
+            raise ValueError("Índice sem path não pode ser salvo")
+        with self._lock:
+            self._save_array("scan.npy", self._data[:self._size])
+            if self._scales is not None:
+                self._save_array("scales.npy", self._scales[:self._size])
+            self._save_array("alive.npy", self._alive[:self._size])
+            tmp = self.path / "index.json.tmp"
+            with open(tmp, "w", encoding="utf-8") as handle:
+                json.dump({
+                    "dimension": self.dimension,
+                    "storage": self.storage,
+                    "size": self._size,
+                    "ids": self._ids,
+                    "metadatas": self._metadatas,
+                }, handle, ensure_ascii=False)
+            os.replace(tmp, self.path / "index.json")
+
+    def _save_array(self, name: str, array: np.ndarray):
+        """np.save em nome temporário + rename: nunca deixa um arquivo pela metade"""
+        tmp = self.path / f"{name}.tmp"
+        with open(tmp, "wb") as handle:
+            np.save(handle, array)
+        os.replace(tmp, self.path / name)
+
+    def _load(self):
+        with open(self.path / "index.json", "r", encoding="utf-8") as handle:
+            state = json.load(handle)
+        if state["dimension"] != self.dimension or state["storage"] != self.storage:
+            raise ValueError(
+                f"Índice em {self.path} foi criado com {state['storage']}/{state['dimension']}d; "
+                f"configuração atual é {self.storage}/{self.dimension}d"
+            )
+        size = state["size"]
+        self._data = np.load(self.path / "scan.npy")
+        if self.storage == "int8":
+            self._scales = np.load(self.path / "scales.npy")
+        self._alive = np.load(self.path / "alive.npy")
+        self._ids = state["ids"]
+        self._metadatas = state["metadatas"]
+        self._rows = {exp_id: row for row, exp_id in enumerate(self._ids) if self._alive[row]}
+        self._size = self._capacity = size
+
+        # Escritas após o último save ficam só no arquivo float32: descartar
+        expected = size * self.dimension * 4
+        vectors_file = self.path / "vectors.f32"
+        stored = vectors_file.stat().st_size if vectors_file.exists() else 0
+        if stored < expected or len(self._data) != size:
+            raise ValueError(f"Índice em {self.path} inconsistente com os vetores em disco; reconstrua o índice")
+        if stored > expected:
+            with open(vectors_file, "r+b") as handle:
+                handle.truncate(expected)
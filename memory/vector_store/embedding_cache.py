@@ -0,0 +1,88 @@
+"""
+Cache LRU de embeddings, opcionalmente quantizado
+
+Evita recodificar textos repetidos (consultas de tarefas semelhantes,
+re-indexação). As entradas são chaveadas pelo SHA-256 do texto e guardadas
+no modo de quantização configurado. Acerto e falta devolvem o mesmo vetor
+float32 reconstruído da entrada, de modo que o embedding de um texto não
+depende do estado do cache; o padrão float32 é exato.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from memory.vector_store.quantization import quantize, dequantize
+
+
+class EmbeddingCache:
+    """Envolve um encoder (ex.: SentenceTransformer) com cache LRU"""
+
+    def __init__(self, encoder, max_entries: int = 2048, storage: str = "float32"):
+        self.encoder = encoder
+        self.max_entries = max_entries
+        self.storage = storage
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def encode(self, text: str) -> np.ndarray:
+        """Embedding float32 de um texto"""
+        return self.encode_batch([text])[0]
+
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Embeddings float32 de vários textos; só as faltas vão ao encoder"""
+        keys = [self._key(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is None:
+                    missing.setdefault(key, []).append(i)
+                    continue
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                vectors[i] = dequantize(*entry)[0]
+
+        if missing:
+            pending = [texts[positions[0]] for positions in missing.values()]
+            encoded = np.asarray(self.encoder.encode(pending), dtype=np.float32).reshape(len(pending), -1)
+            with self._lock:
+                for (key, positions), vector in zip(missing.items(), encoded):
+                    self._stats["misses"] += len(positions)
+                    entry = quantize(vector, self.storage)
+                    for i in positions:
+                        vectors[i] = dequantize(*entry)[0]
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+
+        return np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            memory = sum(data.nbytes + (scales.nbytes if scales is not None else 0)
+                         for data, scales in self._entries.values())
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                storage=self.storage,
+                bytes=memory,
+                hit_rate=self._stats["hits"] / lookups if lookups else 0.0,
+            )
@@ -0,0 +1,77 @@
+"""
+Quantização de embeddings para armazenamento compacto
+
+Modos suportados:
+- float32: sem perda (referência)
+- float16: metade da memória, erro desprezível para similaridade de cosseno
+- int8: um quarto da memória, com escala por vetor (max |x| / 127)
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+QUANTIZATION_MODES = ("float32", "float16", "int8")
+
+_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+def storage_dtype(mode: str):
+    """dtype numpy usado para o modo"""
+    if mode not in _DTYPES:
+        raise ValueError(f"Modo de quantização desconhecido: {mode} (use {', '.join(QUANTIZATION_MODES)})")
+    return _DTYPES[mode]
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normaliza linhas para norma 1 (produto interno = cosseno)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors: np.ndarray, mode: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Quantiza uma matriz (n, d). Retorna (dados, escalas); escalas só existem
+    no modo int8.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    dtype = storage_dtype(mode)
+
+    if mode != "int8":
+        return vectors.astype(dtype), None
+
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    data = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return data, scales.astype(np.float32)
+
+
+def dequantize(data: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """Reconstrói float32 a partir dos dados quantizados"""
+    values = np.asarray(data).astype(np.float32)
+    if scales is not None:
+        values *= np.asarray(scales, dtype=np.float32).reshape(-1, 1)
+    return values
+
+
+def quantized_scores(query: np.ndarray, data: np.ndarray, scales: Optional[np.ndarray] = None,
+                     block_rows: int = 16384) -> np.ndarray:
+    """
+    Produto interno entre a consulta (float32) e linhas quantizadas,
+    em blocos para não materializar a matriz inteira em float32.
+    """
+    query = np.asarray(query, dtype=np.float32).reshape(-1)
+    n = data.shape[0]
+    scores = np.empty(n, dtype=np.float32)
+    for start in range(0, n, block_rows):
+        block = data[start:start + block_rows].astype(np.float32)
+        scores[start:start + block_rows] = block @ query
+    if scales is not None:
+        scores *= scales[:n]
+    return scores
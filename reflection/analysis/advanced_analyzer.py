@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from memory.graph_rag.experience_store import ExperienceGraphRAG
+from memory.experience_stream import ExperienceStream
 
 @dataclass
 class ReflectionInsight:
@@ -57,65 +58,63 @@ class AdvancedSymbolicAnalyzer:
         if performance_data["total_experiences"] < 5:
             return None
         
-        # Analisar experiências recentes vs antigas
-        with self.graph_rag.driver.session() as session:
-            query = """
-                MATCH (e:Experience {agent_type: $agent_name})
-                WITH e ORDER BY e.timestamp
-                WITH collect(e) as experiences
-                WITH experiences[..size(experiences)/2] as old_half,
-                     experiences[size(experiences)/2..] as new_half
-                
-                UNWIND old_half as old_exp
-                WITH avg(old_exp.quality_score) as old_avg, new_half
-                
-                UNWIND new_half as new_exp  
-                WITH old_avg, avg(new_exp.quality_score) as new_avg
-                
-                RETURN old_avg, new_avg, new_avg - old_avg as improvement
-            """
-            
-            result = session.run(query, agent_name=agent_name)
-            record = result.single()
+        # Analisar experiências recentes vs antigas (leitura em fluxo, sem o código).
+        # total_experiences ainda conta o que a retenção apagou: a divisão usa as
+        # linhas realmente lidas. Duas passagens (contar, depois somar cada metade)
+        # mantêm a memória constante, seja qual for o tamanho do histórico.
+        with ExperienceStream(self.graph_rag, agent=agent_name, include_code=False) as stream:
+            half = sum(1 for _ in stream) // 2
+        
+        halves = [[0.0, 0], [0.0, 0]]  # [soma, contagem] da metade antiga e da recente
+        with ExperienceStream(self.graph_rag, agent=agent_name, include_code=False) as stream:
+            for position, experience in enumerate(stream):
+                if experience["quality"] is not None:
+                    halves[position >= half][0] += experience["quality"]
+                    halves[position >= half][1] += 1
+        
+        record = None
+        if halves[0][1] and halves[1][1]:
+            old_avg, new_avg = (total / count for total, count in halves)
+            record = {"old_avg": old_avg, "new_avg": new_avg, "improvement": new_avg - old_avg}
+        
+        if record:
+            improvement = record["improvement"]
+            confidence = min(abs(improvement) * 10, 0.95)
             
-            if record:
-                improvement = record["improvement"]
-                confidence = min(abs(improvement) * 10, 0.95)
-                
-                if improvement > 0.5:
-                    return ReflectionInsight(
-                        type="improvement",
-                        description=f"{agent_name} mostra evolução positiva significativa",
-                        evidence=[
-                            f"Qualidade antiga: {record['old_avg']:.2f}",
-                            f"Qualidade recente: {record['new_avg']:.2f}",
-                            f"Melhoria: +{improvement:.2f} pontos"
-                        ],
-                        confidence=confidence,
-                        recommendations=[
-                            "Continuar estratégias atuais",
-                            "Documentar padrões que levaram à melhoria",
-                            "Aplicar aprendizados a outros agentes"
-                        ],
-                        timestamp=datetime.now().isoformat()
-                    )
-                elif improvement < -0.5:
-                    return ReflectionInsight(
-                        type="anomaly",
-                        description=f"{agent_name} mostra degradação de performance",
-                        evidence=[
-                            f"Qualidade antiga: {record['old_avg']:.2f}",
-                            f"Qualidade recente: {record['new_avg']:.2f}",
-                            f"Declínio: {improvement:.2f} pontos"
-                        ],
-                        confidence=confidence,
-                        recommendations=[
-                            "Investigar causas da degradação",
-                            "Revisar mudanças recentes nos prompts",
-                            "Considerar reset para checkpoint anterior"
-                        ],
-                        timestamp=datetime.now().isoformat()
-                    )
+            if improvement > 0.5:
+                return ReflectionInsight(
+                    type="improvement",
+                    description=f"{agent_name} mostra evolução positiva significativa",
+                    evidence=[
+                        f"Qualidade antiga: {record['old_avg']:.2f}",
+                        f"Qualidade recente: {record['new_avg']:.2f}",
+                        f"Melhoria: +{improvement:.2f} pontos"
+                    ],
+                    confidence=confidence,
+                    recommendations=[
+                        "Continuar estratégias atuais",
+                        "Documentar padrões que levaram à melhoria",
+                        "Aplicar aprendizados a outros agentes"
+                    ],
+                    timestamp=datetime.now().isoformat()
+                )
+            elif improvement < -0.5:
+                return ReflectionInsight(
+                    type="anomaly",
+                    description=f"{agent_name} mostra degradação de performance",
+                    evidence=[
+                        f"Qualidade antiga: {record['old_avg']:.2f}",
+                        f"Qualidade recente: {record['new_avg']:.2f}",
+                        f"Declínio: {improvement:.2f} pontos"
+                    ],
+                    confidence=confidence,
+                    recommendations=[
+                        "Investigar causas da degradação",
+                        "Revisar mudanças recentes nos prompts",
+                        "Considerar reset para checkpoint anterior"
+                    ],
+                    timestamp=datetime.now().isoformat()
+                )
         
         return None
     
@@ -175,33 +174,17 @@ class AdvancedSymbolicAnalyzer:
             "cache", "performance", "segurança", "concorrência"
         ]
         
+        # Todas as categorias numa única consulta agrupada (categorias materializadas)
         gaps = []
-        with self.graph_rag.driver.session() as session:
-            for category in task_categories:
-                query = """
-                    MATCH (e:Experience {agent_type: $agent_name})
-                    WHERE toLower(e.task) CONTAINS $category
-                    RETURN count(e) as count,
-                           avg(e.quality_score) as avg_quality,
-                           sum(case when e.success then 1 else 0 end) * 100.0 / count(e) as success_rate
-                """
-                
-                result = session.run(query, agent_name=agent_name, category=category)
-                record = result.single()
-                
-                if record:
-                    count = record["count"] or 0
-                    avg_quality = record["avg_quality"] or 0
-                    success_rate = record["success_rate"] or 0
-                    
-                    # Identificar lacunas significativas
-                    if count < 2 or avg_quality < 6.0 or success_rate < 70:
-                        gaps.append({
-                            "category": category,
-                            "count": count,
-                            "avg_quality": avg_quality,
-                            "success_rate": success_rate
-                        })
+        for category, stats in self.graph_rag.get_category_stats(task_categories, agent_name).items():
+            # Identificar lacunas significativas
+            if stats["count"] < 2 or stats["avg_quality"] < 6.0 or stats["success_rate"] < 70:
+                gaps.append({
+                    "category": category,
+                    "count": stats["count"],
+                    "avg_quality": stats["avg_quality"],
+                    "success_rate": stats["success_rate"]
+                })
         
         if gaps:
             # Priorizar lacunas mais críticas
@@ -238,28 +221,17 @@ class AdvancedSymbolicAnalyzer:
         # Analisar distribuição de qualidade por categoria
         specialization_scores = {}
         
-        with self.graph_rag.driver.session() as session:
-            # Categorias para análise
-            categories = ["API", "algoritmo", "validação", "banco de dados", "interface"]
-            
-            for category in categories:
-                query = """
-                    MATCH (e:Experience {agent_type: $agent_name})
-                    WHERE toLower(e.task) CONTAINS $category
-                    AND e.success = true
-                    RETURN avg(e.quality_score) as avg_quality,
-                           count(e) as count
-                """
-                
-                result = session.run(query, agent_name=agent_name, category=category)
-                record = result.single()
+        # Categorias para análise
+        categories = ["API", "algoritmo", "validação", "banco de dados", "interface"]
+        
+        for category, stats in self.graph_rag.get_category_stats(categories, agent_name).items():
+            # Apenas experiências bem-sucedidas contam para especialização
+            count = stats["success_count"]
+            if count >= 3:
+                quality = stats["avg_success_quality"]
                 
-                if record and record["count"] >= 3:
-                    quality = record["avg_quality"]
-                    count = record["count"]
-                    
-                    # Score baseado em qualidade e experiência
-                    specialization_scores[category] = quality * (1 + count / 20)
+                # Score baseado em qualidade e experiência
+                specialization_scores[category] = quality * (1 + count / 20)
         
         if specialization_scores:
             best_category = max(specialization_scores, key=specialization_scores.get)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark de ligação/recuperação de experiências similares no Neo4j
+
+Compara, para bases de 10k e 100k experiências sintéticas, o custo por
+escrita e por consulta de:
+  - legado: varredura de todas as Experience com CONTAINS nas palavras;
+  - full-text: índice Lucene experience_task_fulltext com ranking BM25 e
+    lista de candidatos limitada (ExperienceGraphRAG atual).
+
+As experiências do benchmark são marcadas com benchmark = true e removidas
+ao final. Requer o Neo4j configurado em DATABASE_CONFIG.
+
+Uso:
+    python scripts/benchmarks/bench_fulltext_linking.py --sizes 10000 100000 --samples 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from memory.graph_rag.driver_registry import get_neo4j_driver
+from memory.graph_rag.experience_store import ExperienceGraphRAG, create_experience
+
+VERBS = ["calcular", "ordenar", "validar", "converter", "buscar", "filtrar", "agrupar", "serializar"]
+OBJECTS = ["lista", "matriz", "usuario", "pedido", "arquivo", "token", "endpoint", "consulta",
+           "cache", "grafo", "fila", "data", "senha", "relatorio", "imagem", "transacao"]
+QUALIFIERS = ["recursivamente", "paginado", "ordenado", "assincrono", "em lote", "com cache",
+              "por prioridade", "incremental", "seguro", "paralelo"]
+
+LEGACY_LINK = """
+    MATCH (e2:Experience)
+    WHERE e2.id <> $experience_id
+    AND (
+        e2.task CONTAINS $task_words[0] OR
+        e2.task CONTAINS $task_words[1] OR
+        e2.task CONTAINS $task_words[2]
+    )
+    WITH e2,
+         size([word IN $task_words WHERE e2.task CONTAINS word]) as similarity
+    WHERE similarity >= 2
+    RETURN count(e2) AS links
+"""
+
+LEGACY_RETRIEVE = """
+    MATCH (e:Experience)
+    WHERE e.quality_score >= 6.0 AND e.success = true
+    AND (
+        e.task CONTAINS $task_words[0] OR
+        e.task CONTAINS $task_words[1] OR
+        e.task CONTAINS $task_words[2]
+    )
+    WITH e, size([word IN $task_words WHERE e.task CONTAINS word]) as relevance
+    ORDER BY relevance DESC, e.quality_score DESC
+    LIMIT 5
+    RETURN e.id
+"""
+
+
+def synthetic_task(rng) -> str:
+    return (f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(OBJECTS)} "
+            f"{rng.choice(QUALIFIERS)} variante {int(rng.integers(0, 500))}")
+
+
+def legacy_words(task: str):
+    return [word.lower() for word in task.split() if len(word) > 3][:5]
+
+
+def populate(driver, target: int, rng, batch_size: int = 5000) -> int:
+    with driver.session() as session:
+        current = session.run("MATCH (e:Experience {benchmark: true}) RETURN count(e) AS n").single()["n"]
+        while current < target:
+            size = min(batch_size, target - current)
+            rows = [{
+                "id": str(uuid.uuid4()),
+                "task": synthetic_task(rng),
+                "quality": float(rng.uniform(4, 10)),
+                "success": bool(rng.random() < 0.8),
+            } for _ in range(size)]
+            session.run("""
+                UNWIND $rows AS row
+                CREATE (:Experience {id: row.id, task: row.task, code: 'pass',
+                                     quality_score: row.quality, success: row.success,
+                                     timestamp: toString(datetime()), agent_type: 'BenchAgent',
+                                     aggregated: true, benchmark: true})
+            """, rows=rows)
+            current += size
+            print(f"   ... {current}/{target}")
+    return current
+
+
+def timed(fn, samples: int):
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return statistics.median(durations), durations[int(len(durations) * 0.95) - 1]
+
+
+def cleanup(driver):
+    with driver.session() as session:
+        session.run("""
+            MATCH (e:Experience {benchmark: true})
+            CALL { WITH e DETACH DELETE e } IN TRANSACTIONS OF 10000 ROWS
+        """)
+        session.run("MATCH (s:AgentDomainDay {agent: 'BenchAgent'}) DETACH DELETE s")
+        session.run("MATCH (a:Agent {name: 'BenchAgent'}) DETACH DELETE a")
+
+
+def run(args):
+    rng = np.random.default_rng(args.seed)
+    driver = get_neo4j_driver()
+    graph = ExperienceGraphRAG()
+    try:
+        print(f"\n{'experiências':>12} {'etapa':<22} {'p50 ms':>9} {'p95 ms':>9}")
+        for size in sorted(args.sizes):
+            print(f"🔧 Populando {size} experiências...")
+            populate(driver, size, rng)
+
+            probes = [synthetic_task(rng) for _ in range(args.samples)]
+            probe_iter = iter(probes * 4)
+
+            def legacy_link():
+                task = next(probe_iter)
+                with driver.session() as session:
+                    session.run(LEGACY_LINK, experience_id="-", task_words=legacy_words(task)).consume()
+
+            def fulltext_write():
+                experience = create_experience(next(probe_iter), "pass", 7.0, True, "BenchAgent",
+                                               context={"benchmark": True})
+                graph.store_experience(experience)
+
+            def legacy_retrieve():
+                with driver.session() as session:
+                    session.run(LEGACY_RETRIEVE, task_words=legacy_words(next(probe_iter))).consume()
+
+            def fulltext_retrieve():
+                graph.retrieve_similar_experiences(next(probe_iter))
+
+            for label, fn in (("ligação (CONTAINS)", legacy_link),
+                              ("escrita+ligação (BM25)", fulltext_write),
+                              ("consulta (CONTAINS)", legacy_retrieve),
+                              ("consulta (BM25)", fulltext_retrieve)):
+                p50, p95 = timed(fn, args.samples)
+                print(f"{size:>12} {label:<22} {p50:>9.1f} {p95:>9.1f}")
+
+            # Experiências gravadas pelo benchmark também são removidas
+            with driver.session() as session:
+                session.run("MATCH (e:Experience {agent_type: 'BenchAgent'}) SET e.benchmark = true")
+    finally:
+        if not args.keep:
+            print("🧹 Removendo experiências do benchmark...")
+            cleanup(driver)
+        graph.close()
+        driver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="Mantém os dados sintéticos")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark do clustering de código da descoberta de padrões
+
+Gera códigos sintéticos (variações de poucos modelos de função, como
+tarefas parecidas produzem) e compara, em tempo e pico de memória
+(tracemalloc), o caminho legado com o esparso:
+  - legado: TfidfVectorizer.fit_transform + toarray() + DBSCAN(cosine)
+    com mapeamento de volta por codes.index();
+  - esparso: TF-IDF esparso + grafo de vizinhança por raio em blocos +
+    DBSCAN(precomputed) com mapeamento posicional.
+
+Uso:
+    python scripts/benchmarks/bench_pattern_clustering.py --samples 10000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics import adjusted_rand_score
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from memory.pattern_clustering import dbscan_labels
+
+TEMPLATES = [
+    "def {name}(items):\n    if not items:\n        raise ValueError('vazio')\n    return sorted(items, key=lambda {var}: {var}.{field})",
+    "def {name}(path):\n    with open(path, encoding='utf-8') as handle:\n        return [line.split(',') for line in handle if '{field}' in line]",
+    "def {name}(user, password):\n    try:\n        token = auth_service.login(user, password)\n    except AuthError:\n        return None\n    return token.{field}",
+    "def {name}(conn, {var}):\n    cursor = conn.execute('SELECT * FROM {field} WHERE id = ?', ({var},))\n    return cursor.fetchall()",
+    "async def {name}(session, url):\n    async with session.get(url) as response:\n        payload = await response.json()\n    return payload['{field}']",
+    "def {name}(a: int, b: int) -> int:\n    # soma com validação\n    assert isinstance(a, int)\n    return a + b + {var}_{field}",
+]
+WORDS = ["pedido", "usuario", "cliente", "produto", "fatura", "estoque", "rota", "sessao",
+         "arquivo", "relatorio", "evento", "tarefa", "pagamento", "endereco", "item", "lote"]
+
+
+def synthetic_codes(count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    codes, truth = [], []
+    for _ in range(count):
+        template = int(rng.integers(len(TEMPLATES)))
+        name, var, field = rng.choice(WORDS, size=3)
+        codes.append(TEMPLATES[template].format(name=f"{name}_{rng.integers(50)}", var=var, field=field))
+        truth.append(template)
+    return codes, np.asarray(truth)
+
+
+def measure(function):
+    """Tempo sem rastreamento e, numa segunda execução, pico via tracemalloc"""
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 ** 2
+
+
+def legacy(codes, eps):
+    vectors = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1, 3)).fit_transform(codes)
+    labels = DBSCAN(eps=eps, min_samples=2, metric='cosine').fit_predict(vectors.toarray())
+    members = {}
+    for i, label in enumerate(labels):
+        if label != -1:
+            members.setdefault(label, []).append(codes.index(codes[i]))
+    return labels
+
+
+def sparse_path(codes, eps):
+    vectors = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1, 3)).fit_transform(codes)
+    labels = dbscan_labels(vectors, eps=eps)
+    members = {}
+    for label in set(labels) - {-1}:
+        members[label] = np.flatnonzero(labels == label)
+    return labels
+
+
+def run(args):
+    print(f"🔧 Gerando {args.samples} códigos sintéticos...")
+    codes, truth = synthetic_codes(args.samples, args.seed)
+
+    print(f"\n{'caminho':<8} {'segundos':>9} {'pico MB':>9} {'clusters':>9} {'ruído':>7} {'ARI':>6}")
+    results = {}
+    for name, function in (("legado", legacy), ("esparso", sparse_path)):
+        if name == "legado" and args.skip_legacy:
+            continue
+        labels, elapsed, peak = measure(lambda: function(codes, args.eps))
+        results[name] = labels
+        clusters = len(set(labels) - {-1})
+        noise = int(np.sum(labels == -1))
+        print(f"{name:<8} {elapsed:>9.2f} {peak:>9.1f} {clusters:>9} {noise:>7} "
+              f"{adjusted_rand_score(truth, labels):>6.3f}")
+
+    if len(results) == 2:
+        print(f"\nConcordância legado × esparso (ARI): "
+              f"{adjusted_rand_score(results['legado'], results['esparso']):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do clustering de código")
+    parser.add_argument("--samples", type=int, default=10000)
+    parser.add_argument("--eps", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-legacy", action="store_true", help="Não executa o caminho denso")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
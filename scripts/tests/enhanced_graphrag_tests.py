@@ -21,6 +21,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from core.agents.code_agent_enhanced import CodeAgentEnhanced
 from memory.hybrid_store import HybridMemoryStore, CodingExperience
+from memory.graph_rag.driver_registry import close_all_drivers
 from memory.pattern_discovery import PatternDiscoveryEngine
 from evolution.checkpointing.agent_checkpoints import AgentCheckpointManager
 from config.paths import IDENTITY_STATE, MEMORY_LOG
@@ -408,7 +409,8 @@ class EnhancedGraphRAGTestSuite:
         
         try:
             # 1. Teste com banco indisponível
-            with patch('memory.hybrid_store.GraphDatabase') as mock_db:
+            close_all_drivers()  # sem pool em cache: o próximo acquire cria o driver
+            with patch('memory.graph_rag.driver_registry.GraphDatabase') as mock_db:
                 mock_db.driver.side_effect = Exception("Database unavailable")
                 try:
                     agent = CodeAgentEnhanced(use_mock=True, enable_graphrag=True)
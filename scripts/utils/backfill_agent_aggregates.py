@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Backfill dos agregados incrementais de agentes
+
+Bases criadas antes dos agregados (Agent.exp_count, AgentDomainDay, ...)
+têm apenas avg_quality_score sobrescrito pela última experiência. Este
+script recalcula todos os contadores a partir dos nós Experience.
+
+Uso:
+    python scripts/utils/backfill_agent_aggregates.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from memory.graph_rag.driver_registry import get_neo4j_driver
+from memory.graph_rag.schema import bootstrap_schema
+from memory.graph_rag.aggregates import rebuild_agent_aggregates
+
+
+def main():
+    print("🔄 Recalculando agregados de agentes")
+    print("=" * 40)
+
+    driver = get_neo4j_driver()
+    try:
+        bootstrap_schema(driver)
+        start = time.perf_counter()
+        report = rebuild_agent_aggregates(driver)
+        print(f"✅ {report['agents']} agentes e {report['agent_domain_days']} "
+              f"séries (agente, domínio, dia) em {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"❌ Falha no backfill: {e}")
+        sys.exit(1)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Backfill das categorias de tarefa materializadas
+
+Experiências gravadas antes das categorias não têm relações IN_CATEGORY;
+este script as classifica em lotes (experiências já avaliadas são
+marcadas com categorized = true e não são reprocessadas).
+
+Uso:
+    python scripts/utils/backfill_task_categories.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from memory.graph_rag.driver_registry import get_neo4j_driver
+from memory.graph_rag.schema import bootstrap_schema
+from memory.graph_rag.task_categories import backfill_task_categories
+
+
+def main():
+    print("🔄 Classificando experiências em categorias de tarefa")
+    print("=" * 40)
+
+    driver = get_neo4j_driver()
+    try:
+        bootstrap_schema(driver)
+        start = time.perf_counter()
+        linked = backfill_task_categories(driver)
+        print(f"✅ {linked} experiências classificadas em {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"❌ Falha no backfill: {e}")
+        sys.exit(1)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Constrói arestas SIMILAR_TO a partir dos embeddings (job offline)
+
+Calcula os k vizinhos mais próximos das experiências gravadas desde a
+última execução e grava as arestas com peso de similaridade. Pensado para
+cron/agendador, fora do caminho de escrita dos agentes.
+
+Uso:
+    python scripts/utils/build_similarity_links.py            # incremental
+    python scripts/utils/build_similarity_links.py --full     # recalcula tudo
+    python scripts/utils/build_similarity_links.py --every 900
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from memory.hybrid_store import create_memory_store
+from memory.graph_rag.similarity_links import SimilarityLinkJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description="kNN offline de experiências por embeddings")
+    parser.add_argument("--backend", choices=["neo4j", "sqlite"], help="Sobrescreve GRAPHRAG_BACKEND")
+    parser.add_argument("--full", action="store_true", help="Ignora a marca d'água e processa tudo")
+    parser.add_argument("--k", type=int, help="Vizinhos por experiência")
+    parser.add_argument("--min-similarity", type=float)
+    parser.add_argument("--every", type=int, help="Repete a cada N segundos")
+    args = parser.parse_args()
+
+    store = create_memory_store(backend=args.backend)
+    job = SimilarityLinkJob(store, k=args.k, min_similarity=args.min_similarity)
+    full = args.full
+    try:
+        while True:
+            print(f"🔄 Calculando vizinhos ({'completo' if full else 'incremental'})")
+            report = job.run(full=full)
+            print(f"✅ {report['new_experiences']} experiências novas de {report['corpus']}, "
+                  f"{report['links']} arestas em {report['seconds']:.1f}s")
+            if not args.every:
+                break
+            full = False
+            time.sleep(args.every)
+    except KeyboardInterrupt:
+        print("⚠️ Interrompido")
+    except Exception as e:
+        print(f"❌ Falha no job de similaridade: {e}")
+        sys.exit(1)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
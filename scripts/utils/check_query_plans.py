@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Verifica o schema Neo4j e os planos das consultas quentes do GraphRAG
+
+Sai com código 1 se faltar constraint/índice ou se alguma consulta quente
+cair em NodeByLabelScan/AllNodesScan. Útil em CI contra um Neo4j de teste.
+
+Uso:
+    python scripts/utils/check_query_plans.py [--no-create]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from memory.graph_rag.driver_registry import get_neo4j_driver
+from memory.graph_rag.schema import ensure_schema, verify_schema, check_query_plans, HOT_QUERIES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checa schema e planos das consultas quentes")
+    parser.add_argument("--no-create", action="store_true",
+                        help="Não cria o schema antes de verificar")
+    args = parser.parse_args()
+
+    driver = get_neo4j_driver()
+    failed = False
+
+    try:
+        if not args.no_create:
+            applied = ensure_schema(driver)
+            print(f"🧱 Schema aplicado: {len(applied)} constraints/índices")
+
+        report = verify_schema(driver)
+        if report["missing"]:
+            failed = True
+            print(f"❌ Ausentes: {', '.join(report['missing'])}")
+        if report["not_online"]:
+            print(f"⚠️ Ainda populando: {', '.join(report['not_online'])}")
+
+        offenders = check_query_plans(driver)
+        for name in HOT_QUERIES:
+            if name in offenders:
+                failed = True
+                print(f"❌ {name}: {', '.join(offenders[name])}")
+            else:
+                print(f"✅ {name}")
+
+    except Exception as e:
+        failed = True
+        print(f"❌ Erro ao verificar planos: {e}")
+    finally:
+        driver.close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
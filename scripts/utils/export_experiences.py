@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Backup, migração e seed do store de experiências
+
+Exporta o store configurado (GRAPHRAG_BACKEND) para chunks JSONL
+comprimidos ou importa uma exportação para ele. Ambos os comandos retomam
+do ponto em que pararam se forem interrompidos.
+
+Uso:
+    python scripts/utils/export_experiences.py export data/backups/exp_2026_10
+    python scripts/utils/export_experiences.py export data/backups/code --agent CodeAgent
+    python scripts/utils/export_experiences.py import data/backups/exp_2026_10 --backend sqlite
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from memory.hybrid_store import create_memory_store
+from memory.experience_export import ExperienceExporter, ExperienceImporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportação/importação em fluxo de experiências")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="Diretório da exportação")
+    parser.add_argument("--backend", choices=["neo4j", "sqlite"], help="Sobrescreve GRAPHRAG_BACKEND")
+    parser.add_argument("--agent", help="Exporta apenas um agente")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--no-embeddings", action="store_true",
+                        help="Não exporta vetores (recalculados na importação)")
+    args = parser.parse_args()
+
+    store = create_memory_store(backend=args.backend)
+    try:
+        if args.command == "export":
+            print(f"📦 Exportando experiências para {args.path}")
+            manifest = ExperienceExporter(
+                store, args.path, chunk_size=args.chunk_size, page_size=args.page_size,
+                include_embeddings=not args.no_embeddings, agent=args.agent
+            ).run()
+            run = manifest["last_run"]
+            print(f"✅ {manifest['total_experiences']} experiências em {len(manifest['chunks'])} chunks "
+                  f"({manifest['total_bytes'] / 1024 ** 2:.1f}MB, {manifest['compression']})")
+            print(f"   {run['experiences_per_second']:.0f} exp/s, {run['mb_per_second']:.2f} MB/s")
+        else:
+            print(f"📥 Importando experiências de {args.path}")
+            stats = ExperienceImporter(store, args.path).run()
+            print(f"✅ {stats['total_imported']} experiências importadas ({stats['failed']} falhas)")
+            print(f"   {stats['experiences_per_second']:.0f} exp/s")
+    except Exception as e:
+        print(f"❌ Falha: {e}")
+        sys.exit(1)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
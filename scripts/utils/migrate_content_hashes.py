@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Migração única: identificadores Task/Code endereçados por conteúdo
+
+Versões anteriores geravam Task.id e Code.hash com hash() do Python, que muda
+a cada processo. Este script recalcula os identificadores com SHA-256
+(memory.graph_rag.content_hash), funde nós duplicados preservando as relações
+com Experience e remove relações paralelas criadas por CREATE.
+
+Uso:
+    python scripts/utils/migrate_content_hashes.py [--dry-run]
+"""
+
+import sys
+import time
+import argparse
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from memory.graph_rag.driver_registry import get_neo4j_driver
+from memory.graph_rag.content_hash import stable_task_id, stable_code_hash
+
+# (label, propriedade-chave, propriedade de conteúdo, relação vinda de Experience, função de hash)
+TARGETS = [
+    ("Task", "id", "description", "EXECUTED_TASK", stable_task_id),
+    ("Code", "hash", "content", "GENERATED_CODE", stable_code_hash),
+]
+
+PAGE_SIZE = 1000
+
+
+def _scan_groups(session, label, key, content_prop, hash_fn):
+    """Lê os nós em páginas (keyset por elementId) e agrupa pelo novo identificador"""
+    groups = defaultdict(list)
+    after = ""
+
+    while True:
+        records = list(session.run(f"""
+            MATCH (n:{label})
+            WHERE elementId(n) > $after
+            RETURN elementId(n) AS eid, n.{key} AS current, n.{content_prop} AS content
+            ORDER BY eid
+            LIMIT $limit
+        """, after=after, limit=PAGE_SIZE))
+
+        if not records:
+            break
+
+        for record in records:
+            new_id = hash_fn(record["content"] or "")
+            groups[new_id].append((record["eid"], record["current"]))
+
+        after = records[-1]["eid"]
+
+    return groups
+
+
+def _merge_groups(session, label, key, rel_type, groups, batch_size=200):
+    """Funde duplicatas em transações de lote; retorna nós removidos"""
+    plan = []
+    for new_id, members in groups.items():
+        # Preferir como canônico o nó que já possui o identificador estável
+        members.sort(key=lambda m: m[1] != new_id)
+        keep = members[0][0]
+        dups = [eid for eid, _ in members[1:]]
+        if dups or members[0][1] != new_id:
+            plan.append({"keep": keep, "new_id": new_id, "dups": dups})
+
+    removed = 0
+    for start in range(0, len(plan), batch_size):
+        batch = plan[start:start + batch_size]
+        session.execute_write(lambda tx: tx.run(f"""
+            UNWIND $groups AS g
+            MATCH (keep:{label}) WHERE elementId(keep) = g.keep
+            SET keep.{key} = g.new_id
+            WITH keep, g
+            UNWIND g.dups AS dup_id
+            MATCH (dup:{label}) WHERE elementId(dup) = dup_id
+            CALL {{
+                WITH dup, keep
+                MATCH (e:Experience)-[:{rel_type}]->(dup)
+                MERGE (e)-[:{rel_type}]->(keep)
+            }}
+            DETACH DELETE dup
+        """, groups=batch).consume())
+        removed += sum(len(g["dups"]) for g in batch)
+
+    return removed
+
+
+def _remove_parallel_relationships(session, rel_type):
+    """Remove relações repetidas entre o mesmo par de nós"""
+    summary = session.execute_write(lambda tx: tx.run(f"""
+        MATCH (e:Experience)-[r:{rel_type}]->(n)
+        WITH e, n, collect(r) AS rels
+        WHERE size(rels) > 1
+        FOREACH (r IN tail(rels) | DELETE r)
+    """).consume())
+    return summary.counters.relationships_deleted
+
+
+def _code_bytes(session):
+    record = session.run("""
+        MATCH (c:Code)
+        RETURN count(c) AS nodes, sum(size(coalesce(c.content, ''))) AS chars
+    """).single()
+    return record["nodes"], record["chars"] or 0
+
+
+def migrate_content_hashes(dry_run: bool = False):
+    """Executa a migração e imprime o ganho de armazenamento"""
+    driver = get_neo4j_driver()
+    start = time.time()
+
+    try:
+        with driver.session() as session:
+            code_nodes_before, code_chars_before = _code_bytes(session)
+
+            for label, key, content_prop, rel_type, hash_fn in TARGETS:
+                groups = _scan_groups(session, label, key, content_prop, hash_fn)
+                total = sum(len(members) for members in groups.values())
+                duplicates = total - len(groups)
+                print(f"🔎 {label}: {total} nós, {len(groups)} conteúdos distintos, {duplicates} duplicatas")
+
+                if dry_run:
+                    continue
+
+                removed = _merge_groups(session, label, key, rel_type, groups)
+                parallel = _remove_parallel_relationships(session, rel_type)
+                print(f"✅ {label}: {removed} nós fundidos, {parallel} relações paralelas removidas")
+
+            if not dry_run:
+                parallel = _remove_parallel_relationships(session, "PERFORMED_BY")
+                print(f"✅ PERFORMED_BY: {parallel} relações paralelas removidas")
+
+                code_nodes_after, code_chars_after = _code_bytes(session)
+                print(f"📉 Code: {code_nodes_before} → {code_nodes_after} nós, "
+                      f"{code_chars_before} → {code_chars_after} caracteres armazenados")
+
+        print(f"⏱️ Migração concluída em {time.time() - start:.1f}s{' (dry-run)' if dry_run else ''}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Erro na migração: {e}")
+        return False
+    finally:
+        driver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra Task/Code para identificadores SHA-256")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas relata duplicatas")
+    args = parser.parse_args()
+
+    print("🔄 Migrando identificadores de conteúdo do grafo")
+    print("=" * 40)
+    success = migrate_content_hashes(dry_run=args.dry_run)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
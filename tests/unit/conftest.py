@@ -0,0 +1,51 @@
+import hashlib
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from config.settings import GRAPHRAG_CONFIG
+from memory.hybrid_store import CodingExperience
+
+
+@pytest.fixture(autouse=True)
+def isolated_pattern_files(tmp_path, monkeypatch):
+    """Estado e padrões persistidos da descoberta em diretório temporário"""
+    config = GRAPHRAG_CONFIG["pattern_discovery"]
+    monkeypatch.setitem(config, "state_path", tmp_path / "discovery_state.json")
+    monkeypatch.setitem(config, "store_path", tmp_path / "patterns.sqlite3")
+    monkeypatch.setitem(config, "scheduler_state_path", tmp_path / "scheduler_state.json")
+
+
+class _BagOfWordsEncoder:
+    """Encoder determinístico: palavras em buckets de hash"""
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        rows = []
+        for text in ([texts] if single else texts):
+            vector = np.zeros(GRAPHRAG_CONFIG["vector_store"]["dimension"], dtype=np.float32)
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % len(vector)] += 1.0
+            rows.append(vector)
+        return rows[0] if single else np.vstack(rows)
+
+
+def _experience(exp_id, task, code, quality=8.0, success=True, agent="CodeAgent", days_ago=0):
+    return CodingExperience(
+        id=exp_id, task_description=task, code_generated=code, quality_score=quality,
+        execution_success=success, agent_name=agent, llm_model="test",
+        timestamp=datetime.now() - timedelta(days=days_ago), context={}
+    )
+
+
+@pytest.fixture
+def encoder():
+    """Encoder determinístico para stores de teste (sem SentenceTransformer)"""
+    return _BagOfWordsEncoder()
+
+
+@pytest.fixture
+def make_experience():
+    """Fábrica de CodingExperience: make_experience(id, tarefa, código, ...)"""
+    return _experience
@@ -0,0 +1,26 @@
+from reflection.analysis.advanced_analyzer import AdvancedSymbolicAnalyzer
+
+
+class _RetainedGraph:
+    """Agregado ainda conta 100 experiências, mas a retenção deixou só 10"""
+
+    def __init__(self):
+        self.rows = [{"id": f"exp_{i:02d}", "timestamp": f"2026-01-{i + 1:02d}T00:00:00",
+                      "quality": 5.0 if i < 5 else 8.0} for i in range(10)]
+
+    def get_agent_performance(self, agent_name):
+        return {"total_experiences": 100}
+
+    def fetch_experience_page(self, after=None, limit=500, agent=None, include_code=True):
+        rows = [row for row in self.rows if after is None or (row["timestamp"], row["id"]) > tuple(after)]
+        return rows[:limit]
+
+
+def test_trend_splits_on_streamed_rows_not_aggregate_count():
+    analyzer = AdvancedSymbolicAnalyzer.__new__(AdvancedSymbolicAnalyzer)
+    analyzer.graph_rag = _RetainedGraph()
+
+    insight = analyzer._analyze_performance_trends("CodeAgent")
+
+    assert insight is not None and insight.type == "improvement"
+    assert insight.evidence[0] == "Qualidade antiga: 5.00"
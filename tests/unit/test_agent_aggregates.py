@@ -0,0 +1,62 @@
+import math
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from memory.graph_rag.aggregates import (
+    aggregate_params, summarize_aggregate, merge_aggregates, read_agent_performance
+)
+from memory.graph_rag.schema import SCHEMA
+
+
+def _counters(qualities, successes):
+    return {
+        "exp_count": len(qualities),
+        "quality_sum": sum(qualities),
+        "quality_sumsq": sum(q * q for q in qualities),
+        "success_count": successes,
+        "quality_min": min(qualities),
+        "quality_max": max(qualities),
+    }
+
+
+def test_summary_matches_direct_statistics():
+    qualities = [6.0, 8.0, 9.5, 7.5]
+    summary = summarize_aggregate(_counters(qualities, successes=3))
+
+    mean = sum(qualities) / len(qualities)
+    stddev = math.sqrt(sum((q - mean) ** 2 for q in qualities) / len(qualities))
+    assert summary["total_experiences"] == 4
+    assert summary["avg_quality"] == pytest.approx(mean)
+    assert summary["quality_stddev"] == pytest.approx(stddev)
+    assert summary["success_rate"] == pytest.approx(75.0)
+    assert (summary["worst_quality"], summary["best_quality"]) == (6.0, 9.5)
+
+
+def test_merge_combines_agents():
+    merged = merge_aggregates([_counters([5.0, 7.0], 1), _counters([9.0], 1)])
+    summary = summarize_aggregate(merged)
+    assert summary["total_experiences"] == 3
+    assert summary["avg_quality"] == pytest.approx(7.0)
+    assert summary["best_quality"] == 9.0 and summary["worst_quality"] == 5.0
+
+
+def test_empty_aggregate_and_missing_agent():
+    assert summarize_aggregate(None)["total_experiences"] == 0
+
+    session = MagicMock()
+    session.run.return_value.single.return_value = None
+    assert read_agent_performance(session, "Ghost") == dict(summarize_aggregate(None), agent="Ghost")
+
+
+def test_aggregate_params_day_bucket():
+    params = aggregate_params(8.5, True, None, datetime(2025, 6, 4, 23, 59))
+    assert params["agg_day"] == "2025-06-04"
+    assert params["agg_domain"] == "general"
+    assert aggregate_params(7, 0, "api", "2025-06-05T10:00:00")["agg_day"] == "2025-06-05"
+
+
+def test_composite_unique_constraint_ddl():
+    item = next(i for i in SCHEMA if i.name == "agent_domain_day")
+    assert "REQUIRE (n.agent, n.domain, n.day) IS UNIQUE" in item.ddl()
@@ -0,0 +1,35 @@
+import numpy as np
+
+from memory.code_fingerprint import FingerprintCache, compute_fingerprint, fingerprint, group_by_fingerprint
+
+GUARDED = '''def dividir(a: float, b: float) -> float:
+    """Divide a por b."""
+    if b == 0:
+        raise ValueError("divisão por zero")  # guarda
+    return a / b
+'''
+
+
+def test_fingerprint_extracts_structural_features():
+    result = compute_fingerprint(GUARDED)
+
+    assert result.parsed
+    assert result.shape == "def > if > raise > return"
+    assert result.features == {"function", "type_hints", "docstrings", "validation",
+                               "error_handling", "comments", "return"}
+    assert result.ngrams["FunctionDef>If>Raise"] == 1
+
+    broken = compute_fingerprint("def quebrado(:\n    try")
+    assert not broken.parsed and not np.any(broken.vector())
+
+
+def test_renamed_code_shares_fingerprint_hash_and_cache_entry():
+    renamed = GUARDED.replace("dividir", "razao").replace("a: float", "x: float").replace("a / b", "x / b")
+    plain = "def soma(a, b):\n    return a + b\n"
+
+    groups = group_by_fingerprint([GUARDED, plain, renamed])
+
+    assert sorted(groups.values()) == [[0, 2], [1]]
+    cache = FingerprintCache(max_entries=1)
+    assert cache.get(plain) is cache.get(plain)
+    assert fingerprint(plain).hash != fingerprint(GUARDED).hash
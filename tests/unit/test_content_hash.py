@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from memory.graph_rag.content_hash import stable_task_id, stable_code_hash
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def test_identifiers_are_stable_across_processes():
+    script = (
+        "from memory.graph_rag.content_hash import stable_task_id, stable_code_hash;"
+        "print(stable_task_id('criar função soma'), stable_code_hash('def soma(a, b):\\n    return a + b'))"
+    )
+    outputs = set()
+    for seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT,
+                                env=env, capture_output=True, text=True, check=True)
+        outputs.add(result.stdout.strip())
+
+    assert len(outputs) == 1
+    assert outputs.pop() == " ".join([
+        stable_task_id("criar função soma"),
+        stable_code_hash("def soma(a, b):\n    return a + b"),
+    ])
+
+
+def test_normalization_deduplicates_cosmetic_differences():
+    assert stable_task_id("Criar  função soma ") == stable_task_id("criar função soma")
+    assert stable_code_hash("def f():\r\n    return 1  \r\n") == stable_code_hash("def f():\n    return 1")
+    assert stable_code_hash("def f():\n    return 1") != stable_code_hash("def f():\n    return 2")
+    assert stable_task_id("x").startswith("task_")
+    assert stable_code_hash("x").startswith("code_")
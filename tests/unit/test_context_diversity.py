@@ -0,0 +1,42 @@
+import numpy as np
+
+from memory.graph_rag.diversity import estimate_tokens, mmr_select, select_diverse
+from memory.sqlite_store import SQLiteMemoryStore
+
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([
+        [0.95, 0.31, 0.0],   # mais relevante
+        [0.95, 0.31, 0.01],  # quase duplicata do primeiro
+        [0.6, 0.0, 0.8],     # abordagem diferente
+    ])
+    assert mmr_select(query, candidates, [10, 10, 10], token_budget=100) == [0, 2]
+    assert mmr_select(query, candidates, [10, 10, 10], token_budget=100, mmr_lambda=1.0,
+                      duplicate_threshold=1.1) == [0, 1, 2]
+
+
+def test_mmr_respects_token_budget():
+    query = np.array([1.0, 0.0])
+    candidates = np.array([[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]])
+    # O mais relevante não cabe; o orçamento vai para os que cabem
+    assert mmr_select(query, candidates, [50, 10, 10], token_budget=25) == [2, 1]
+    assert estimate_tokens("") == 0 and estimate_tokens("abcdefgh") == 2
+
+
+def test_select_diverse_with_stored_embeddings(tmp_path, encoder, make_experience):
+    store = SQLiteMemoryStore(path=str(tmp_path / "graphrag.sqlite3"), encoder=encoder)
+    store.store_experience(make_experience("exp_1", "soma de dois números", "def soma(a, b):\n    return a + b"))
+    store.store_experience(make_experience("exp_2", "soma de dois números", "def soma(a, b):\n    return a + b"))
+    store.store_experience(make_experience("exp_3", "soma de lista de números", "def soma(xs):\n    return sum(xs)"))
+
+    candidates = store.retrieve_hybrid("soma de números", k=3)
+    chosen = store.select_diverse_experiences("soma de números", candidates, cost=lambda exp: 10)
+
+    assert len(chosen) == 2
+    assert "exp_3" in {exp["experience_id"] for exp in chosen}
+
+    # Experiências sem vetor só entram se sobrar orçamento
+    orphan = {"experience_id": "sem_vetor"}
+    assert select_diverse(np.ones(3), [orphan], {}, cost=lambda exp: 5, token_budget=4) == []
+    store.close()
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+
+from memory.graph_rag import driver_registry
+from memory.graph_rag.driver_registry import get_neo4j_driver, get_pool_metrics, close_all_drivers
+
+
+@pytest.fixture
+def fake_driver(monkeypatch):
+    created = []
+
+    def factory(uri, auth=None, **kwargs):
+        driver = MagicMock()
+        driver.kwargs = kwargs
+        created.append(driver)
+        return driver
+
+    monkeypatch.setattr(driver_registry.GraphDatabase, "driver", factory)
+    yield created
+    close_all_drivers()
+
+
+def test_components_share_one_pool(fake_driver):
+    first = get_neo4j_driver()
+    second = get_neo4j_driver()
+
+    assert first is second
+    assert len(fake_driver) == 1
+    assert fake_driver[0].kwargs["max_connection_pool_size"] == driver_registry.DATABASE_CONFIG["neo4j"]["pool_size"]
+    assert fake_driver[0].kwargs["connection_acquisition_timeout"] == driver_registry.DATABASE_CONFIG["neo4j"]["timeout"]
+
+
+def test_pool_closes_only_after_last_reference(fake_driver):
+    first = get_neo4j_driver()
+    get_neo4j_driver()
+
+    first.close()
+    assert not first.closed
+    fake_driver[0].close.assert_not_called()
+
+    first.close()
+    assert first.closed
+    fake_driver[0].close.assert_called_once()
+
+    # Nova aquisição recria o pool
+    again = get_neo4j_driver()
+    assert again is not first
+    assert len(fake_driver) == 2
+
+
+def test_session_metrics_and_liveness(fake_driver):
+    shared = get_neo4j_driver()
+
+    with shared.session():
+        metrics = shared.get_metrics()
+        assert metrics["sessions_active"] == 1
+
+    metrics = shared.get_metrics()
+    assert metrics["sessions_opened"] == 1
+    assert metrics["sessions_active"] == 0
+    assert metrics["sessions_peak"] == 1
+
+    assert shared.is_alive()
+    fake_driver[0].verify_connectivity.side_effect = RuntimeError("down")
+    assert not shared.is_alive()
+    assert shared.get_metrics()["liveness_failures"] == 1
+    assert shared.key[0] in get_pool_metrics()
+
+
+def test_different_password_gets_its_own_pool(fake_driver):
+    first = get_neo4j_driver(password="senha-a")
+    second = get_neo4j_driver(password="senha-b")
+
+    assert first is not second
+    assert len(fake_driver) == 2
+    assert "senha-a" not in repr(first.key)
+
+
+def test_acquire_during_last_close_never_gets_a_closed_pool(fake_driver, monkeypatch):
+    shared = get_neo4j_driver()
+    acquired, racers = [], []
+    release_ref = driver_registry.SharedDriver._release_ref
+
+    def racing_release(self):
+        # Outra thread tenta adquirir bem no meio da liberação da última referência
+        last = release_ref(self)
+        racer = threading.Thread(target=lambda: acquired.append(get_neo4j_driver()))
+        racer.start()
+        racers.append(racer)
+        racer.join(0.2)  # bloqueado no lock do registro até a liberação terminar
+        return last
+
+    monkeypatch.setattr(driver_registry.SharedDriver, "_release_ref", racing_release)
+    shared.close()
+    racers[0].join(5)
+
+    assert shared.closed
+    assert acquired[0] is not shared and not acquired[0].closed
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+
+from memory.experience_export import (
+    ExperienceExporter, ExperienceImporter, MANIFEST_NAME, decode_vector, encode_vector
+)
+from memory.sqlite_store import SQLiteMemoryStore
+
+
+@pytest.fixture
+def source(tmp_path, encoder, make_experience):
+    store = SQLiteMemoryStore(path=str(tmp_path / "source.sqlite3"), encoder=encoder)
+    for i in range(23):
+        store.store_experience(make_experience(f"exp_{i:02d}", f"tarefa número {i}", f"def f{i}():\n    return {i}",
+                                                quality=5.0 + i % 5, agent="CodeAgent" if i % 2 else "ApiAgent",
+                                                days_ago=i % 4))
+    yield store
+    store.close()
+
+
+def test_vector_encoding_roundtrip():
+    vector = np.random.default_rng(0).normal(size=8).astype(np.float32)
+    assert np.allclose(decode_vector(encode_vector(vector)), vector)
+    assert decode_vector(encode_vector(None)) is None
+
+
+def test_export_import_roundtrip(source, tmp_path, encoder):
+    manifest = ExperienceExporter(source, tmp_path / "export", chunk_size=10, page_size=4).run()
+
+    assert manifest["complete"] and manifest["total_experiences"] == 23
+    assert [c["count"] for c in manifest["chunks"]] == [10, 10, 3]
+
+    target = SQLiteMemoryStore(path=str(tmp_path / "target.sqlite3"), encoder=encoder)
+    stats = ExperienceImporter(target, tmp_path / "export").run()
+    assert stats["imported"] == 23 and stats["failed"] == 0
+
+    assert target.get_global_stats()["total_experiences"] == 23
+    original = source.fetch_experience_page(limit=50, include_embeddings=True)
+    copied = target.fetch_experience_page(limit=50, include_embeddings=True)
+    assert [r["id"] for r in copied] == [r["id"] for r in original]
+    assert np.allclose(copied[5]["embedding"], original[5]["embedding"])
+    target.close()
+
+
+def test_interrupted_export_and_import_resume(source, tmp_path, encoder):
+    export_dir = tmp_path / "export"
+    partial = ExperienceExporter(source, export_dir, chunk_size=5, page_size=3, agent="CodeAgent").run(max_chunks=1)
+    assert not partial["complete"] and partial["total_experiences"] == 5
+
+    manifest = ExperienceExporter(source, export_dir, chunk_size=5, page_size=3, agent="CodeAgent").run()
+    assert manifest["complete"] and manifest["total_experiences"] == 11
+    with pytest.raises(ValueError):
+        ExperienceExporter(source, export_dir, agent="ApiAgent").run()
+
+    target = SQLiteMemoryStore(path=str(tmp_path / "target.sqlite3"), encoder=encoder)
+    first = ExperienceImporter(target, export_dir).run(max_chunks=2)
+    assert first["imported"] == 10
+    second = ExperienceImporter(target, export_dir).run()
+    assert second["imported"] == 1 and second["chunks_done"] == 3
+    assert target.get_agent_performance("CodeAgent")["total_experiences"] == 11
+
+    # Checksum protege contra chunks corrompidos
+    chunk = export_dir / json.loads((export_dir / MANIFEST_NAME).read_text())["chunks"][0]["file"]
+    chunk.write_bytes(chunk.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        ExperienceImporter(target, export_dir, resume=False).run()
+    target.close()
@@ -0,0 +1,68 @@
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from memory.experience_stream import ExperienceStream
+from memory.graph_rag.experience_store import ExperienceGraphRAG
+from memory.hybrid_store import GraphRAGMemoryStore
+from memory.sqlite_store import SQLiteMemoryStore
+
+
+@pytest.fixture
+def store(tmp_path, encoder, make_experience):
+    store = SQLiteMemoryStore(path=str(tmp_path / "graphrag.sqlite3"), encoder=encoder)
+    for i in range(12):
+        store.store_experience(make_experience(f"exp_{i:02d}", f"tarefa {i}", f"def f{i}():\n    return {i}",
+                                                agent="ApiAgent" if i % 3 == 0 else "CodeAgent", days_ago=12 - i))
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_streams_full_history_with_projection_and_filters(store, prefetch):
+    rows = list(ExperienceStream(store, page_size=5, prefetch=prefetch))
+    assert [row["id"] for row in rows] == [f"exp_{i:02d}" for i in range(12)]
+    assert rows[0]["code"].startswith("def f0")
+
+    light = list(ExperienceStream(store, page_size=5, include_code=False, agent="ApiAgent", prefetch=prefetch))
+    assert [row["id"] for row in light] == ["exp_00", "exp_03", "exp_06", "exp_09"]
+    assert all(row["code"] is None for row in light)
+
+    since = (datetime.now() - timedelta(days=8, hours=12)).isoformat()
+    until = (datetime.now() - timedelta(days=3, hours=12)).isoformat()
+    window = ExperienceStream(store, page_size=2, since=since, until=until, prefetch=prefetch)
+    assert [row["id"] for row in window] == ["exp_04", "exp_05", "exp_06", "exp_07", "exp_08"]
+    assert window.cursor[1] == "exp_08"
+
+
+def test_prefetch_is_bounded_and_resumable(store):
+    calls = []
+    fetch = store.fetch_experience_page
+    store.fetch_experience_page = lambda **kwargs: calls.append(kwargs["after"]) or fetch(**kwargs)
+
+    stream = ExperienceStream(store, page_size=1, prefetch=2)
+    pages = stream.pages()
+    first = next(pages)
+    time.sleep(0.3)
+    assert len(calls) <= 4  # página entregue + fila cheia + uma aguardando espaço
+    pages.close()
+
+    assert stream._thread is None
+    rest = [row["id"] for row in ExperienceStream(store, page_size=4, after=stream.cursor)]
+    assert first[0]["id"] == "exp_00" and rest == [f"exp_{i:02d}" for i in range(1, 12)]
+
+
+def test_neo4j_pages_only_compare_timestamps_of_one_type():
+    # Os dois escritores de :Experience gravam timestamp com tipos diferentes
+    for cls, marker in ((GraphRAGMemoryStore, "e.agent_name IS NOT NULL"),
+                        (ExperienceGraphRAG, "e.agent_type IS NOT NULL")):
+        reader = cls.__new__(cls)
+        reader.neo4j = reader.driver = MagicMock()
+        session = reader.neo4j.session.return_value.__enter__.return_value
+        session.run.return_value = []
+
+        reader.fetch_experience_page(after=("2026-01-01T00:00:00", "exp_1"), limit=10)
+
+        assert marker in session.run.call_args.args[0]
@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+
+from memory.graph_rag.schema import (
+    SCHEMA, ensure_schema, find_scan_operators, check_query_plans
+)
+
+
+def test_schema_ddl_is_idempotent_and_covers_merge_keys():
+    statements = [item.ddl() for item in SCHEMA]
+    assert all("IF NOT EXISTS" in ddl for ddl in statements)
+
+    unique = {(item.label, item.properties[0]) for item in SCHEMA if item.kind == "unique"}
+    for key in [("Experience", "id"), ("Task", "id"), ("Code", "hash"), ("Agent", "name")]:
+        assert key in unique
+
+    indexed = {(item.label, item.properties[0]) for item in SCHEMA if item.kind == "range"}
+    assert ("Experience", "timestamp") in indexed
+
+
+def test_ensure_schema_runs_every_statement():
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+
+    applied = ensure_schema(driver)
+
+    assert len(applied) == len(SCHEMA)
+    assert session.run.call_count == len(SCHEMA)
+
+
+def test_find_scan_operators_walks_plan_tree():
+    plan = {
+        "operatorType": "ProduceResults@neo4j",
+        "arguments": {},
+        "children": [{
+            "operatorType": "Filter@neo4j",
+            "children": [{
+                "operatorType": "NodeByLabelScan@neo4j",
+                "arguments": {"Details": "e:Experience"},
+                "children": []
+            }]
+        }]
+    }
+    assert find_scan_operators(plan) == ["NodeByLabelScan(e:Experience)"]
+
+    indexed = {"operatorType": "NodeIndexSeek@neo4j", "children": []}
+    assert find_scan_operators(indexed) == []
+
+
+def test_check_query_plans_reports_offenders():
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    session.run.return_value.consume.return_value.plan = {
+        "operatorType": "AllNodesScan", "children": []
+    }
+
+    offenders = check_query_plans(driver, {"q": ("MATCH (n) RETURN n", {})})
+
+    assert offenders == {"q": ["AllNodesScan"]}
+    assert session.run.call_args[0][0].startswith("EXPLAIN ")
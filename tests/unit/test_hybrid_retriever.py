@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from memory.graph_rag.fulltext import build_lucene_query, relative_bm25_links
+from memory.graph_rag.hybrid_retriever import (
+    HybridRetriever, reciprocal_rank_fusion, build_chroma_where
+)
+
+
+def _exp(exp_id, quality=7.0, days_ago=0):
+    return {
+        "experience_id": exp_id,
+        "task": f"tarefa {exp_id}",
+        "quality": quality,
+        "timestamp": (datetime(2025, 6, 1) - timedelta(days=days_ago)).isoformat(),
+    }
+
+
+def test_rrf_rewards_items_found_by_both_stages():
+    fused = reciprocal_rank_fusion({
+        "vector": [_exp("a"), _exp("b"), _exp("c")],
+        "graph": [_exp("c"), _exp("d")],
+    }, now=datetime(2025, 6, 1))
+
+    assert fused[0]["experience_id"] == "c"
+    assert sorted(fused[0]["sources"]) == ["graph", "vector"]
+    assert len(fused) == 4
+
+
+def test_quality_and_recency_weights_break_ties():
+    now = datetime(2025, 6, 1)
+    lists = {"vector": [_exp("old", quality=9.0, days_ago=300)],
+             "graph": [_exp("new", quality=9.0, days_ago=0)]}
+
+    fused = reciprocal_rank_fusion(lists, recency_weight=1.0, now=now)
+    assert fused[0]["experience_id"] == "new"
+
+    lists = {"vector": [_exp("low", quality=2.0)], "graph": [_exp("high", quality=9.5)]}
+    fused = reciprocal_rank_fusion(lists, quality_weight=1.0, now=now)
+    assert fused[0]["experience_id"] == "high"
+
+
+def test_retriever_runs_both_stages_and_reports_latency():
+    calls = []
+
+    def vector(query, limit, filters):
+        calls.append(("vector", filters))
+        return [_exp("a"), _exp("b")]
+
+    def graph(query, limit, filters):
+        calls.append(("graph", filters))
+        return [_exp("b")]
+
+    retriever = HybridRetriever(vector, graph)
+    results = retriever.retrieve("somar números", k=1, filters={"agent": "CodeAgent", "domain": None})
+    retriever.close()
+
+    assert [r["experience_id"] for r in results] == ["b"]
+    assert all(filters == {"agent": "CodeAgent"} for _, filters in calls)
+    stats = retriever.get_latency_stats()
+    assert stats["queries"] == 1
+    assert set(stats["last"]) == {"vector", "graph", "fusion", "total"}
+
+
+def test_filter_translation_and_lucene_query():
+    assert build_chroma_where({}) is None
+    assert build_chroma_where({"agent": "A"}) == {"agent": {"$eq": "A"}}
+    assert "$and" in build_chroma_where({"agent": "A", "min_quality": 7})
+
+    query = build_lucene_query("criar função de login: validar senha!")
+    assert query == "login~ OR validar~ OR senha~"
+    assert build_lucene_query("de a") == ""
+
+
+def test_bm25_links_are_relative_to_own_score():
+    hits = [{"id": "novo", "score": 8.0}, {"id": "a", "score": 6.0},
+            {"id": "b", "score": 1.0}, {"id": "c", "score": 4.0}]
+    links = relative_bm25_links(hits, "novo", max_links=5, min_similarity=0.3)
+    assert [link["id"] for link in links] == ["a", "c"]
+    assert links[0]["similarity"] == 0.75
+
+    # Sem o próprio nó entre os hits, a referência é o maior score
+    assert relative_bm25_links(hits[1:], "novo", max_links=1, min_similarity=0.0) == [{"id": "a", "similarity": 1.0}]
+    assert relative_bm25_links([], "novo", max_links=5, min_similarity=0.0) == []
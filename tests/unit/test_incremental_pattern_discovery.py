@@ -0,0 +1,93 @@
+import pytest
+
+import memory.pattern_discovery as pattern_discovery
+from memory.pattern_discovery import PatternDiscoveryEngine
+from memory.pattern_state import PatternState
+from memory.sqlite_store import SQLiteMemoryStore
+
+SORT_CODE = "def ordenar(valores):\n    if not valores:\n        raise ValueError('vazio')\n    return sorted(valores)"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, encoder, make_experience):
+    monkeypatch.setattr(pattern_discovery, "IDENTITY_STATE", tmp_path / "identity_state.yaml")
+    store = SQLiteMemoryStore(path=str(tmp_path / "graphrag.sqlite3"), encoder=encoder)
+    for i in range(4):
+        store.store_experience(make_experience(f"exp_{i}", "ordenar lista de números", SORT_CODE,
+                                                quality=8.5, days_ago=2))
+    yield store
+    store.close()
+
+
+def test_incremental_run_consumes_only_new_experiences(store, tmp_path, make_experience):
+    state_path = tmp_path / "discovery_state.json"
+    engine = PatternDiscoveryEngine(store, state_path=state_path)
+    engine.config = dict(engine.config, rebuild_growth=10.0)
+
+    engine.discover_patterns(min_occurrences=2, min_success_rate=0.5)
+    assert engine.last_run["mode"] == "rebuild"
+    assert engine.last_run["experiences_processed"] == 4
+
+    store.store_experience(make_experience("exp_new", "ordenar lista de números", SORT_CODE, quality=9.0))
+    reloaded = PatternDiscoveryEngine(store, state_path=state_path)
+    reloaded.config = engine.config
+    patterns = reloaded.discover_patterns(min_occurrences=2, min_success_rate=0.5)
+
+    assert reloaded.last_run == dict(reloaded.last_run, mode="incremental", experiences_processed=1)
+    cluster = next(p for p in patterns if p.id.startswith("code_cluster_"))
+    assert cluster.usage_count == 5 and "exp_new" in cluster.related_experiences
+    assert PatternState.load(state_path).watermark[1] == "exp_new"
+
+    reloaded.discover_patterns(min_occurrences=2, min_success_rate=0.5)
+    assert reloaded.last_run["experiences_processed"] == 0
+
+
+def test_outlier_drift_triggers_full_rebuild(store, tmp_path, make_experience):
+    engine = PatternDiscoveryEngine(store, state_path=tmp_path / "discovery_state.json")
+    engine.config = dict(engine.config, rebuild_growth=10.0, drift_min_batch=1, drift_outlier_rate=0.3)
+    engine.discover_patterns(min_occurrences=2, min_success_rate=0.5)
+
+    store.store_experience(make_experience("exp_http", "consumir endpoint http",
+                                            "import requests\nresponse = requests.get(url, timeout=5)\npayload = response.json()"))
+    engine.discover_patterns(min_occurrences=2, min_success_rate=0.5)
+
+    assert engine.last_run["mode"] == "rebuild"
+    assert engine.last_run["reason"].startswith("excesso de outliers")
+
+
+def test_discovery_reuses_stored_embeddings(store, tmp_path, monkeypatch):
+    def fail(texts):
+        raise AssertionError("discovery should not re-encode stored experiences")
+    monkeypatch.setattr(store.embeddings, "encode_batch", fail)
+
+    engine = PatternDiscoveryEngine(store, state_path=tmp_path / "discovery_state.json")
+    engine.discover_patterns(min_occurrences=2, min_success_rate=0.5)
+
+    assert engine.state.vector_dimension == len(store.get_embeddings(["exp_0"])["exp_0"]) + 64
+    assert engine.last_run["clusters"] == 1
+
+
+def test_parallel_stages_match_serial_run(store, tmp_path, make_experience):
+    store.store_experience(make_experience("exp_low", "ler arquivo csv", "def ler(path):\n    return open(path).read()",
+                                            quality=5.0))
+    runs = {}
+    for name, workers in (("serial", 1), ("parallel", 3)):
+        engine = PatternDiscoveryEngine(store, state_path=tmp_path / f"{name}.json")
+        engine.config = dict(engine.config, parallel_workers=workers, parallel_min_experiences=1)
+        patterns = engine.discover_patterns(min_occurrences=2, min_success_rate=0.5)
+        runs[name] = ([(p.id, p.usage_count, p.success_rate) for p in patterns], engine.last_run["stage_seconds"])
+
+    assert runs["parallel"][0] == runs["serial"][0]
+    assert runs["parallel"][1]["workers"] == 3
+    assert {"code_clusters", "task_patterns", "quality_patterns", "total"} <= set(runs["parallel"][1])
+
+
+def test_default_config_reaches_parallel_stages(store, tmp_path):
+    engine = PatternDiscoveryEngine(store, state_path=tmp_path / "state.json")
+    engine.config = dict(engine.config, parallel_workers=2)
+
+    # O maior lote possível (rebuild_limit) tem de poder usar os processos
+    assert engine._stage_workers(engine.config["rebuild_limit"]) == 2
+    engine.config["parallel_min_experiences"] = engine.config["rebuild_limit"] * 10
+    assert engine._stage_workers(engine.config["rebuild_limit"]) == 2
+    assert engine._stage_workers(10) == 1
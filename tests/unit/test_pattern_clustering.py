@@ -0,0 +1,30 @@
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+from memory.pattern_clustering import dbscan_labels
+
+
+def _topic_vectors(rng, count, dimension=60, topics=5):
+    centers = rng.random((topics, dimension)) * (rng.random((topics, dimension)) < 0.2)
+    assignment = rng.integers(0, topics, size=count)
+    noise = rng.random((count, dimension)) * (rng.random((count, dimension)) < 0.03)
+    return centers[assignment] + 0.2 * noise
+
+
+def test_sparse_and_dense_paths_match_dense_dbscan():
+    vectors = _topic_vectors(np.random.default_rng(7), 300)
+    expected = DBSCAN(eps=0.3, min_samples=2, metric='cosine').fit_predict(vectors)
+
+    assert adjusted_rand_score(expected, dbscan_labels(sparse.csr_matrix(vectors), eps=0.3)) == 1.0
+    assert adjusted_rand_score(expected, dbscan_labels(vectors, eps=0.3)) == 1.0
+
+
+def test_duplicate_rows_keep_their_own_positions():
+    vectors = sparse.csr_matrix(np.array([[1.0, 0, 0], [0, 1.0, 0], [1.0, 0, 0], [0, 0, 0]]))
+
+    labels = dbscan_labels(vectors, eps=0.1)
+
+    assert labels[0] == labels[2] != -1
+    assert labels[1] == -1 and labels[3] == -1
@@ -0,0 +1,72 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from memory.hybrid_store import HybridMemoryStore
+from memory.pattern_discovery import DiscoveredPattern, PatternDiscoveryEngine
+
+
+def _pattern(pattern_id, contexts, success_rate, quality=7.0, experiences=()):
+    return DiscoveredPattern(
+        id=pattern_id, name=pattern_id, description="", template="", success_rate=success_rate,
+        usage_count=3, contexts=list(contexts), quality_impact=quality, discovery_date=datetime.now(),
+        related_experiences=list(experiences), confidence_score=0.8
+    )
+
+
+@pytest.fixture
+def engine():
+    store = MagicMock(spec=HybridMemoryStore)
+    store.enable_graphrag = False
+    engine = PatternDiscoveryEngine(store)
+    engine.discovered_patterns = [
+        _pattern("auth", ["authentication"], 0.8, experiences=["e1", "e2"]),
+        _pattern("db", ["database"], 0.85, quality=9.0, experiences=["e3"]),
+        _pattern("generic", ["general"], 0.75),
+        _pattern("star", ["testing"], 0.95, quality=9.5, experiences=["e4"]),
+    ]
+    return engine
+
+
+def _relevance(pattern, context):
+    static = pattern.success_rate * 0.3 + (pattern.quality_impact / 10.0) * 0.2 + pattern.confidence_score * 0.1
+    return min(static + (0.4 if context in pattern.contexts else 0.0), 1.0)
+
+
+def _linear_scan(engine, task):
+    context = engine._extract_context(task)
+    matches = [p for p in engine.discovered_patterns
+               if context in p.contexts or 'general' in p.contexts or p.success_rate > 0.9]
+    matches.sort(key=lambda p: _relevance(p, context), reverse=True)
+    return [(p.id, _relevance(p, context)) for p in matches[:5]]
+
+
+@pytest.mark.parametrize("task", ["criar login com senha", "consulta sql no banco", "ordenar lista"])
+def test_index_matches_linear_scan(engine, task):
+    recommendations = engine.get_pattern_recommendations(task)
+
+    assert [(r["pattern"].id, r["relevance_score"]) for r in recommendations] == _linear_scan(engine, task)
+    assert engine.get_pattern_recommendations(task) is not recommendations
+
+
+def test_replacing_patterns_invalidates_index(engine):
+    assert engine.get_pattern_recommendations("consulta sql no banco")[0]["pattern"].id == "db"
+
+    engine.discovered_patterns = [_pattern("only", ["general"], 0.7)]
+
+    assert [r["pattern"].id for r in engine.get_pattern_recommendations("consulta sql no banco")] == ["only"]
+
+
+def test_embedding_lookup_returns_nearest_patterns(engine):
+    engine.memory.get_embeddings.return_value = {
+        "e1": [1.0, 0.0], "e2": [0.8, 0.2], "e3": [0.0, 1.0], "e4": [-1.0, 0.0]
+    }
+
+    recommendations = engine.get_pattern_recommendations("qualquer tarefa", task_embedding=[0.9, 0.1])
+
+    assert recommendations[0]["pattern"].id == "auth"
+    assert recommendations[0]["similarity"] > 0.9
+    assert {r["pattern"].id for r in recommendations} == {"auth", "db", "star"}
+    engine.get_pattern_recommendations("outra tarefa", task_embedding=[0.0, 1.0])
+    engine.memory.get_embeddings.assert_called_once()
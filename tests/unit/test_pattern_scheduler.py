@@ -0,0 +1,87 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from memory.pattern_discovery import PatternDiscoveryScheduler
+from memory.sqlite_store import SQLiteMemoryStore
+
+
+def _engine(pages=()):
+    engine = MagicMock()
+    engine.state = SimpleNamespace(watermark=("2026-01-01T00:00:00", "exp_9"))
+    engine.memory.fetch_experience_page.side_effect = lambda after, limit, include_code: list(pages)[:limit]
+    engine.discover_patterns.return_value = []
+    return engine
+
+
+def test_triggers_on_new_experiences_or_elapsed_time(tmp_path):
+    engine = _engine(pages=[{}] * 2)
+    scheduler = PatternDiscoveryScheduler(engine, interval_hours=1, min_new_experiences=3,
+                                          state_path=tmp_path / "scheduler.json")
+    assert scheduler._trigger_reason() == "primeira execução"
+
+    scheduler.run_now()
+    assert scheduler._trigger_reason() is None
+    engine.memory.fetch_experience_page.assert_called_with(after=("2026-01-01T00:00:00", "exp_9"), limit=3,
+                                                               include_code=False)
+
+    scheduler.notify_new_experiences(3)
+    assert scheduler._trigger_reason() == "3 experiências novas"
+
+    reloaded = PatternDiscoveryScheduler(engine, interval_hours=1, min_new_experiences=3,
+                                         state_path=tmp_path / "scheduler.json")
+    assert reloaded.watermark == scheduler.watermark and len(reloaded.durations) == 1
+    reloaded.last_run_at = datetime.now() - timedelta(hours=2)
+    assert reloaded._trigger_reason() == "1h desde a última execução"
+
+
+def test_overlapping_runs_are_skipped(tmp_path):
+    engine = _engine()
+    release = threading.Event()
+    engine.discover_patterns.side_effect = lambda: release.wait(5) and []
+    scheduler = PatternDiscoveryScheduler(engine, min_new_experiences=1, state_path=tmp_path / "s.json")
+
+    worker = threading.Thread(target=scheduler.run_now)
+    worker.start()
+    while not scheduler.status()["in_progress"]:
+        time.sleep(0.01)
+    assert scheduler.run_now() is None
+    release.set()
+    worker.join()
+
+    assert engine.discover_patterns.call_count == 1
+    assert not scheduler.status()["in_progress"]
+
+
+def test_stop_interrupts_wait(tmp_path):
+    scheduler = PatternDiscoveryScheduler(_engine(), interval_hours=24, min_new_experiences=10,
+                                          check_seconds=3600, state_path=tmp_path / "s.json")
+    scheduler.start()
+    while scheduler.last_run_at is None:
+        time.sleep(0.01)
+
+    started = time.perf_counter()
+    scheduler.stop()
+
+    assert time.perf_counter() - started < 1.0
+    assert scheduler.status()["run_durations"]
+
+
+def test_store_writes_notify_the_scheduler(tmp_path, encoder, make_experience):
+    store = SQLiteMemoryStore(path=str(tmp_path / "graphrag.sqlite3"), encoder=encoder)
+    engine = _engine()
+    engine.memory = store
+    scheduler = PatternDiscoveryScheduler(engine, min_new_experiences=2, state_path=tmp_path / "s.json")
+
+    store.store_experience(make_experience("exp_1", "ordenar lista", "sorted(x)"))
+    assert scheduler.status()["pending_experiences"] == 1 and not scheduler._wake.is_set()
+    store.store_experience(make_experience("exp_2", "ordenar nomes", "sorted(x)"))
+    assert scheduler._wake.is_set()
+
+    scheduler.stop()
+    assert store._write_listeners == ()
+    store.store_experience(make_experience("exp_3", "ordenar datas", "sorted(x)"))
+    assert scheduler.status()["pending_experiences"] == 2
+    store.close()
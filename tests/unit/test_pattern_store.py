@@ -0,0 +1,76 @@
+from dataclasses import replace
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from memory.hybrid_store import HybridMemoryStore
+from memory.pattern_discovery import PatternDiscoveryEngine
+from memory.pattern_store import DiscoveredPattern, PatternStore
+
+
+def _pattern(pattern_id, contexts, success_rate=0.8, usage_count=3):
+    return DiscoveredPattern(
+        id=pattern_id, name=pattern_id, description="d", template="def f():\n    pass",
+        success_rate=success_rate, usage_count=usage_count, contexts=list(contexts), quality_impact=8.0,
+        discovery_date=datetime(2026, 1, 1), related_experiences=["e1"], confidence_score=0.9
+    )
+
+
+def test_runs_version_only_changed_patterns(tmp_path):
+    store = PatternStore(tmp_path / "patterns.sqlite3")
+    auth, db = _pattern("auth", ["authentication"]), _pattern("db", ["database", "general"])
+    store.save_run([auth, db], {"mode": "rebuild"})
+    run_id = store.save_run([replace(auth, usage_count=5), db], {"mode": "incremental"})
+
+    evolution = store.load_evolution()
+    assert [v["version"] for v in evolution["auth"]] == [1, 2]
+    assert evolution["auth"][-1]["usage_count"] == 5
+    assert [v["version"] for v in evolution["db"]] == [1]
+    assert store.last_run() == dict(store.last_run(), mode="incremental", run_id=run_id)
+    assert store.load_evolution(limit=1)["auth"][0]["version"] == 2
+
+    store.save_run([db])
+    assert [p.id for p in store.load_patterns()] == ["db"]
+    assert [p.id for p in store.load_patterns(context="general")] == ["db"]
+    assert store.load_patterns(context="authentication") == []
+    assert {p.id for p in store.load_patterns(include_inactive=True)} == {"auth", "db"}
+    store.close()
+
+
+def test_missing_store_reads_empty_without_creating_file(tmp_path):
+    store = PatternStore(tmp_path / "absent.sqlite3")
+
+    assert store.load_patterns() == [] and store.load_evolution() == {} and store.last_run() == {}
+    assert store.export_summary()["total_patterns"] == 0
+    assert not (tmp_path / "absent.sqlite3").exists()
+
+
+def test_engine_warm_starts_from_store(tmp_path):
+    store = PatternStore(tmp_path / "patterns.sqlite3")
+    store.save_run([_pattern("db", ["database"])], {"mode": "rebuild", "clusters": 1})
+    memory = MagicMock(spec=HybridMemoryStore)
+    memory.enable_graphrag = False
+
+    engine = PatternDiscoveryEngine(memory, pattern_store=store)
+
+    assert engine.discovered_patterns == store.load_patterns()
+    assert engine.find_patterns("database")[0].id == "db"
+    assert engine.last_run["clusters"] == 1
+    assert engine.export_patterns_summary() == store.export_summary()
+    assert engine.get_pattern_recommendations("consulta sql no banco")[0]["pattern"].id == "db"
+
+
+def test_engine_evolution_follows_store_versions(tmp_path):
+    store = PatternStore(tmp_path / "patterns.sqlite3")
+    memory = MagicMock(spec=HybridMemoryStore)
+    memory.enable_graphrag = False
+    engine = PatternDiscoveryEngine(memory, pattern_store=store)
+    db = _pattern("db", ["database"])
+
+    for patterns in ([db], [db], [replace(db, usage_count=5)]):  # a 2ª execução não muda nada
+        engine._update_pattern_evolution(patterns)
+        engine.discovered_patterns = patterns
+        engine._persist_patterns(patterns)
+
+    assert [v["version"] for v in engine.pattern_evolution["db"]] == [1, 2]
+    assert engine.export_patterns_summary() == store.export_summary()
+    assert PatternDiscoveryEngine(memory, pattern_store=store).pattern_evolution == engine.pattern_evolution
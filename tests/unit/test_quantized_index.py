@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from memory.vector_store.quantization import quantize, dequantize, normalize_rows
+from memory.vector_store.embedded_index import EmbeddedVectorIndex, match_where
+from memory.vector_store.embedding_cache import EmbeddingCache
+
+
+def _vectors(n=300, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    return normalize_rows(rng.standard_normal((n, dim)))
+
+
+def test_int8_roundtrip_keeps_cosine():
+    vectors = _vectors()
+    data, scales = quantize(vectors, "int8")
+    assert data.dtype == np.int8 and scales.shape == (len(vectors),)
+    restored = normalize_rows(dequantize(data, scales))
+    cosines = np.sum(restored * vectors, axis=1)
+    assert cosines.min() > 0.999
+
+
+@pytest.mark.parametrize("storage", ["float16", "int8"])
+def test_quantized_query_matches_exact_ranking(storage):
+    vectors = _vectors()
+    ids = [f"exp_{i}" for i in range(len(vectors))]
+    exact = EmbeddedVectorIndex(dimension=32)
+    quantized = EmbeddedVectorIndex(dimension=32, storage=storage, rerank_candidates=20)
+    exact.add(ids, vectors)
+    quantized.add(ids, vectors)
+
+    query = vectors[7] + 0.1 * vectors[8]
+    expected = exact.query(query, k=5)
+    found = quantized.query(query, k=5)
+    assert [i for i, _, _ in found] == [i for i, _, _ in expected]
+    # Re-rank exato devolve as similaridades float32
+    assert found[0][1] == pytest.approx(expected[0][1], abs=1e-5)
+    assert quantized.memory_usage()["scan_bytes"] < exact.memory_usage()["scan_bytes"]
+
+
+def test_where_filter_and_delete():
+    vectors = _vectors(n=10)
+    ids = [f"exp_{i}" for i in range(10)]
+    metadatas = [{"agent": "A" if i % 2 else "B", "quality": float(i)} for i in range(10)]
+    index = EmbeddedVectorIndex(dimension=32, storage="int8")
+    index.add(ids, vectors, metadatas)
+
+    where = {"$and": [{"agent": {"$eq": "A"}}, {"quality": {"$gte": 5.0}}]}
+    found = index.query(vectors[0], k=10, where=where)
+    assert {i for i, _, _ in found} == {"exp_5", "exp_7", "exp_9"}
+
+    index.delete(["exp_5", "exp_7", "exp_9", "exp_1"])
+    assert index.query(vectors[0], k=10, where=where) == []
+    assert len(index) == 6
+    assert match_where({"agent": "A"}, {"agent": "A"})
+
+
+def test_persistent_index_reloads(tmp_path):
+    vectors = _vectors(n=50)
+    ids = [f"exp_{i}" for i in range(50)]
+    index = EmbeddedVectorIndex(dimension=32, storage="int8", path=str(tmp_path))
+    index.add(ids, vectors, [{"n": i} for i in range(50)])
+    index.save()
+    assert index.memory_usage()["full_precision_bytes_in_ram"] == 0
+
+    reloaded = EmbeddedVectorIndex(dimension=32, storage="int8", path=str(tmp_path))
+    assert len(reloaded) == 50
+    top_id, score, metadata = reloaded.query(vectors[3], k=1)[0]
+    assert top_id == "exp_3" and metadata == {"n": 3}
+    assert score == pytest.approx(1.0, abs=1e-5)
+    np.testing.assert_allclose(reloaded.get_embeddings(["exp_4"])[0], vectors[4], atol=1e-6)
+
+    with pytest.raises(ValueError):
+        EmbeddedVectorIndex(dimension=32, storage="float16", path=str(tmp_path))
+
+
+def test_compaction_persists_consistent_row_order(tmp_path):
+    vectors = _vectors(n=40)
+    index = EmbeddedVectorIndex(dimension=32, storage="int8", path=str(tmp_path))
+    index.add([f"exp_{i}" for i in range(40)], vectors)
+    index.save()
+    index.delete([f"exp_{i}" for i in range(0, 40, 2)])  # passa de 1/4 removido: compacta
+
+    # Sem save() depois: o disco já deve refletir a compactação
+    reloaded = EmbeddedVectorIndex(dimension=32, storage="int8", path=str(tmp_path))
+    assert len(reloaded) == 20
+    np.testing.assert_allclose(reloaded.get_embeddings(["exp_7"])[0], vectors[7], atol=1e-6)
+    assert reloaded.query(vectors[7], k=1)[0][0] == "exp_7"
+
+
+class _CountingEncoder:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts):
+        self.calls += len(texts)
+        return np.array([[len(t), 1.0, 0.5] for t in texts], dtype=np.float32)
+
+
+def test_embedding_cache_hits_and_eviction():
+    encoder = _CountingEncoder()
+    cache = EmbeddingCache(encoder, max_entries=2, storage="int8")
+
+    first = cache.encode("soma")
+    batch = cache.encode_batch(["soma", "soma", "subtração"])
+    assert encoder.calls == 2
+    np.testing.assert_allclose(batch[0], first, rtol=1e-2)
+    np.testing.assert_array_equal(batch[2], cache.encode("subtração"))  # falta == acerto
+
+    cache.encode("multiplicação")
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["entries"] == 2
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from memory.graph_rag.retention import select_for_pruning, ExperienceRetentionEngine
+
+NOW = datetime(2025, 6, 1)
+
+
+def _row(exp_id, quality, domain="general", success=True, days_ago=0):
+    return {"id": exp_id, "quality": quality, "domain": domain, "success": success,
+            "timestamp": (NOW - timedelta(days=days_ago)).isoformat()}
+
+
+def test_keeps_highest_value_and_one_per_domain():
+    rows = [
+        _row("good_api_1", 9.0, "api_development"),
+        _row("good_api_2", 8.5, "api_development"),
+        _row("weak_db", 3.0, "database", success=False),
+        _row("bad_api", 2.0, "api_development", success=False),
+    ]
+
+    prune = select_for_pruning(rows, max_keep=2, now=NOW)
+
+    # O único exemplo de database sobrevive mesmo com baixa qualidade
+    assert set(prune) == {"good_api_2", "bad_api"}
+    assert prune[0] == "bad_api"
+
+
+def test_min_age_protects_recent_experiences():
+    rows = [_row("old", 2.0, days_ago=60), _row("recent", 1.0, days_ago=1), _row("best", 9.0)]
+
+    assert select_for_pruning(rows, max_keep=1, min_age_days=30, now=NOW) == ["old"]
+
+
+def test_engine_processes_bounded_batches_and_deletes_vectors():
+    engine = ExperienceRetentionEngine(MagicMock(), vector_collection=MagicMock(),
+                                       config={"max_experiences_per_agent": 2, "cleanup_threshold": 0.5})
+    engine._pending_ids = MagicMock(return_value=[])
+    engine._agent_counts = MagicMock(return_value=[("CodeAgent", 5), ("TestAgent", 1)])
+    engine._agent_rows = MagicMock(return_value=[_row(f"e{i}", float(i)) for i in range(5)])
+    processed = []
+    engine._process_batch = lambda ids, report, already_summarized: processed.append(ids)
+
+    report = engine.run(batch_size=2, max_batches=1)
+
+    assert report["agents_over_limit"] == [{"agent": "CodeAgent", "count": 5}]
+    assert processed == [["e0", "e1"]]
+    assert report["complete"] is False
@@ -0,0 +1,65 @@
+import time
+
+from memory.graph_rag.retrieval_cache import RetrievalCache
+
+
+def _results(n=2):
+    return [{"experience_id": f"exp_{i}", "task": "somar", "quality": 8.0} for i in range(n)]
+
+
+def test_near_identical_queries_share_entry():
+    cache = RetrievalCache()
+    key = RetrievalCache.make_key("Criar função  soma", 3, {"agent": "CodeAgent", "domain": None})
+    cache.put(key, _results())
+
+    same = RetrievalCache.make_key("  criar função soma.", 3, {"agent": "CodeAgent"})
+    assert cache.get(same) == _results()
+    assert cache.get(RetrievalCache.make_key("criar função soma", 5, {"agent": "CodeAgent"})) is None
+
+
+def test_write_generation_invalidates_entries():
+    cache = RetrievalCache()
+    key = RetrievalCache.make_key("soma", 3)
+    cache.put(key, _results())
+    assert cache.get(key) is not None
+
+    cache.bump_generation()
+    assert cache.get(key) is None
+
+
+def test_result_computed_before_write_is_not_cached():
+    cache = RetrievalCache()
+    key = RetrievalCache.make_key("soma", 3)
+    generation = cache.generation
+    cache.bump_generation()  # escrita concorrente durante a consulta
+
+    cache.put(key, _results(), generation=generation)
+    assert cache.get(key) is None
+
+
+def test_ttl_and_memory_bounds():
+    cache = RetrievalCache(ttl_seconds=0.01)
+    key = RetrievalCache.make_key("soma", 3)
+    cache.put(key, _results())
+    time.sleep(0.02)
+    assert cache.get(key) is None
+
+    cache = RetrievalCache(max_entries=2)
+    for i in range(3):
+        cache.put(RetrievalCache.make_key(f"q{i}", 3), _results())
+    assert cache.get(RetrievalCache.make_key("q0", 3)) is None
+    assert cache.get_stats()["entries"] == 2
+
+    tiny = RetrievalCache(max_bytes=100)
+    tiny.put(RetrievalCache.make_key("q", 3), _results(10))
+    assert tiny.get_stats()["entries"] == 0
+
+
+def test_returned_results_are_copies():
+    cache = RetrievalCache()
+    key = RetrievalCache.make_key("soma", 3)
+    cache.put(key, _results())
+
+    first = cache.get(key)
+    first[0]["quality"] = 0
+    assert cache.get(key)[0]["quality"] == 8.0
@@ -0,0 +1,121 @@
+import os
+import time
+
+import pytest
+
+from core.execution import sandbox
+from core.execution.sandbox import SandboxPool, _run_subprocess
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="zygote requer os.fork")
+
+
+def _running(pid: int, wait: float = 2.0) -> bool:
+    """Se o processo ainda existe (zumbis não contam) após até `wait` segundos"""
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                alive = f.read().rsplit(")", 1)[1].split()[0] != "Z"
+        except FileNotFoundError:
+            alive = False
+        if not alive or time.monotonic() >= deadline:
+            return alive
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(size=1, warm_imports=["json"])
+    yield pool
+    pool.close()
+
+
+def test_runs_are_isolated_from_each_other(pool):
+    first = pool.run("import json\njson.marker = 1\nvalor = 42\nprint(__name__, json.marker)", timeout=5)
+    second = pool.run("import json\nprint(hasattr(json, 'marker'), 'valor' in globals())", timeout=5)
+
+    assert first.ok and first.stdout == "__main__ 1\n"
+    assert second.stdout == "False False\n"
+
+
+def test_errors_exit_codes_and_timeouts(pool):
+    failed = pool.run("def f():\n    raise ValueError('ruim')\nf()", timeout=5)
+    assert failed.returncode == 1 and failed.stderr.endswith("ValueError: ruim\n")
+    assert "zygote" not in failed.stderr
+
+    assert pool.run("import sys\nsys.exit(3)", timeout=5).returncode == 3
+
+    slow = pool.run("while True:\n    pass", timeout=0.3)
+    assert slow.timed_out and not slow.ok
+    assert pool.run("print('ainda vivo')", timeout=5).stdout == "ainda vivo\n"
+
+
+def test_dead_zygote_is_replaced(pool):
+    pool._zygotes[0].process.kill()
+    pool._zygotes[0].process.wait()
+
+    assert pool.run("print(1)", timeout=5).stdout == "1\n"
+    assert len(pool._zygotes) == 1
+
+
+def test_subprocess_fallback_matches_pool(pool):
+    code = "import sys\nprint('saida')\nprint('erro', file=sys.stderr)\nsys.exit(2)"
+    forked, fresh = pool.run(code, timeout=5), _run_subprocess(code, timeout=10)
+
+    assert (forked.returncode, forked.stdout, forked.stderr) == (fresh.returncode, fresh.stdout, fresh.stderr)
+
+
+def test_resource_limits_are_enforced_and_reported(pool):
+    limits = {"cpu": 1, "as": 256 * 1024 ** 2, "fsize": 1024 ** 2, "nproc": None}
+
+    cpu = pool.run("while True:\n    pass", timeout=10, limits=limits)
+    assert cpu.limit == "cpu" and not cpu.timed_out and cpu.cpu_time >= 0.9
+
+    memory = pool.run("dados = bytearray(1024 ** 3)", timeout=5, limits=limits)
+    assert memory.limit == "as" and memory.returncode == 1
+
+    allocated = pool.run("dados = bytearray(64 * 1024 ** 2)\nprint(len(dados))", timeout=5, limits=limits)
+    assert allocated.ok and allocated.peak_rss_mb >= 64
+
+
+def test_output_flood_is_killed_early(pool):
+    flood = pool.run("while True:\n    print('x' * 1000)", timeout=10)
+
+    assert flood.limit == "output" and flood.elapsed < 5
+    assert len(flood.stdout) == pool.max_output
+
+
+def test_deadline_applies_after_child_closes_its_pipes(pool, tmp_path):
+    pid_file = tmp_path / "pid"
+    code = f"import os, time\nopen({str(pid_file)!r}, 'w').write(str(os.getpid()))\nos.close(1)\nos.close(2)\ntime.sleep(30)"
+
+    result = pool.run(code, timeout=1)
+
+    assert result.limit == "timeout" and result.elapsed < 5
+    assert not _running(int(pid_file.read_text()))
+
+
+def test_unresponsive_zygote_is_discarded_with_its_child(pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(sandbox, "WATCHDOG_GRACE", 0.5)
+    pid_file = tmp_path / "pid"
+    code = (f"import os, signal, time\nopen({str(pid_file)!r}, 'w').write(str(os.getpid()))\n"
+            "os.kill(os.getppid(), signal.SIGSTOP)\ntime.sleep(30)")
+
+    result = pool.run(code, timeout=0.5)
+
+    assert result.limit == "timeout" and not pool._zygotes
+    assert not _running(int(pid_file.read_text()))
+    assert pool.run("print('novo')", timeout=5).stdout == "novo\n"
+
+
+def test_zygote_that_misses_startup_deadline_is_killed(tmp_path, monkeypatch):
+    pid_file = tmp_path / "pid"
+    script = tmp_path / "mudo.py"
+    script.write_text(f"import os, time\nopen({str(pid_file)!r}, 'w').write(str(os.getpid()))\ntime.sleep(30)\n")
+    monkeypatch.setattr(sandbox, "ZYGOTE_SCRIPT", script)
+    monkeypatch.setattr(sandbox, "STARTUP_TIMEOUT", 1.0)
+
+    with pytest.raises(TimeoutError):
+        sandbox._Zygote([])
+
+    assert not _running(int(pid_file.read_text()))
@@ -0,0 +1,40 @@
+import numpy as np
+
+from memory.graph_rag.similarity_links import SimilarityLinkJob, top_k_neighbours
+from memory.sqlite_store import SQLiteMemoryStore
+
+
+def test_blocked_top_k_matches_exact_search():
+    rng = np.random.default_rng(3)
+    corpus = rng.standard_normal((230, 16)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    rows = np.array([0, 57, 229])
+
+    found = top_k_neighbours(corpus[rows], rows, [corpus[i:i + 64] for i in range(0, 230, 64)],
+                             k=5, min_similarity=-1.0)
+
+    exact = corpus[rows] @ corpus.T
+    exact[np.arange(3), rows] = -np.inf
+    for neighbours, scores in zip(found, exact):
+        assert [row for row, _ in neighbours] == list(np.argsort(-scores)[:5])
+
+
+def test_incremental_job_links_only_new_experiences(tmp_path, encoder, make_experience):
+    store = SQLiteMemoryStore(path=str(tmp_path / "graphrag.sqlite3"), encoder=encoder)
+    store.store_experience(make_experience("exp_1", "ordenar lista de números", "sorted(x)", days_ago=3))
+    store.store_experience(make_experience("exp_2", "ordenar lista de nomes", "sorted(x)", days_ago=2))
+    store.store_experience(make_experience("exp_3", "enviar email", "smtp.send()", days_ago=2))
+    store.conn.execute("DELETE FROM similar_experiences")
+
+    job = SimilarityLinkJob(store, state_path=tmp_path / "state.json", k=2, min_similarity=0.5, page_size=2)
+    first = job.run()
+    assert first["new_experiences"] == 3
+    edges = {(row["source"], row["target"]) for row in store.conn.execute("SELECT * FROM similar_experiences")}
+    assert edges == {("exp_1", "exp_2"), ("exp_2", "exp_1")}
+
+    store.store_experience(make_experience("exp_4", "ordenar lista de datas", "sorted(x)"))
+    second = job.run()
+    assert second["new_experiences"] == 1 and second["corpus"] == 4
+    assert job.run()["new_experiences"] == 0
+    assert job.run(full=True)["new_experiences"] == 4
+    store.close()
@@ -0,0 +1,129 @@
+import pytest
+
+from config.settings import GRAPHRAG_CONFIG
+from memory.hybrid_store import create_memory_store
+from memory.graph_rag.content_hash import stable_code_hash, stable_task_id
+from memory.sqlite_store import SQLiteMemoryStore, build_fts_query
+
+
+@pytest.fixture
+def store(tmp_path, encoder, make_experience):
+    store = SQLiteMemoryStore(path=str(tmp_path / "graphrag.sqlite3"), encoder=encoder)
+    store.store_experience(make_experience("exp_1", "criar função que soma dois números",
+                                            "def soma(a, b):\n    return a + b", quality=9.0))
+    store.store_experience(make_experience("exp_2", "criar endpoint api de login",
+                                            "def login(user):\n    return auth(user)", quality=6.0,
+                                            success=False, agent="ApiAgent"))
+    store.store_experience(make_experience("exp_3", "função que multiplica dois números",
+                                            "def multiplica(a, b):\n    return a * b", quality=7.0))
+    yield store
+    store.close()
+
+
+def test_vector_and_hybrid_retrieval(store):
+    similar = store.retrieve_similar_experiences("soma dois números", k=2)
+    assert similar[0]["experience_id"] == "exp_1"
+    assert similar[0]["code"].startswith("def soma")
+
+    graph = store._graph_search("multiplica", 5, {})
+    assert graph[0]["experience_id"] == "exp_3"
+
+    hybrid = store.retrieve_hybrid("multiplica números", k=3)
+    exp_3 = next(r for r in hybrid if r["experience_id"] == "exp_3")
+    assert set(exp_3["sources"]) == {"vector", "graph"}
+
+
+def test_filters_apply_to_both_stages(store):
+    only_api = store.retrieve_hybrid("criar função", k=5, filters={"agent": "ApiAgent"})
+    assert {r["experience_id"] for r in only_api} == {"exp_2"}
+
+    good = store.retrieve_similar_experiences("números", k=5, filters={"min_quality": 8.0})
+    assert [r["experience_id"] for r in good] == ["exp_1"]
+
+
+def test_aggregates_and_timeline(store, make_experience):
+    code_agent = store.get_agent_performance("CodeAgent")
+    assert code_agent["total_experiences"] == 2
+    assert code_agent["avg_quality"] == pytest.approx(8.0)
+    assert code_agent["success_rate"] == pytest.approx(100.0)
+
+    # Regravar a mesma experiência não conta duas vezes
+    store.store_experience(make_experience("exp_1", "criar função que soma dois números",
+                                            "def soma(a, b):\n    return a + b", quality=9.0))
+    assert store.get_global_stats()["total_experiences"] == 3
+    assert store.get_quality_timeline(days=1)[0]["experience_count"] == 3
+
+
+
+def test_restore_moves_experience_and_aggregates(store, make_experience):
+    store.store_experience(make_experience("exp_1", "criar endpoint api de cadastro",
+                                            "def cadastro(user):\n    return user", quality=5.0, agent="ApiAgent"))
+
+    row = store.conn.execute("SELECT agent, task_id, code_hash, domain FROM experiences WHERE id = 'exp_1'").fetchone()
+    assert row["agent"] == "ApiAgent"
+    assert row["task_id"] == stable_task_id("criar endpoint api de cadastro")
+    assert row["code_hash"] == stable_code_hash("def cadastro(user):\n    return user")
+
+    assert store.get_agent_performance("CodeAgent")["total_experiences"] == 1
+    api_agent = store.get_agent_performance("ApiAgent")
+    assert api_agent["total_experiences"] == 2
+    assert api_agent["avg_quality"] == pytest.approx(5.5)
+    assert store.get_global_stats()["total_experiences"] == 3
+
+
+def test_reopen_restores_vectors(tmp_path, encoder, make_experience):
+    path = str(tmp_path / "graphrag.sqlite3")
+    store = SQLiteMemoryStore(path=path, encoder=encoder)
+    store.store_experience(make_experience("exp_1", "ordenar lista", "def ordenar(x):\n    return sorted(x)"))
+    store.conn.close()  # queda sem close(): índice não foi salvo
+    store.conn = None
+    store.index = None
+
+    reopened = SQLiteMemoryStore(path=path, encoder=encoder)
+    assert reopened.retrieve_similar_experiences("ordenar lista", k=1)[0]["experience_id"] == "exp_1"
+    reopened.close()
+
+
+def test_retention_prunes_and_summarizes(store, monkeypatch):
+    monkeypatch.setitem(GRAPHRAG_CONFIG["experience_storage"], "max_experiences_per_agent", 1)
+    monkeypatch.setitem(GRAPHRAG_CONFIG["experience_storage"], "cleanup_threshold", 1.0)
+
+    report = store.apply_retention()
+
+    assert report["experiences_removed"] == 1
+    assert report["code_nodes_removed"] == 1
+    remaining = {r["experience_id"] for r in store.retrieve_similar_experiences("números", k=5)}
+    assert "exp_1" in remaining and "exp_3" not in remaining
+    summary = store.conn.execute("SELECT count FROM experience_summaries WHERE agent = 'CodeAgent'").fetchone()
+    assert summary["count"] == 1
+
+
+def test_pattern_interface(store):
+    store.register_pattern("reação", "padrão A", "estilo", "CodeAgent")
+    store.register_pattern("reação", "padrão A", "estilo", "CodeAgent")
+    store.register_pattern("outra", "padrão B", "estilo", "TestAgent")
+    assert store.get_patterns_by_agent("CodeAgent") == ["padrão A"]
+    assert store.get_categories_and_counts() == [{"category": "estilo", "count": 2}]
+
+
+def test_fts_query_and_factory(tmp_path):
+    assert build_fts_query('criar função "soma" de números') == '"soma"* OR "números"*'
+    with pytest.raises(ValueError):
+        create_memory_store(backend="desconhecido")
+
+
+def test_partial_hybrid_results_are_not_cached(store, monkeypatch):
+    graph_search, calls = store._graph_search, []
+
+    def flaky_graph(query, limit, filters):
+        calls.append(query)
+        if len(calls) == 1:
+            raise RuntimeError("grafo indisponível")
+        return graph_search(query, limit, filters)
+
+    monkeypatch.setattr(store, "_graph_search", flaky_graph)
+
+    assert store.retrieve_hybrid("login", k=3).failed_stages == ["graph"]
+    assert store.retrieve_hybrid("login", k=3).failed_stages == []
+    store.retrieve_hybrid("login", k=3)
+    assert len(calls) == 2
@@ -0,0 +1,36 @@
+from unittest.mock import MagicMock
+
+from memory.graph_rag.schema import SCHEMA
+from memory.graph_rag.task_categories import categorize_task, category_link, read_category_stats
+
+
+def test_categorize_task_uses_keywords():
+    assert categorize_task("Criar endpoint de login com cache") == ["autenticação", "API", "cache"]
+    assert categorize_task("função que soma dois números") == []
+    assert "MERGE (exp)-[:IN_CATEGORY]->(category)" in category_link("exp")
+    assert "task_category_name" in {item.name for item in SCHEMA}
+
+
+def test_keywords_match_whole_words_only():
+    for text in ("capital da terapia", "author do resort", "especialista em vendas"):
+        assert categorize_task(text) == []
+    assert categorize_task("ordenar listas de testes") == ["algoritmo", "estrutura de dados", "teste"]
+    # Regravação remove as ligações antigas antes de criar as novas
+    link = category_link("exp")
+    assert link.index("DELETE stale") < link.index("MERGE (exp)-[:IN_CATEGORY]")
+
+
+def test_category_stats_single_grouped_query():
+    session = MagicMock()
+    session.run.return_value.data.return_value = [
+        {"category": "API", "count": 4, "avg_quality": 7.5, "success_count": 3, "avg_success_quality": 8.0},
+    ]
+
+    stats = read_category_stats(session, ["API", "cache"], agent="CodeAgent")
+
+    # Uma consulta para todas as categorias materializadas
+    assert session.run.call_count == 1
+    assert "IN_CATEGORY" in session.run.call_args.args[0]
+    assert stats["API"]["success_rate"] == 75.0
+    assert stats["cache"] == {"count": 0, "avg_quality": 0.0, "success_rate": 0.0,
+                              "success_count": 0, "avg_success_quality": None}